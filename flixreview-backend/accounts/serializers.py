@@ -1,6 +1,5 @@
 from datetime import timedelta
 
-from django.core.cache import cache
 from django.utils import timezone
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
@@ -10,6 +9,7 @@ from drf_spectacular.utils import extend_schema_field
 
 from movies.models import Genre
 from movies.serializers import GenreSerializer
+from recommendations.cache import invalidate_user
 from .models import UserProfile
 
 
@@ -245,10 +245,7 @@ class UserPreferredGenresSerializer(serializers.ModelSerializer):
         return instance
 
     def _invalidate_recommendation_cache(self, user_id: int) -> None:
-        cache.delete(f"taste_profile:user:{user_id}")
-        for algorithm in ('hybrid', 'collaborative', 'content'):
-            for limit in (10, 20, 30, 40, 50):
-                cache.delete(f"recommendations:user:{user_id}:algo:{algorithm}:limit:{limit}")
+        invalidate_user(user_id)
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -1,5 +1,5 @@
 from django.test import TestCase, override_settings
-from django.core.cache import cache
+from django.core.cache import caches
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
@@ -127,7 +127,7 @@ class SecurityTests(APITestCase):
 	
 	def setUp(self):
 		# Clear rate limit cache before each test
-		cache.clear()
+		caches['ratelimit'].clear()
 		
 		self.register_url = '/api/users/register/'
 		self.login_url = '/api/users/login/'
@@ -141,7 +141,7 @@ class SecurityTests(APITestCase):
 
 	def tearDown(self):
 		# Clear rate limit cache after each test
-		cache.clear()
+		caches['ratelimit'].clear()
 
 	@override_settings(RATELIMIT_ENABLE=True)
 	def test_registration_rate_limit(self):
@@ -1,6 +1,27 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        post_migrate.connect(install_search_indexes_after_migrate, sender=self)
+
+
+def install_search_indexes_after_migrate(sender, using='default', **kwargs):
+    from django.db.migrations.loader import MigrationLoader
+
+    from .search import install_search_indexes
+
+    # Migrated apps get their indexes from common.search.InstallSearchIndex
+    # operations; apps created without migrations (e.g. pytest --nomigrations)
+    # get them here
+    connection = connections[using]
+    unmigrated = MigrationLoader(connection, ignore_no_migrations=True).unmigrated_apps
+    install_search_indexes(using, app_labels=unmigrated)
+    # SQLite drops a table's FTS triggers whenever a migration remakes it
+    if connection.vendor == 'sqlite':
+        install_search_indexes(using, repair_only=True)
@@ -0,0 +1,142 @@
+"""
+Versioned cache namespaces and stampede protection
+
+Every namespace owns a version counter stored in the cache itself. Keys
+built with ``versioned_key`` embed the current version, so bumping the
+counter makes every key in the namespace unreachable in O(1) - no key
+listing, SCAN or pattern deletes. Orphaned entries expire through their
+own TTL.
+
+``get_or_refresh`` fills a missing key at most once across workers: the
+first caller takes a short-lived lock and computes, the others wait for its
+result instead of stampeding the database. Hot entries are refreshed early
+(probabilistically) and served stale while one worker recomputes them.
+"""
+import math
+import random
+import time
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from django.core.cache import caches
+
+
+NAMESPACE_PREFIX = 'ns'
+LOCK_PREFIX = 'lock'
+
+_MISSING = object()
+
+
+class CacheEntry(NamedTuple):
+	"""A value stored by get_or_refresh with its soft expiry and compute cost"""
+	value: Any
+	expires_at: float
+	delta: float
+
+
+def _version_key(namespace: str) -> str:
+	return f"{NAMESPACE_PREFIX}:{namespace}"
+
+
+def _initial_version() -> int:
+	# Seeded from the clock so a counter lost to eviction never reuses an old version
+	return time.time_ns() // 1000
+
+
+def get_namespace_version(namespace: str, alias: str = 'default') -> int:
+	"""Return the current version of a namespace, creating it if needed"""
+	cache = caches[alias]
+	key = _version_key(namespace)
+
+	version = cache.get(key)
+	if version is None:
+		seed = _initial_version()
+		cache.add(key, seed, timeout=None)
+		version = cache.get(key, seed)
+	return version
+
+
+def bump_namespace(namespace: str, alias: str = 'default') -> int:
+	"""Invalidate every key in a namespace; returns the new version"""
+	cache = caches[alias]
+	key = _version_key(namespace)
+
+	try:
+		return cache.incr(key)
+	except ValueError:
+		# No counter yet, so nothing was cached under this namespace
+		version = _initial_version()
+		cache.set(key, version, timeout=None)
+		return version
+
+
+def versioned_key(namespace: str, *parts, alias: str = 'default') -> str:
+	"""Build a cache key inside a namespace, e.g. ``<namespace>:v<version>:<parts>``"""
+	version = get_namespace_version(namespace, alias=alias)
+	suffix = ':'.join(str(part) for part in parts)
+	return f"{namespace}:v{version}:{suffix}"
+
+
+def get_or_refresh(
+	key: str,
+	compute: Callable[[], Any],
+	timeout: int,
+	alias: str = 'default',
+	stale_timeout: Optional[int] = None,
+	beta: float = 1.0,
+	lock_timeout: int = 30,
+	wait: float = 5.0,
+	poll_interval: float = 0.05,
+) -> Tuple[Any, bool]:
+	"""
+	Return ``(value, cached)`` for key, recomputing it at most once at a time
+
+	- Single flight: on a miss one caller computes under a lock and the others
+	  wait for its result (computing themselves only after ``wait`` seconds).
+	- Probabilistic early refresh (XFetch): before the ``timeout`` expiry a
+	  caller may refresh early, more likely the closer the expiry and the
+	  slower the last computation (scaled by ``beta``), so hot keys are
+	  usually refreshed before they ever expire.
+	- Stale-while-revalidate: entries are kept ``stale_timeout`` seconds past
+	  expiry (default: ``timeout``); while one caller refreshes, the others
+	  keep serving the previous value.
+	"""
+	cache = caches[alias]
+	stale_timeout = timeout if stale_timeout is None else stale_timeout
+	lock_key = _lock_key(key)
+
+	entry = cache.get(key)
+	if isinstance(entry, CacheEntry):
+		# 1 - random() is in (0, 1], so the log is <= 0 and pulls expiry earlier
+		if time.time() - entry.delta * beta * math.log(1.0 - random.random()) < entry.expires_at:
+			return entry.value, True
+		if not cache.add(lock_key, 1, timeout=lock_timeout):
+			return entry.value, True
+	elif not cache.add(lock_key, 1, timeout=lock_timeout):
+		entry = _wait_for(cache, key, wait, poll_interval)
+		if isinstance(entry, CacheEntry):
+			return entry.value, True
+		return compute(), False
+
+	try:
+		started = time.monotonic()
+		value = compute()
+		entry = CacheEntry(value, time.time() + timeout, time.monotonic() - started)
+		cache.set(key, entry, timeout + stale_timeout)
+	finally:
+		cache.delete(lock_key)
+	return value, False
+
+
+def _lock_key(key: str) -> str:
+	return f"{LOCK_PREFIX}:{key}"
+
+
+def _wait_for(cache, key: str, wait: float, poll_interval: float) -> Any:
+	"""Poll until another worker stores key; returns _MISSING after ``wait`` seconds"""
+	deadline = time.monotonic() + wait
+	while time.monotonic() < deadline:
+		time.sleep(poll_interval)
+		value = cache.get(key, _MISSING)
+		if value is not _MISSING:
+			return value
+	return _MISSING
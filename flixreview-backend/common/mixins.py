@@ -1,6 +1,15 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .response_cache import (
+	build_response, get_cached_response, normalized_query, response_cache_key, store_response, tag_versions,
+)
 from .responses import build_success_payload
 
 
@@ -34,3 +43,134 @@ class ApiResponseMixin(APIView):
 
 	def get_success_message(self, method: str) -> str:
 		return self.success_messages.get(method, self._default_messages.get(method, 'Request successful'))
+
+
+class ReadHandlerMixin:
+	"""
+	Base for mixins that wrap GET handling
+
+	Each mixin overrides handle_get() and calls super().handle_get() to run
+	the rest of the chain, so several can be stacked. Generic views are
+	covered through get(); viewsets route their list/retrieve actions through
+	handle_get().
+	"""
+
+	def get(self, request, *args, **kwargs):
+		return self.handle_get(super().get, request, *args, **kwargs)
+
+	def handle_get(self, handler, request, *args, **kwargs):
+		return handler(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(ReadHandlerMixin):
+	"""
+	ETag / Last-Modified revalidation for read endpoints
+
+	Views implement get_validators() from version stamps that every write to
+	the rendered data moves and return ``(etag_parts, last_modified)``; sums
+	or maxima over the rows are not validators, as offsetting writes leave
+	them unchanged. It runs after authentication and permission checks but
+	before the view's queryset and serializer, so a matching If-None-Match
+	or If-Modified-Since gets a 304 without either.
+	ETags are weak because the response envelope carries a timestamp.
+	"""
+	# Set when the payload depends on the requesting user
+	conditional_vary_on_user = False
+
+	def get_validators(self, request, *args, **kwargs):
+		"""Return (etag parts or None, last modified datetime or None); (None, None) disables the check"""
+		return None, None
+
+	def handle_get(self, handler, request, *args, **kwargs):
+		etag_parts, last_modified = self.get_validators(request, *args, **kwargs)
+		if etag_parts is None and last_modified is None:
+			return super().handle_get(handler, request, *args, **kwargs)
+
+		if etag_parts is not None:
+			renderer = getattr(request, 'accepted_renderer', None)
+			parts = [request.path, normalized_query(request.query_params), getattr(renderer, 'format', None), *etag_parts]
+			if self.conditional_vary_on_user:
+				parts.append(request.user.pk)
+			digest = hashlib.md5(repr(parts).encode('utf-8'), usedforsecurity=False).hexdigest()
+			etag = f'W/{quote_etag(digest)}'
+		else:
+			etag = None
+		timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+		response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+		if response is None:
+			response = super().handle_get(handler, request, *args, **kwargs)
+			if response.status_code != 200:
+				return response
+		elif not isinstance(response, HttpResponseNotModified):
+			# 412 from a failed If-Match / If-Unmodified-Since
+			return response
+
+		if etag is not None:
+			response['ETag'] = etag
+		if timestamp is not None:
+			response['Last-Modified'] = http_date(timestamp)
+		if self.conditional_vary_on_user:
+			patch_vary_headers(response, ['Authorization', 'Cookie'])
+		return response
+
+
+class AnonymousResponseCacheMixin(ReadHandlerMixin):
+	"""
+	Serve anonymous GETs from rendered responses in the http cache
+
+	Entries are keyed by path, normalised query string and negotiated
+	renderer format (responses carry ``Vary: Accept``) and tagged with
+	``response_cache_tags`` plus whatever get_response_cache_tags() derives
+	from the payload (e.g. ``movie:<id>`` per rendered movie); purge_tags()
+	in model signals invalidates them (see common.response_cache). List it
+	first so a hit skips every other mixin, the database and serializers.
+	Authenticated requests always bypass the cache.
+	"""
+	response_cache_tags = ()
+	response_cache_timeout = None
+
+	def get_response_cache_tags(self, data):
+		"""Return the tags of a successful response built from ``data`` (the unwrapped payload)"""
+		return set(self.response_cache_tags)
+
+	def get_response_cache_timeout(self):
+		if self.response_cache_timeout is None:
+			return settings.RESPONSE_CACHE_TTL
+		return self.response_cache_timeout
+
+	def handle_get(self, handler, request, *args, **kwargs):
+		if request.method != 'GET' or request.user.is_authenticated:
+			return super().handle_get(handler, request, *args, **kwargs)
+
+		key = response_cache_key(request)
+		entry = get_cached_response(key)
+		if entry is not None:
+			etag = entry['headers'].get('ETag')
+			response = get_conditional_response(request, etag=etag) if etag else None
+			if response is None:
+				response = build_response(entry)
+			elif etag:
+				response['ETag'] = etag
+			response['X-Cache'] = 'HIT'
+			return response
+
+		# Static tag versions are read before rendering, so a purge racing the render wins
+		versions = tag_versions(self.response_cache_tags)
+		response = super().handle_get(handler, request, *args, **kwargs)
+		if response.status_code == 200 and isinstance(response, Response):
+			tags = set(self.get_response_cache_tags(response.data)) - set(versions)
+			versions.update(tag_versions(tags))
+			self._response_cache_entry = (key, versions)
+		return response
+
+	def finalize_response(self, request, response, *args, **kwargs):
+		response = super().finalize_response(request, response, *args, **kwargs)
+		pending = self.__dict__.pop('_response_cache_entry', None)
+		if pending is not None and response.status_code == 200:
+			key, versions = pending
+			patch_vary_headers(response, ['Accept'])
+			response.render()
+			store_response(key, response, versions, self.get_response_cache_timeout())
+			response['X-Cache'] = 'MISS'
+		return response
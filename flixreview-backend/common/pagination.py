@@ -1,5 +1,17 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class DefaultPagination(PageNumberPagination):
@@ -17,3 +29,235 @@ class DefaultPagination(PageNumberPagination):
 			'previous': self.get_previous_link(),
 			'results': data,
 		})
+
+
+class CursorEncoder(json.JSONEncoder):
+	"""Full-precision JSON for cursor positions (DjangoJSONEncoder drops microseconds)"""
+
+	def default(self, o):
+		if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+			return o.isoformat()
+		if isinstance(o, (decimal.Decimal, uuid.UUID)):
+			return str(o)
+		return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+	"""
+	Cursor pagination on a composite key such as (created_at, id)
+
+	Each page is a range scan that starts after the last row of the previous
+	one (``WHERE (created_at, id) < (:created_at, :id)``), so deep pages cost
+	the same as the first and no COUNT is run. The key is the queryset's
+	ordering (OrderingFilter or Meta.ordering) with the primary key appended
+	as a tiebreaker; ordering fields must not be nullable.
+	"""
+	page_size = 10
+	page_size_query_param = 'page_size'
+	max_page_size = 100
+	cursor_query_param = 'cursor'
+	invalid_cursor_message = 'Invalid cursor'
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		self.page_size = self.get_page_size(request)
+		self.ordering = self.get_ordering(queryset)
+		position, reverse = self.decode_cursor(request, queryset)
+
+		ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+		queryset = queryset.order_by(*ordering)
+		if position is not None:
+			queryset = queryset.filter(self._after(ordering, position))
+
+		rows = list(queryset[:self.page_size + 1])
+		has_more = len(rows) > self.page_size
+		rows = rows[:self.page_size]
+		if reverse:
+			rows.reverse()
+
+		self.has_next = has_more if not reverse else position is not None
+		self.has_previous = has_more if reverse else position is not None
+		self.rows = rows
+		return rows
+
+	def get_page_size(self, request):
+		if self.page_size_query_param:
+			try:
+				return _positive_int(
+					request.query_params[self.page_size_query_param],
+					strict=True,
+					cutoff=self.max_page_size
+				)
+			except (KeyError, ValueError):
+				pass
+		return self.page_size
+
+	def get_ordering(self, queryset):
+		ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+		ordering = ['id' if field == 'pk' else '-id' if field == '-pk' else field for field in ordering]
+		if any(not isinstance(field, str) or field == '?' for field in ordering):
+			raise NotFound('Cursor pagination needs an ordering on model fields')
+		if not {'id', '-id'} & set(ordering):
+			last_descending = bool(ordering) and ordering[-1].startswith('-')
+			ordering.append('-id' if last_descending else 'id')
+		return ordering
+
+	def decode_cursor(self, request, queryset):
+		encoded = request.query_params.get(self.cursor_query_param)
+		if not encoded:
+			return None, False
+		try:
+			cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+			position, reverse = cursor['p'], bool(cursor.get('r'))
+		except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+			raise NotFound(self.invalid_cursor_message)
+		if not isinstance(position, list) or len(position) != len(self.ordering):
+			raise NotFound(self.invalid_cursor_message)
+
+		# Cursors come from clients: coerce each value to its field's type
+		# so a tampered one is a 404, not a database error
+		values = []
+		for field, value in zip(self.ordering, position):
+			if value is None or isinstance(value, (dict, list)):
+				raise NotFound(self.invalid_cursor_message)
+			try:
+				values.append(self._ordering_field(queryset, field.lstrip('-')).to_python(value))
+			except (ValidationError, TypeError, ValueError, decimal.InvalidOperation):
+				raise NotFound(self.invalid_cursor_message)
+		return values, reverse
+
+	def encode_cursor(self, row, reverse=False):
+		position = [attrgetter(field.lstrip('-').replace('__', '.'))(row) for field in self.ordering]
+		payload = json.dumps({'p': position, 'r': reverse} if reverse else {'p': position}, cls=CursorEncoder)
+		encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+		return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+	def get_next_link(self):
+		if not self.has_next or not self.rows:
+			return None
+		return self.encode_cursor(self.rows[-1])
+
+	def get_previous_link(self):
+		if not self.has_previous:
+			return None
+		if not self.rows:
+			return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, '')
+		return self.encode_cursor(self.rows[0], reverse=True)
+
+	def get_paginated_response(self, data):
+		return Response({
+			'page_size': self.page_size,
+			'next': self.get_next_link(),
+			'previous': self.get_previous_link(),
+			'results': data,
+		})
+
+	@staticmethod
+	def _ordering_field(queryset, name):
+		annotation = queryset.query.annotations.get(name)
+		if annotation is not None:
+			return annotation.output_field
+		model = queryset.model
+		*relations, last = name.split('__')
+		try:
+			for relation in relations:
+				model = model._meta.get_field(relation).related_model
+			return model._meta.get_field(last)
+		except (FieldDoesNotExist, AttributeError):
+			raise NotFound('Cursor pagination needs an ordering on model fields')
+
+	@staticmethod
+	def _flip(field):
+		return field[1:] if field.startswith('-') else f'-{field}'
+
+	@staticmethod
+	def _after(ordering, position):
+		"""(a, b) after (x, y) expands to a > x OR (a = x AND b > y), per field direction"""
+		condition = Q()
+		for index, field in enumerate(ordering):
+			name = field.lstrip('-')
+			lookup = 'lt' if field.startswith('-') else 'gt'
+			equal = {previous.lstrip('-'): value for previous, value in zip(ordering[:index], position)}
+			condition |= Q(**equal, **{f'{name}__{lookup}': position[index]})
+		return condition
+
+
+class CursorOptInPagination(DefaultPagination):
+	"""
+	Page-number pagination that switches to keyset pagination on ``?cursor=``
+
+	``?cursor=`` (empty for the first page) returns KeysetPagination pages
+	for infinite scroll. Page-number requests can skip the COUNT with
+	``?count=false``; ``count`` is then null and ``next`` is derived from one
+	extra row.
+	"""
+	cursor_pagination_class = KeysetPagination
+	count_query_param = 'count'
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.request = request
+		self.keyset = None
+		self.count_free = False
+
+		if self.cursor_pagination_class.cursor_query_param in request.query_params:
+			self.keyset = self.cursor_pagination_class()
+			return self.keyset.paginate_queryset(queryset, request, view)
+
+		if request.query_params.get(self.count_query_param, '').lower() in ('false', '0'):
+			return self._paginate_without_count(queryset, request)
+
+		return super().paginate_queryset(queryset, request, view)
+
+	def get_schema_operation_parameters(self, view):
+		return super().get_schema_operation_parameters(view) + [
+			{
+				'name': self.cursor_pagination_class.cursor_query_param,
+				'required': False,
+				'in': 'query',
+				'description': 'Keyset cursor from a previous next/previous link; pass it empty for the first page',
+				'schema': {'type': 'string'},
+			},
+			{
+				'name': self.count_query_param,
+				'required': False,
+				'in': 'query',
+				'description': 'Set to false to skip the total count on page-number requests',
+				'schema': {'type': 'boolean'},
+			},
+		]
+
+	def _paginate_without_count(self, queryset, request):
+		self.count_free = True
+		self.page_size_value = self.get_page_size(request) or self.page_size
+		try:
+			self.page_number = _positive_int(request.query_params.get(self.page_query_param, 1), strict=True)
+		except ValueError:
+			raise NotFound(self.invalid_page_message)
+
+		offset = (self.page_number - 1) * self.page_size_value
+		rows = list(queryset[offset:offset + self.page_size_value + 1])
+		self.has_next = len(rows) > self.page_size_value
+		return rows[:self.page_size_value]
+
+	def get_paginated_response(self, data):
+		if self.keyset is not None:
+			return self.keyset.get_paginated_response(data)
+		if not self.count_free:
+			return super().get_paginated_response(data)
+
+		url = self.request.build_absolute_uri()
+		previous_link = None
+		if self.page_number > 1:
+			previous_link = (
+				remove_query_param(url, self.page_query_param)
+				if self.page_number == 2
+				else replace_query_param(url, self.page_query_param, self.page_number - 1)
+			)
+		return Response({
+			'count': None,
+			'page': self.page_number,
+			'page_size': self.page_size_value,
+			'next': replace_query_param(url, self.page_query_param, self.page_number + 1) if self.has_next else None,
+			'previous': previous_link,
+			'results': data,
+		})
@@ -0,0 +1,109 @@
+"""
+Full-response cache for anonymous reads, purged by surrogate tags
+
+A cached entry is the rendered response (body bytes plus the headers that
+matter for revalidation) stored in the ``http`` cache under the request
+path, normalised query string and negotiated format, together with the version of every tag
+it was rendered from (``movie:<id>``, ``genre:<id>``, ``leaderboards``,
+...). Purging a tag just moves its version, so every entry carrying it
+stops matching at once; a hit costs one cache read for the entry and one
+``get_many`` for its tag versions, and never touches the database.
+"""
+import hashlib
+import uuid
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+CACHE_ALIAS = 'http'
+
+# Response headers replayed on a hit
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+
+def get_cache():
+	return caches[CACHE_ALIAS]
+
+
+def _tag_key(tag: str) -> str:
+	return f'response-tag:{tag}'
+
+
+def normalized_query(query_params) -> str:
+	"""Query string with keys sorted, values sorted per key and blanks dropped"""
+	items = []
+	for key in sorted(query_params.keys()):
+		for value in sorted(query_params.getlist(key)):
+			if value.strip():
+				items.append(f'{key}={value.strip()}')
+	return '&'.join(items)
+
+
+def response_cache_key(request) -> str:
+	# The browsable API renders HTML at the same URL as the JSON clients read
+	renderer = getattr(request, 'accepted_renderer', None)
+	renderer_format = renderer.format if renderer is not None else ''
+	signature = f'{request.path}?{normalized_query(request.query_params)}#{renderer_format}'
+	return f"response:{hashlib.sha1(signature.encode('utf-8')).hexdigest()}"
+
+
+def tag_versions(tags: Iterable[str]) -> Dict[str, str]:
+	"""Return {tag: version}, starting a version for tags never seen (or evicted)"""
+	cache = get_cache()
+	tags = list(tags)
+	found = cache.get_many([_tag_key(tag) for tag in tags])
+	missing = [tag for tag in tags if _tag_key(tag) not in found]
+	for tag in missing:
+		cache.add(_tag_key(tag), uuid.uuid4().hex, None)
+	if missing:
+		found.update(cache.get_many([_tag_key(tag) for tag in missing]))
+	return {tag: found.get(_tag_key(tag)) for tag in tags}
+
+
+def purge_tags(*tags: str) -> None:
+	"""Invalidate every cached response rendered from any of ``tags``"""
+	if tags:
+		get_cache().set_many({_tag_key(tag): uuid.uuid4().hex for tag in set(tags)}, None)
+
+
+def purge_tags_throttled(tag: str, interval: int) -> None:
+	"""
+	Purge ``tag`` at most once per ``interval`` seconds
+
+	For tags that high-rate writes would otherwise purge on every write.
+	Writes in between are not purged for, so entries carrying the tag must
+	expire within ``interval`` (see RESPONSE_CACHE_RANKED_TTL).
+	"""
+	if get_cache().add(f'response-purge:{tag}', 1, interval):
+		purge_tags(tag)
+
+
+def get_cached_response(key: str) -> Optional[dict]:
+	cache = get_cache()
+	entry = cache.get(key)
+	if entry is None:
+		return None
+	current = cache.get_many([_tag_key(tag) for tag in entry['tags']])
+	if any(current.get(_tag_key(tag)) != version for tag, version in entry['tags'].items()):
+		return None
+	return entry
+
+
+def store_response(key: str, response, versions: Dict[str, str], timeout: int) -> None:
+	"""Store a rendered response with the tag versions it was built from"""
+	entry = {
+		'status': response.status_code,
+		'content': response.content,
+		'headers': {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+		'tags': versions,
+	}
+	get_cache().set(key, entry, timeout)
+
+
+def build_response(entry: dict) -> HttpResponse:
+	response = HttpResponse(entry['content'], status=entry['status'])
+	for name, value in entry['headers'].items():
+		response[name] = value
+	return response
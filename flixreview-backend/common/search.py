@@ -0,0 +1,387 @@
+"""
+Full-text search backends
+
+Models register a search document (text columns with A-D weights) from
+their AppConfig.ready(), and an InstallSearchIndex migration operation
+creates the index for the database vendor, which keeps it current on
+write:
+
+- PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index
+- SQLite: an FTS5 external-content table kept in sync by triggers
+- anything else: case-insensitive LIKE, unranked
+
+``search()`` filters a queryset to matching rows (or rows whose related
+document matches, e.g. a review's movie) and annotates ``search_rank``,
+where higher is more relevant. Query terms match as prefixes and all terms
+must match.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connections
+from django.db.migrations.operations.base import Operation
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+
+MAX_QUERY_TERMS = 8
+
+# ts_rank's default label weights, reused as bm25 column weights on SQLite
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+	model: type
+	fields: Tuple[Tuple[str, str], ...]
+
+	@property
+	def table(self) -> str:
+		return self.model._meta.db_table
+
+	@property
+	def pk_column(self) -> str:
+		return self.model._meta.pk.column
+
+	@property
+	def columns(self) -> List[str]:
+		return [self.model._meta.get_field(name).column for name, _ in self.fields]
+
+
+_documents: Dict[type, SearchDocument] = {}
+
+
+def register_search_document(model, fields: Dict[str, str]) -> None:
+	"""Index ``fields`` ({field name: weight 'A'-'D'}) of model for full-text search"""
+	_documents[model] = SearchDocument(model, tuple(fields.items()))
+
+
+def get_search_document(model) -> SearchDocument:
+	return _documents[model]
+
+
+def search_terms(query: str) -> List[str]:
+	"""Split user input into plain word tokens, so no query syntax reaches the database"""
+	return re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+
+
+class BaseSearchBackend:
+	def __init__(self, connection):
+		self.connection = connection
+		self.quote = connection.ops.quote_name
+
+	def install(self, document: SearchDocument) -> None:
+		"""Create the index structures for document if they are missing"""
+
+	def is_installed(self, document: SearchDocument) -> bool:
+		return True
+
+	def uninstall(self, document: SearchDocument) -> None:
+		"""Drop the index structures of document"""
+
+	def rebuild(self, document: SearchDocument) -> None:
+		"""Re-index every row of document"""
+
+	def search(self, queryset, query: str, related: Sequence[str] = ()):
+		terms = search_terms(query)
+		if not terms:
+			return queryset.none()
+
+		model = queryset.model
+		targets = [(get_search_document(model), model._meta.pk.column)]
+		for name in related:
+			field = model._meta.get_field(name)
+			targets.append((get_search_document(field.related_model), field.column))
+
+		match_sql, match_params, rank_sql, rank_params = [], [], [], []
+		for document, column in targets:
+			ref = f'{self.quote(model._meta.db_table)}.{self.quote(column)}'
+			sql, params = self.match_ids_sql(document, terms)
+			match_sql.append(f'{ref} IN ({sql})')
+			match_params.extend(params)
+			sql, params = self.rank_sql(document, terms, ref)
+			rank_sql.append(sql)
+			rank_params.extend(params)
+
+		return (
+			queryset
+			.filter(RawSQL(' OR '.join(match_sql), match_params, output_field=BooleanField()))
+			.annotate(search_rank=RawSQL(' + '.join(rank_sql), rank_params, output_field=FloatField()))
+		)
+
+	def match_ids_sql(self, document: SearchDocument, terms: List[str]) -> Tuple[str, list]:
+		raise NotImplementedError
+
+	def rank_sql(self, document: SearchDocument, terms: List[str], ref: str) -> Tuple[str, list]:
+		raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+	config = 'english'
+	column = 'search_vector'
+
+	def _vector_sql(self, document):
+		return ' || '.join(
+			f"setweight(to_tsvector('{self.config}', coalesce({self.quote(column)}, '')), '{weight}')"
+			for column, (_, weight) in zip(document.columns, document.fields)
+		)
+
+	def install(self, document):
+		table = self.quote(document.table)
+		with self.connection.cursor() as cursor:
+			cursor.execute(
+				f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {self.column} tsvector '
+				f'GENERATED ALWAYS AS ({self._vector_sql(document)}) STORED'
+			)
+			cursor.execute(
+				f'CREATE INDEX IF NOT EXISTS {self.quote(document.table + "_search_idx")} '
+				f'ON {table} USING GIN ({self.column})'
+			)
+
+	def is_installed(self, document):
+		with self.connection.cursor() as cursor:
+			columns = self.connection.introspection.get_table_description(cursor, document.table)
+		return any(column.name == self.column for column in columns)
+
+	def uninstall(self, document):
+		with self.connection.cursor() as cursor:
+			cursor.execute(f'DROP INDEX IF EXISTS {self.quote(document.table + "_search_idx")}')
+			cursor.execute(f'ALTER TABLE {self.quote(document.table)} DROP COLUMN IF EXISTS {self.column}')
+
+	def _tsquery(self, terms):
+		return ' & '.join(f'{term}:*' for term in terms)
+
+	def match_ids_sql(self, document, terms):
+		return (
+			f'SELECT {self.quote(document.pk_column)} FROM {self.quote(document.table)} '
+			f"WHERE {self.column} @@ to_tsquery('{self.config}', %s)",
+			[self._tsquery(terms)],
+		)
+
+	def rank_sql(self, document, terms, ref):
+		return (
+			f"COALESCE((SELECT ts_rank({self.column}, to_tsquery('{self.config}', %s)) "
+			f'FROM {self.quote(document.table)} WHERE {self.quote(document.pk_column)} = {ref}), 0)',
+			[self._tsquery(terms)],
+		)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+	tokenizer = 'porter unicode61'
+
+	def _fts_table(self, document):
+		return f'{document.table}_fts'
+
+	def install(self, document):
+		fts = self._fts_table(document)
+		table = self.quote(document.table)
+		pk = self.quote(document.pk_column)
+		columns = [self.quote(column) for column in document.columns]
+		column_list = ', '.join(columns)
+		new_values = ', '.join(f'new.{column}' for column in columns)
+		old_values = ', '.join(f'old.{column}' for column in columns)
+
+		with self.connection.cursor() as cursor:
+			exists = fts in self.connection.introspection.table_names(cursor)
+			cursor.execute(
+				f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.quote(fts)} USING fts5('
+				f"{column_list}, content={table}, content_rowid={pk}, tokenize='{self.tokenizer}')"
+			)
+			delete_old = (
+				f"INSERT INTO {self.quote(fts)}({self.quote(fts)}, rowid, {column_list}) "
+				f"VALUES ('delete', old.{pk}, {old_values});"
+			)
+			insert_new = f'INSERT INTO {self.quote(fts)}(rowid, {column_list}) VALUES (new.{pk}, {new_values});'
+			cursor.execute(
+				f'CREATE TRIGGER IF NOT EXISTS {self.quote(fts + "_ai")} AFTER INSERT ON {table} '
+				f'BEGIN {insert_new} END'
+			)
+			cursor.execute(
+				f'CREATE TRIGGER IF NOT EXISTS {self.quote(fts + "_ad")} AFTER DELETE ON {table} '
+				f'BEGIN {delete_old} END'
+			)
+			cursor.execute(
+				f'CREATE TRIGGER IF NOT EXISTS {self.quote(fts + "_au")} AFTER UPDATE OF {column_list} ON {table} '
+				f'BEGIN {delete_old} {insert_new} END'
+			)
+		if not exists:
+			self.rebuild(document)
+
+	def is_installed(self, document):
+		return self._fts_table(document) in self.connection.introspection.table_names()
+
+	def uninstall(self, document):
+		fts = self._fts_table(document)
+		with self.connection.cursor() as cursor:
+			for suffix in ('_ai', '_ad', '_au'):
+				cursor.execute(f'DROP TRIGGER IF EXISTS {self.quote(fts + suffix)}')
+			cursor.execute(f'DROP TABLE IF EXISTS {self.quote(fts)}')
+
+	def rebuild(self, document):
+		fts = self.quote(self._fts_table(document))
+		with self.connection.cursor() as cursor:
+			cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+	def _match(self, terms):
+		return ' '.join(f'"{term}"*' for term in terms)
+
+	def match_ids_sql(self, document, terms):
+		fts = self.quote(self._fts_table(document))
+		return f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [self._match(terms)]
+
+	def rank_sql(self, document, terms, ref):
+		fts = self.quote(self._fts_table(document))
+		weights = ', '.join(str(WEIGHTS[weight]) for _, weight in document.fields)
+		# bm25() is lower-is-better; negate it so every backend ranks high-to-low
+		return (
+			f'COALESCE((SELECT -bm25({fts}, {weights}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {ref}), 0)',
+			[self._match(terms)],
+		)
+
+
+class LikeSearchBackend(BaseSearchBackend):
+	"""Unindexed fallback for databases without a native full-text engine"""
+
+	def search(self, queryset, query, related=()):
+		terms = search_terms(query)
+		if not terms:
+			return queryset.none()
+
+		prefixes = [''] + [f'{name}__' for name in related]
+		models = [queryset.model] + [queryset.model._meta.get_field(name).related_model for name in related]
+		condition = Q()
+		for prefix, model in zip(prefixes, models):
+			document_match = Q()
+			for term in terms:
+				document_match &= Q(*[
+					Q(**{f'{prefix}{name}__icontains': term}) for name, _ in get_search_document(model).fields
+				], _connector=Q.OR)
+			condition |= document_match
+		return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+	'postgresql': PostgresSearchBackend,
+	'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using: str = 'default') -> BaseSearchBackend:
+	connection = connections[using]
+	return BACKENDS.get(connection.vendor, LikeSearchBackend)(connection)
+
+
+def search(queryset, query: str, related: Sequence[str] = ()):
+	"""Filter queryset to rows matching query and annotate ``search_rank``"""
+	return get_search_backend(queryset.db).search(queryset, query, related)
+
+
+def install_search_indexes(
+	using: str = 'default',
+	rebuild: bool = False,
+	repair_only: bool = False,
+	app_labels: Optional[Iterable[str]] = None,
+) -> List[str]:
+	"""
+	Install (and optionally rebuild) the index of every registered document whose table exists
+
+	With repair_only, documents whose index has not been installed (or was
+	dropped by unapplying its migration) are left alone; app_labels limits
+	the documents to those apps' models.
+	"""
+	backend = get_search_backend(using)
+	tables = set(backend.connection.introspection.table_names())
+	installed = []
+	for document in _documents.values():
+		if document.table not in tables or (repair_only and not backend.is_installed(document)):
+			continue
+		if app_labels is not None and document.model._meta.app_label not in app_labels:
+			continue
+		backend.install(document)
+		if rebuild:
+			backend.rebuild(document)
+		installed.append(document.table)
+	return installed
+
+
+class InstallSearchIndex(Operation):
+	"""
+	Migration operation installing a model's search index for the database vendor
+
+	``fields`` is frozen in the migration like any other schema. Reversing
+	it drops the index, so a migration altering an indexed column can unapply
+	it first (PostgreSQL refuses to alter a column a generated column reads)
+	and apply it again afterwards.
+	"""
+	reduces_to_sql = False
+	reversible = True
+
+	def __init__(self, model_name: str, fields: Dict[str, str]):
+		self.model_name = model_name
+		self.fields = fields
+
+	def state_forwards(self, app_label, state):
+		pass
+
+	def _run(self, action, app_label, schema_editor, state):
+		model = state.apps.get_model(app_label, self.model_name)
+		if self.allow_migrate_model(schema_editor.connection.alias, model):
+			backend = get_search_backend(schema_editor.connection.alias)
+			getattr(backend, action)(SearchDocument(model, tuple(self.fields.items())))
+
+	def database_forwards(self, app_label, schema_editor, from_state, to_state):
+		self._run('install', app_label, schema_editor, to_state)
+
+	def database_backwards(self, app_label, schema_editor, from_state, to_state):
+		self._run('uninstall', app_label, schema_editor, from_state)
+
+	def describe(self):
+		return f'Install the full-text search index of {self.model_name}'
+
+	@property
+	def migration_name_fragment(self):
+		return f'{self.model_name.lower()}_search_index'
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+	"""
+	Filter backend for registered search documents
+
+	The query is read from the view's ``search_params`` (default: ``search``)
+	and ``search_related`` names foreign keys whose documents also match.
+	List it after OrderingFilter: without an explicit ``?ordering=`` the
+	results are ordered by relevance.
+	"""
+	search_param = 'search'
+	ordering_param = 'ordering'
+
+	def get_search_query(self, request, view) -> str:
+		for param in getattr(view, 'search_params', (self.search_param,)):
+			value = request.query_params.get(param, '').strip()
+			if value:
+				return value
+		return ''
+
+	def filter_queryset(self, request, queryset, view):
+		query = self.get_search_query(request, view)
+		if not query:
+			return queryset
+
+		queryset = search(queryset, query, getattr(view, 'search_related', ()))
+		if not request.query_params.get(self.ordering_param):
+			queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+		return queryset
+
+	def get_schema_operation_parameters(self, view):
+		return [
+			{
+				'name': param,
+				'required': False,
+				'in': 'query',
+				'description': 'Full-text search terms (prefix match, results ranked by relevance)',
+				'schema': {'type': 'string'},
+			}
+			for param in getattr(view, 'search_params', (self.search_param,))
+		]
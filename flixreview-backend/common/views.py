@@ -48,27 +48,31 @@ def health_check(request):
 		}
 		overall_healthy = False
 	
-	# Redis health check (if configured)
-	try:
-		from django.core.cache import cache
-		cache.set('health_check', 'ok', 10)
-		if cache.get('health_check') == 'ok':
-			checks['cache'] = {
-				'status': 'up',
-				'message': 'Cache connection successful'
-			}
-		else:
-			checks['cache'] = {
-				'status': 'down',
-				'message': 'Cache verification failed'
+	# Cache health check, one entry per configured alias
+	from django.conf import settings
+	from django.core.cache import caches
+	for alias in settings.CACHES:
+		name = 'cache' if alias == 'default' else f'cache:{alias}'
+		try:
+			cache = caches[alias]
+			cache.set('health_check', 'ok', 10)
+			if cache.get('health_check') == 'ok':
+				checks[name] = {
+					'status': 'up',
+					'message': 'Cache connection successful'
+				}
+			else:
+				checks[name] = {
+					'status': 'down',
+					'message': 'Cache verification failed'
+				}
+				overall_healthy = False
+		except Exception as e:
+			checks[name] = {
+				'status': 'degraded',
+				'message': f'Cache not configured or failed: {str(e)}'
 			}
-			overall_healthy = False
-	except Exception as e:
-		checks['cache'] = {
-			'status': 'degraded',
-			'message': f'Cache not configured or failed: {str(e)}'
-		}
-		# Cache is optional, don't mark as unhealthy
+			# Cache is optional, don't mark as unhealthy
 	
 	health_status['checks'] = checks
 	health_status['status'] = 'healthy' if overall_healthy else 'unhealthy'
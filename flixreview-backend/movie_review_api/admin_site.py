@@ -53,9 +53,7 @@ class CustomAdminSite(AdminSite):
 
         # Movie statistics
         total_movies = Movie.objects.count()
-        movies_with_reviews = Movie.objects.annotate(
-            review_count=Count('reviews')
-        ).filter(review_count__gt=0).count()
+        movies_with_reviews = Movie.objects.filter(review_count__gt=0).count()
         avg_rating_global = Movie.objects.filter(avg_rating__gt=0).aggregate(
             avg=Avg('avg_rating')
         )['avg'] or 0
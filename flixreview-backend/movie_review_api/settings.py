@@ -243,11 +243,85 @@ LOGGING = {
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# =======================
+# Cache Settings
+# =======================
+# One alias per subsystem so each can be sized, flushed and monitored on its
+# own: recommendations (large ML payloads), ratelimit (small hot counters)
+# and http (rendered responses). With REDIS_URL unset every alias falls back
+# to a per-process LocMem cache, which is what tests and local runs use.
+REDIS_URL = env('REDIS_URL', default='')
+CACHE_KEY_PREFIX = env('CACHE_KEY_PREFIX', default='flixreview')
+REDIS_MAX_CONNECTIONS = env.int('REDIS_MAX_CONNECTIONS', default=50)
+
+
+def redis_cache(alias, timeout, compress=True, ignore_exceptions=True):
+    options = {
+        'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        # Shared per-process pool instead of a connection per request
+        'CONNECTION_POOL_KWARGS': {
+            'max_connections': REDIS_MAX_CONNECTIONS,
+            'retry_on_timeout': True,
+            'health_check_interval': 30,
+        },
+        'SOCKET_CONNECT_TIMEOUT': 2,
+        'SOCKET_TIMEOUT': 2,
+        # Pickle keeps non-string dict keys and dates intact; integers are
+        # stored raw by django-redis so incr() still works
+        'SERIALIZER': 'django_redis.serializers.pickle.PickleSerializer',
+        # A cache outage degrades to recomputation instead of a 500
+        'IGNORE_EXCEPTIONS': ignore_exceptions,
+    }
+    if compress:
+        # Recommendation lists and rendered pages compress well
+        options['COMPRESSOR'] = 'django_redis.compressors.zlib.ZlibCompressor'
+    return {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': f'{CACHE_KEY_PREFIX}:{alias}',
+        'TIMEOUT': timeout,
+        'OPTIONS': options,
+    }
+
+
+def local_cache(alias, timeout):
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'{CACHE_KEY_PREFIX}-{alias}',
+        'TIMEOUT': timeout,
+    }
+
+
+if REDIS_URL:
+    CACHES = {
+        'default': redis_cache('default', 300),
+        'recommendations': redis_cache('recommendations', 3600),
+        # Counters must not be silently dropped, or limits stop applying
+        'ratelimit': redis_cache('ratelimit', 3600, compress=False, ignore_exceptions=False),
+        'http': redis_cache('http', 300),
+    }
+else:
+    CACHES = {
+        'default': local_cache('default', 300),
+        'recommendations': local_cache('recommendations', 3600),
+        'ratelimit': local_cache('ratelimit', 3600),
+        'http': local_cache('http', 300),
+    }
+
+# Seconds an anonymous rendered response may be served from the http cache;
+# model signals purge entries by tag long before this (common.response_cache)
+RESPONSE_CACHE_TTL = env.int('RESPONSE_CACHE_TTL', default=300)
+# Shorter lifetime for cached lists whose membership or order follows ratings
+# (rating-ordered movie pages, leaderboards): rating changes only purge the
+# movies they touch, so such lists catch up on expiry
+RESPONSE_CACHE_RANKED_TTL = env.int('RESPONSE_CACHE_RANKED_TTL', default=30)
+
+
 # =======================
 # Rate Limiting Settings
 # =======================
 RATELIMIT_ENABLE = env.bool('RATELIMIT_ENABLE', default=True)
-RATELIMIT_USE_CACHE = 'default'
+RATELIMIT_USE_CACHE = 'ratelimit'
 RATELIMIT_VIEW = 'common.exceptions.custom_exception_handler'
 
 
@@ -255,3 +329,29 @@ RATELIMIT_VIEW = 'common.exceptions.custom_exception_handler'
 # TMDB API Configuration
 # =======================
 TMDB_API_KEY = env('TMDB_API_KEY', default='')
+
+
+# =======================
+# Movie Browse
+# =======================
+# Seconds an autocomplete response is cached per prefix (server and client side)
+MOVIE_AUTOCOMPLETE_TTL = env.int('MOVIE_AUTOCOMPLETE_TTL', default=30)
+# Seconds facet counts (/api/movies/facets/) are cached per filter set; movie writes invalidate them
+MOVIE_FACETS_TTL = env.int('MOVIE_FACETS_TTL', default=300)
+
+
+# =======================
+# Recommendation Models
+# =======================
+# Directory holding prebuilt recommendation artifacts (see build_content_model)
+RECOMMENDATION_MODEL_DIR = env('RECOMMENDATION_MODEL_DIR', default=str(BASE_DIR / 'var' / 'recommendations'))
+# Precomputed recommendation lists older than this (seconds) are recomputed on demand
+PRECOMPUTED_RECOMMENDATIONS_MAX_AGE = env.int('PRECOMPUTED_RECOMMENDATIONS_MAX_AGE', default=86400)
+# Seconds the homepage recommendations dashboard is cached
+RECOMMENDATIONS_DASHBOARD_TTL = env.int('RECOMMENDATIONS_DASHBOARD_TTL', default=60)
+# Trending decay half-life in hours per window (see recommendations.trending)
+TRENDING_HALF_LIFE_HOURS = {
+    '24h': env.float('TRENDING_HALF_LIFE_24H', default=6),
+    '7d': env.float('TRENDING_HALF_LIFE_7D', default=48),
+    '30d': env.float('TRENDING_HALF_LIFE_30D', default=168),
+}
@@ -74,7 +74,7 @@ class MovieAdmin(admin.ModelAdmin):
             'fields': ('title', 'description', 'release_date', 'genres')
         }),
         ('Ratings & Reviews', {
-            'fields': ('avg_rating',),
+            'fields': Movie.RATING_AGGREGATE_FIELDS,
             'classes': ('collapse',)
         }),
         ('External IDs & Media', {
@@ -92,7 +92,7 @@ class MovieAdmin(admin.ModelAdmin):
     )
 
     # Read-only fields
-    readonly_fields = ('avg_rating', 'created_at', 'updated_at')
+    readonly_fields = Movie.RATING_AGGREGATE_FIELDS + ('created_at', 'updated_at')
 
     # Actions
     actions = ['update_ratings', 'export_movies', 'clear_tmdb_data']
@@ -107,7 +107,7 @@ class MovieAdmin(admin.ModelAdmin):
 
     def get_reviews_count(self, obj):
         """Display number of reviews with link"""
-        count = obj.reviews.count()
+        count = obj.review_count
         if count > 0:
             url = reverse('admin:reviews_review_changelist')
             return format_html('<a href="{}?movie__id__exact={}">{}</a>', url, obj.id, count)
@@ -116,14 +116,9 @@ class MovieAdmin(admin.ModelAdmin):
 
     def update_ratings(self, request, queryset):
         """Update average ratings for selected movies"""
-        updated = 0
-        for movie in queryset:
-            reviews = movie.reviews.all()
-            if reviews:
-                avg_rating = sum(review.rating for review in reviews) / len(reviews)
-                movie.avg_rating = round(avg_rating, 2)
-                movie.save()
-                updated += 1
+        from reviews.aggregates import recount_movie_ratings
+
+        updated = recount_movie_ratings(queryset.values_list('id', flat=True))
         self.message_user(request, f'Updated ratings for {updated} movie(s).')
     update_ratings.short_description = 'Update average ratings'
 
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from common.search import register_search_document
+        from .models import Movie
+
+        register_search_document(Movie, {'title': 'A', 'description': 'B'})
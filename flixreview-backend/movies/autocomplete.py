@@ -0,0 +1,145 @@
+"""
+In-process title index for typeahead autocomplete
+
+Every movie title is stored once per word, keyed by the normalised title
+from that word onwards ("the dark knight", "dark knight", "knight"), in a
+sorted list, so a prefix lookup is a binary search plus a scan of the
+matching range and "dar" finds "The Dark Knight". One and two letter
+prefixes, the ones typeahead sends most and whose ranges are widest, have
+their ranked matches precomputed at build time. Each process keeps its own
+copy and rebuilds it when the shared version stamp in the cache changes;
+movie writes (including TMDB imports) bump the stamp via movies.signals.
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+import uuid
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+
+
+TITLE_INDEX_VERSION_KEY = 'movies:title_index_version'
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+# Prefixes up to this length are answered from lists ranked at build time
+SHORT_PREFIX_LENGTH = 2
+
+
+class TitleEntry(NamedTuple):
+	id: int
+	title: str
+	year: Optional[int]
+	poster_url: Optional[str]
+	popularity: int
+
+
+def normalize(text: str) -> str:
+	"""Lowercase, strip accents and collapse punctuation to single spaces"""
+	text = unicodedata.normalize('NFKD', text)
+	text = ''.join(char for char in text if not unicodedata.combining(char))
+	return ' '.join(re.findall(r'\w+', text.lower()))
+
+
+class TitleIndex:
+	def __init__(self, entries: List[TitleEntry], version=None):
+		self.version = version
+		keys = []
+		for position, entry in enumerate(entries):
+			words = normalize(entry.title).split(' ')
+			for start in range(len(words)):
+				# (key, word offset, entry position); the offset ranks whole-title prefixes first
+				keys.append((' '.join(words[start:]), start, position))
+		keys.sort()
+		self.keys = [key for key, _, _ in keys]
+		self.postings = [(start, position) for _, start, position in keys]
+		self.entries = entries
+
+		short = defaultdict(dict)
+		for key, (start, position) in zip(self.keys, self.postings):
+			for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1):
+				self._keep_best(short[key[:length]], start, position)
+		self.short_prefixes = {
+			prefix: [position for position, _ in self._rank(best, AUTOCOMPLETE_MAX_LIMIT)]
+			for prefix, best in short.items()
+		}
+
+	def __len__(self):
+		return len(self.entries)
+
+	@staticmethod
+	def _keep_best(best: Dict[int, int], start: int, position: int) -> None:
+		if position not in best or start < best[position]:
+			best[position] = start
+
+	def _rank(self, best: Dict[int, int], limit: int) -> List[Tuple[int, int]]:
+		"""Whole-title prefix matches first, then more-reviewed movies, then by title"""
+		return heapq.nsmallest(
+			limit,
+			best.items(),
+			key=lambda item: (item[1] > 0, -self.entries[item[0]].popularity, self.entries[item[0]].title),
+		)
+
+	def lookup(self, prefix: str, limit: int = AUTOCOMPLETE_DEFAULT_LIMIT) -> List[TitleEntry]:
+		prefix = normalize(prefix)
+		if not prefix:
+			return []
+		if len(prefix) <= SHORT_PREFIX_LENGTH:
+			return [self.entries[position] for position in self.short_prefixes.get(prefix, [])[:limit]]
+
+		low = bisect.bisect_left(self.keys, prefix)
+		high = bisect.bisect_left(self.keys, prefix + '\uffff', low)
+		best = {}
+		for start, position in self.postings[low:high]:
+			self._keep_best(best, start, position)
+		return [self.entries[position] for position, _ in self._rank(best, limit)]
+
+
+def build_title_index(version=None) -> TitleIndex:
+	from .models import Movie
+
+	rows = (
+		Movie.objects
+		.order_by()
+		.values_list('id', 'title', 'release_date', 'poster_url', 'review_count')
+		.iterator(chunk_size=2000)
+	)
+	entries = [
+		TitleEntry(movie_id, title, release_date.year if release_date else None, poster_url or None, review_count)
+		for movie_id, title, release_date, poster_url, review_count in rows
+	]
+	return TitleIndex(entries, version)
+
+
+def get_title_index_version():
+	version = cache.get(TITLE_INDEX_VERSION_KEY)
+	if version is None:
+		cache.add(TITLE_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+		version = cache.get(TITLE_INDEX_VERSION_KEY)
+	return version
+
+
+def invalidate_title_index() -> None:
+	cache.set(TITLE_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+_index: Optional[TitleIndex] = None
+_build_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+	"""Return this process's index, rebuilding it if the shared version moved on"""
+	global _index
+	version = get_title_index_version()
+	index = _index
+	if index is not None and index.version == version:
+		return index
+	with _build_lock:
+		if _index is None or _index.version != version:
+			_index = build_title_index(version)
+		return _index
@@ -0,0 +1,99 @@
+"""
+Movie catalogue caches
+
+Genre movie counts are computed for every genre with one grouped query
+over the movie-genre join table and cached as a single entry. The entry is
+dropped whenever genre membership changes (see movies.signals), which also
+moves the genre version stamp that HTTP validators of every payload
+embedding genres depend on.
+
+HTTP validators of movie payloads are version stamps too (common.cache
+namespaces), moved by every write that changes what they render: movie
+saves, genre membership, and the F() rating updates that leave
+``updated_at`` alone. ``movies:movie:<id>`` covers one movie,
+``movies:catalogue`` any movie list, and ``movies:reviews:<id>`` a
+movie's reviews including their like and comment counters.
+"""
+import uuid
+from typing import Dict, Iterable, Set
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from common.cache import bump_namespace, get_namespace_version
+
+
+GENRE_MOVIE_COUNTS_KEY = 'movies:genre_movie_counts'
+GENRE_MOVIE_COUNTS_TIMEOUT = 3600
+GENRE_VERSION_KEY = 'movies:genre_version'
+CATALOGUE_NAMESPACE = 'movies:catalogue'
+
+
+def get_genre_movie_counts() -> Dict[int, int]:
+	"""Return {genre_id: number of movies} for every genre with at least one movie"""
+	counts = cache.get(GENRE_MOVIE_COUNTS_KEY)
+	if counts is None:
+		from .models import Movie
+
+		counts = dict(
+			Movie.genres.through.objects
+			.order_by()
+			.values('genre_id')
+			.annotate(total=Count('movie_id'))
+			.values_list('genre_id', 'total')
+		)
+		cache.set(GENRE_MOVIE_COUNTS_KEY, counts, GENRE_MOVIE_COUNTS_TIMEOUT)
+	return counts
+
+
+def get_genre_version() -> str:
+	version = cache.get(GENRE_VERSION_KEY)
+	if version is None:
+		cache.add(GENRE_VERSION_KEY, uuid.uuid4().hex, None)
+		version = cache.get(GENRE_VERSION_KEY)
+	return version
+
+
+def invalidate_genre_movie_counts() -> None:
+	cache.delete(GENRE_MOVIE_COUNTS_KEY)
+	cache.set(GENRE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_catalogue_version() -> int:
+	return get_namespace_version(CATALOGUE_NAMESPACE)
+
+
+def get_movie_version(movie_id) -> int:
+	return get_namespace_version(f'movies:movie:{movie_id}')
+
+
+def get_movie_reviews_version(movie_id) -> int:
+	return get_namespace_version(f'movies:reviews:{movie_id}')
+
+
+def touch_movies(*movie_ids) -> None:
+	"""Move the validators of the given movies and of every movie list"""
+	for movie_id in set(movie_ids):
+		bump_namespace(f'movies:movie:{movie_id}')
+	bump_namespace(CATALOGUE_NAMESPACE)
+
+
+def touch_movie_reviews(*movie_ids) -> None:
+	"""Move the validators of the review lists of the given movies"""
+	for movie_id in set(movie_ids):
+		if movie_id is not None:
+			bump_namespace(f'movies:reviews:{movie_id}')
+
+
+def movie_response_tags(movies: Iterable[dict]) -> Set[str]:
+	"""Response cache tags of serialized movies: each movie and every genre embedded in it"""
+	tags = set()
+	for movie in movies:
+		tags.add(f"movie:{movie['id']}")
+		tags.update(f"genre:{genre['id']}" for genre in movie.get('genres', ()))
+	return tags
+
+
+def page_items(data):
+	"""Serialized items of a list response, paginated or not"""
+	return data.get('results', []) if isinstance(data, dict) else data
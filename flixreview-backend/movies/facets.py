@@ -0,0 +1,157 @@
+"""
+Catalogue facet counts
+
+Genre, decade and rating-bucket counts for a filtered movie queryset are
+computed in one aggregate query: every facet value is a conditional
+COUNT(DISTINCT id) over the movies joined to their genres, so the table is
+read once however many values there are. Results are cached per normalised
+filter signature under a version stamp that movie and genre-membership
+writes (including TMDB imports) bump, see movies.signals.
+
+Rating changes do not bump it: the rating buckets are cached apart for
+RESPONSE_CACHE_RANKED_TTL seconds and recounted alone when they expire.
+Signatures filtering on min_rating/max_rating depend on ratings throughout,
+so those entries share the short expiry.
+"""
+import hashlib
+import uuid
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from common.response_cache import purge_tags
+from .models import Genre, Movie
+
+
+FACETS_VERSION_KEY = 'movies:facets_version'
+
+# Earliest decade with a facet bucket; cinema starts in the 1880s
+FIRST_DECADE = 1870
+
+# (bucket, lower bound, upper bound); the last bound is inclusive
+RATING_BUCKETS = [
+	('4-5', Decimal('4'), Decimal('5')),
+	('3-4', Decimal('3'), Decimal('4')),
+	('2-3', Decimal('2'), Decimal('3')),
+	('1-2', Decimal('1'), Decimal('2')),
+]
+
+RATING_FILTER_PARAMS = {'min_rating', 'max_rating'}
+
+# MovieListView's filter parameters; anything else (paging, ordering,
+# cache busters) does not change the counts and stays out of the key
+FILTER_PARAMS = {
+	'genres', 'genres__slug', 'genres__id', 'min_rating', 'max_rating', 'year_from', 'year_to', 'search',
+}
+
+
+def decades() -> List[int]:
+	return list(range(FIRST_DECADE, timezone.now().year // 10 * 10 + 1, 10))
+
+
+def _rating_condition(low, high) -> Q:
+	upper = Q(avg_rating__lte=high) if high == RATING_BUCKETS[0][2] else Q(avg_rating__lt=high)
+	return Q(review_count__gt=0, avg_rating__gte=low) & upper
+
+
+def compute_facets(queryset, ratings_only: bool = False) -> Dict:
+	"""Return facet counts for the movies in ``queryset`` (just the rating buckets with ratings_only)"""
+	genres = [] if ratings_only else list(Genre.objects.order_by('name').values('id', 'name', 'slug'))
+
+	aggregates = {'total': Count('id', distinct=True)}
+	for genre in genres:
+		aggregates[f"genre_{genre['id']}"] = Count('id', distinct=True, filter=Q(genres__id=genre['id']))
+	for decade in ([] if ratings_only else decades()):
+		aggregates[f'decade_{decade}'] = Count('id', distinct=True, filter=Q(
+			release_date__gte=date(decade, 1, 1), release_date__lt=date(decade + 10, 1, 1),
+		))
+	for bucket, low, high in RATING_BUCKETS:
+		aggregates[f'rating_{bucket}'] = Count('id', distinct=True, filter=_rating_condition(low, high))
+	aggregates['rating_unrated'] = Count('id', distinct=True, filter=Q(review_count=0))
+
+	# Re-select by id so DISTINCT, search annotations and ordering of the
+	# list queryset cannot interfere with the aggregate
+	counts = Movie.objects.filter(pk__in=queryset.order_by().values('pk')).aggregate(**aggregates)
+
+	ratings = [
+		{'bucket': bucket, 'count': counts[f'rating_{bucket}']}
+		for bucket in [bucket for bucket, _, _ in RATING_BUCKETS] + ['unrated']
+	]
+	if ratings_only:
+		return {'ratings': ratings}
+	return {
+		'total': counts['total'],
+		'genres': sorted(
+			(
+				{**genre, 'count': counts[f"genre_{genre['id']}"]}
+				for genre in genres
+				if counts[f"genre_{genre['id']}"]
+			),
+			key=lambda genre: -genre['count'],
+		),
+		'decades': [
+			{'decade': decade, 'count': counts[f'decade_{decade}']}
+			for decade in decades()
+			if counts[f'decade_{decade}']
+		],
+		'ratings': ratings,
+	}
+
+
+def filter_signature(query_params) -> str:
+	"""Stable digest of the filtering query parameters (order, blanks and other parameters ignored)"""
+	items = []
+	for key in sorted(query_params.keys()):
+		if key not in FILTER_PARAMS:
+			continue
+		values = sorted(
+			value.strip().lower() for value in query_params.getlist(key) if value.strip()
+		)
+		if key == 'genres':
+			values = sorted({part.strip() for value in values for part in value.split(',') if part.strip()})
+		if values:
+			items.append(f"{key}={','.join(values)}")
+	return hashlib.sha1('&'.join(items).encode('utf-8')).hexdigest()
+
+
+def get_facets_version():
+	version = cache.get(FACETS_VERSION_KEY)
+	if version is None:
+		cache.add(FACETS_VERSION_KEY, uuid.uuid4().hex, None)
+		version = cache.get(FACETS_VERSION_KEY)
+	return version
+
+
+def invalidate_facets() -> None:
+	cache.set(FACETS_VERSION_KEY, uuid.uuid4().hex, None)
+	purge_tags('facets')
+
+
+def facets_cache_keys(query_params):
+	"""(catalogue facets key, rating buckets key) for the query's filter signature"""
+	key = f'movies:facets:{get_facets_version()}:{filter_signature(query_params)}'
+	return key, f'{key}:ratings'
+
+
+def get_facets(queryset, query_params) -> Dict:
+	"""Cached facet counts of ``queryset``, filtered by ``query_params``"""
+	key, ratings_key = facets_cache_keys(query_params)
+	cached = cache.get_many([key, ratings_key])
+	facets, ratings = cached.get(key), cached.get(ratings_key)
+	if facets is not None and ratings is not None:
+		return {**facets, **ratings}
+
+	if facets is None:
+		facets = compute_facets(queryset)
+		ratings = {'ratings': facets.pop('ratings')}
+		rating_filtered = any(query_params.get(param) for param in RATING_FILTER_PARAMS)
+		cache.set(key, facets, settings.RESPONSE_CACHE_RANKED_TTL if rating_filtered else settings.MOVIE_FACETS_TTL)
+	else:
+		ratings = compute_facets(queryset, ratings_only=True)
+	cache.set(ratings_key, ratings, settings.RESPONSE_CACHE_RANKED_TTL)
+	return {**facets, **ratings}
@@ -0,0 +1,26 @@
+"""
+Management command to rebuild the full-text search indexes
+
+Usage:
+    python manage.py rebuild_search_index                  # Default database
+    python manage.py rebuild_search_index --database replica
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from common.search import install_search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Repair the installed full-text search indexes and re-index every row'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to rebuild (default: "default")'
+        )
+
+    def handle(self, *args, **options):
+        tables = install_search_indexes(options['database'], rebuild=True, repair_only=True)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search index of {', '.join(tables) or 'no tables'}"))
@@ -0,0 +1,49 @@
+"""
+Management command to repair drift in the denormalized movie rating aggregates
+
+Usage:
+    python manage.py reconcile_movie_ratings              # Repair every movie
+    python manage.py reconcile_movie_ratings --dry-run    # Only report drift
+    python manage.py reconcile_movie_ratings --movie 42 --movie 43
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.aggregates import recount_movie_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recount review_count, rating_sum, rating histogram and avg_rating from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--movie',
+            type=int,
+            action='append',
+            dest='movie_ids',
+            help='Only reconcile this movie id (repeatable)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted movies without writing'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Movies per bulk update (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        drifted = recount_movie_ratings(options['movie_ids'], dry_run=dry_run, batch_size=batch_size)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{drifted} movie(s) have drifted rating aggregates'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled rating aggregates for {drifted} movie(s)'))
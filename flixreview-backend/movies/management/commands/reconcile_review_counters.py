@@ -0,0 +1,49 @@
+"""
+Management command to repair drift in the denormalized review like and comment counters
+
+Usage:
+    python manage.py reconcile_review_counters              # Repair every review
+    python manage.py reconcile_review_counters --dry-run    # Only report drift
+    python manage.py reconcile_review_counters --review 42 --review 43
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.aggregates import recount_review_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount likes_count and comments_count of reviews from their like and comment rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--review',
+            type=int,
+            action='append',
+            dest='review_ids',
+            help='Only reconcile this review id (repeatable)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted reviews without writing'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Reviews per bulk update (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        drifted = recount_review_counters(options['review_ids'], dry_run=dry_run, batch_size=batch_size)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{drifted} review(s) have drifted like/comment counters'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled like/comment counters for {drifted} review(s)'))
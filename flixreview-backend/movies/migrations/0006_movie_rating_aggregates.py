@@ -0,0 +1,89 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:08
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    """Populate the new counters (and avg_rating) from existing reviews"""
+    Movie = apps.get_model("movies", "Movie")
+    Review = apps.get_model("reviews", "Review")
+
+    rows = (
+        Review.objects.order_by()
+        .values("movie_id")
+        .annotate(
+            review_count=Count("id"),
+            rating_sum=Sum("rating"),
+            **{f"rating_{n}_count": Count("id", filter=Q(rating=n)) for n in range(1, 6)},
+        )
+    )
+
+    movies = []
+    for row in rows:
+        movie = Movie(id=row.pop("movie_id"), **row)
+        movie.avg_rating = (Decimal(movie.rating_sum) / Decimal(movie.review_count)).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        movies.append(movie)
+
+    Movie.objects.bulk_update(
+        movies,
+        [
+            "avg_rating", "review_count", "rating_sum",
+            "rating_1_count", "rating_2_count", "rating_3_count", "rating_4_count", "rating_5_count",
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "movies",
+            "0005_rename_movies_movi_tmdb_id_idx_movies_movi_tmdb_id_0e4cad_idx_and_more",
+        ),
+        ("reviews", "0002_reviewcomment_reviewlike"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0006_movie_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["created_at"], name="movies_movi_created_619207_idx"
+            ),
+        ),
+    ]
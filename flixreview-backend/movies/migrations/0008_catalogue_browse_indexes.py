@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0007_movie_created_at_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="movie",
+            name="movies_movi_genre_f96e97_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="movie",
+            name="movies_movi_avg_rat_6515c7_idx",
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["genre", "avg_rating"], name="movies_movi_genre_f07d75_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["avg_rating", "id"], name="movies_movi_avg_rat_83942b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["release_date", "avg_rating"],
+                name="movies_movi_release_c069c7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["review_count", "id"], name="movies_movi_review__56a29e_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from common.search import InstallSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0008_catalogue_browse_indexes"),
+    ]
+
+    operations = [
+        InstallSearchIndex("Movie", {"title": "A", "description": "B"}),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0009_movie_search_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="movie",
+            name="movies_movi_genre_f07d75_idx",
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(fields=["genre"], name="movies_movi_genre_f96e97_idx"),
+        ),
+    ]
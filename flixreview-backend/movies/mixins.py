@@ -0,0 +1,11 @@
+from common.mixins import AnonymousResponseCacheMixin
+
+from .cache import movie_response_tags, page_items
+
+
+class MovieResponseCacheMixin(AnonymousResponseCacheMixin):
+	"""Anonymous response cache for views rendering movies, tagged with every movie and genre shown"""
+
+	def get_response_cache_tags(self, data):
+		movies = [data] if isinstance(data, dict) and 'id' in data else page_items(data)
+		return {*self.response_cache_tags, *movie_response_tags(movies)}
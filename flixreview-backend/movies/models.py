@@ -33,6 +33,17 @@ class Movie(models.Model):
 	description = models.TextField()
 	release_date = models.DateField()
 	avg_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+
+	# Denormalized rating aggregates, kept current by reviews.signals with
+	# atomic F() deltas; repair drift with `manage.py reconcile_movie_ratings`
+	review_count = models.PositiveIntegerField(default=0)
+	rating_sum = models.PositiveIntegerField(default=0)
+	rating_1_count = models.PositiveIntegerField(default=0)
+	rating_2_count = models.PositiveIntegerField(default=0)
+	rating_3_count = models.PositiveIntegerField(default=0)
+	rating_4_count = models.PositiveIntegerField(default=0)
+	rating_5_count = models.PositiveIntegerField(default=0)
+
 	poster_url = models.URLField(blank=True, null=True)
 	
 	# TMDB Integration fields
@@ -48,15 +59,50 @@ class Movie(models.Model):
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	# Owned by reviews.aggregates; a regular save() of an existing movie
+	# never writes them, so a stale instance cannot clobber concurrent deltas
+	RATING_AGGREGATE_FIELDS = (
+		'avg_rating', 'review_count', 'rating_sum',
+		'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+	)
+
 	def __str__(self):
 		return self.title
 
+	def review_stats(self):
+		"""Review count, average and per-star distribution read from the stored aggregates"""
+		return {
+			'total_reviews': self.review_count,
+			'average_rating': self.rating_sum / self.review_count if self.review_count else 0,
+			'rating_distribution': {
+				rating: getattr(self, f'rating_{rating}_count') for rating in range(1, 6)
+			},
+		}
+
+	def save(self, *args, **kwargs):
+		if not self._state.adding and kwargs.get('update_fields') is None:
+			deferred = self.get_deferred_fields()
+			kwargs['update_fields'] = [
+				field.name for field in self._meta.concrete_fields
+				if not field.primary_key
+				and field.name not in self.RATING_AGGREGATE_FIELDS
+				and field.attname not in deferred
+			]
+		super().save(*args, **kwargs)
+
 	class Meta:
 		ordering = ['-created_at']
 		indexes = [
 			models.Index(fields=['title']),
 			models.Index(fields=['genre']),
-			models.Index(fields=['avg_rating']),
+			# Browse orders and filters of MovieListView; the trailing column
+			# serves range filters on the first or the keyset id tiebreak.
+			# Genre browsing joins the genres M2M, so no genre column can
+			# lead a rating index; it starts from the join table's genre_id
+			models.Index(fields=['avg_rating', 'id']),
+			models.Index(fields=['release_date', 'avg_rating']),
+			models.Index(fields=['review_count', 'id']),
+			models.Index(fields=['created_at']),
 			models.Index(fields=['tmdb_id']),
 			models.Index(fields=['imdb_id']),
 		]
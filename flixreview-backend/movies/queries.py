@@ -0,0 +1,44 @@
+"""
+Shared movie querysets
+
+Every endpoint that renders MovieSerializer starts from movie_queryset(),
+which selects only the columns the serializer reads and prefetches the
+nested genres in one extra query. Reviews are never loaded.
+"""
+from django.db.models import Prefetch
+
+from .models import Genre, Movie
+
+
+# Concrete Movie columns rendered by MovieSerializer
+MOVIE_LIST_FIELDS = (
+	'id', 'title', 'genre', 'description', 'release_date', 'avg_rating',
+	'poster_url', 'created_at', 'updated_at', 'review_count',
+)
+
+# Extra columns read by Movie.review_stats()
+REVIEW_STATS_FIELDS = (
+	'rating_sum', 'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+)
+
+# Columns rendered by EmbeddedGenreSerializer
+EMBEDDED_GENRE_FIELDS = ('id', 'name', 'slug')
+
+
+def movie_queryset(queryset=None, extra_fields=()):
+	"""
+	Return ``queryset`` (all movies by default) trimmed for MovieSerializer
+
+	``extra_fields`` adds columns needed by a specific view on top of the
+	serializer's own.
+	"""
+	if queryset is None:
+		queryset = Movie.objects.all()
+
+	return (
+		queryset
+		.only(*MOVIE_LIST_FIELDS, *extra_fields)
+		.prefetch_related(
+			Prefetch('genres', queryset=Genre.objects.only(*EMBEDDED_GENRE_FIELDS))
+		)
+	)
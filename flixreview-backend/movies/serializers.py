@@ -1,10 +1,23 @@
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 
+from .cache import get_genre_movie_counts
 from .models import Movie, Genre
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreMovieCountMixin:
+	"""Reads movie counts from the cached per-genre aggregate (one lookup per response)"""
+
+	@extend_schema_field(serializers.IntegerField)
+	def get_movie_count(self, obj):
+		"""Return the number of movies in this genre"""
+		counts = self.context.get('genre_movie_counts')
+		if counts is None:
+			counts = self.context['genre_movie_counts'] = get_genre_movie_counts()
+		return counts.get(obj.pk, 0)
+
+
+class GenreSerializer(GenreMovieCountMixin, serializers.ModelSerializer):
 	"""Serializer for Genre model"""
 	movie_count = serializers.SerializerMethodField()
 	
@@ -12,16 +25,21 @@ class GenreSerializer(serializers.ModelSerializer):
 		model = Genre
 		fields = ('id', 'name', 'slug', 'description', 'movie_count', 'created_at', 'updated_at')
 		read_only_fields = ('slug', 'created_at', 'updated_at', 'movie_count')
+
+
+class EmbeddedGenreSerializer(GenreMovieCountMixin, serializers.ModelSerializer):
+	"""Compact genre representation used when genres are nested inside movies"""
+	movie_count = serializers.SerializerMethodField()
 	
-	@extend_schema_field(serializers.IntegerField)
-	def get_movie_count(self, obj):
-		"""Return the number of movies in this genre"""
-		return obj.movies.count()
+	class Meta:
+		model = Genre
+		fields = ('id', 'name', 'slug', 'movie_count')
+		read_only_fields = fields
 
 
 class MovieSerializer(serializers.ModelSerializer):
 	review_count = serializers.IntegerField(read_only=True)
-	genres = GenreSerializer(many=True, read_only=True)
+	genres = EmbeddedGenreSerializer(many=True, read_only=True)
 	genre_ids = serializers.PrimaryKeyRelatedField(
 		queryset=Genre.objects.all(),
 		many=True,
@@ -0,0 +1,51 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from common.response_cache import purge_tags
+from .autocomplete import invalidate_title_index
+from .cache import invalidate_genre_movie_counts, touch_movies
+from .facets import invalidate_facets
+from .models import Genre, Movie
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def genre_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+	if action == 'pre_clear':
+		# The cleared side is only known before the rows go
+		related = instance.movies if reverse else instance.genres
+		instance._cleared_genre_links = set(related.values_list('pk', flat=True))
+		return
+	if action not in ('post_add', 'post_remove', 'post_clear'):
+		return
+
+	invalidate_genre_movie_counts()
+	invalidate_facets()
+
+	related_pks = getattr(instance, '_cleared_genre_links', set()) if action == 'post_clear' else pk_set or set()
+	movie_pks, genre_pks = (related_pks, {instance.pk}) if reverse else ({instance.pk}, related_pks)
+	touch_movies(*movie_pks)
+	purge_tags(
+		'movies', 'genres',
+		*(f'movie:{pk}' for pk in movie_pks),
+		*(f'genre:{pk}' for pk in genre_pks),
+	)
+
+
+@receiver(post_delete, sender=Movie)
+@receiver([post_save, post_delete], sender=Genre)
+def genre_catalogue_changed(sender, **kwargs):
+	invalidate_genre_movie_counts()
+	invalidate_facets()
+
+
+@receiver([post_save, post_delete], sender=Movie)
+def movie_catalogue_changed(sender, instance, **kwargs):
+	invalidate_title_index()
+	invalidate_facets()
+	touch_movies(instance.pk)
+	purge_tags(f'movie:{instance.pk}', 'movies')
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+	purge_tags(f'genre:{instance.pk}', 'genres')
@@ -3,6 +3,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
 	MovieListView, 
+	MovieAutocompleteView,
+	MovieFacetsView,
 	MovieDetailView, 
 	GenreViewSet,
 	search_tmdb,
@@ -17,6 +19,8 @@ router.register(r'genres', GenreViewSet, basename='genre')
 
 urlpatterns = [
 	path('', MovieListView.as_view(), name='movie-list'),
+	path('autocomplete/', MovieAutocompleteView.as_view(), name='movie-autocomplete'),
+	path('facets/', MovieFacetsView.as_view(), name='movie-facets'),
 	path('<int:pk>/', MovieDetailView.as_view(), name='movie-detail'),
 	
 	# TMDB Integration endpoints
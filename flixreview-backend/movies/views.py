@@ -1,21 +1,34 @@
+from datetime import date
 from decimal import Decimal, InvalidOperation
 
-from django.db.models import Avg, Count
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
+from .autocomplete import (
+	AUTOCOMPLETE_DEFAULT_LIMIT, AUTOCOMPLETE_MAX_LIMIT, get_title_index, get_title_index_version, normalize,
+)
+from .facets import get_facets
+from .cache import get_catalogue_version, get_genre_version, get_movie_version
+from .mixins import MovieResponseCacheMixin
 from .models import Movie, Genre
+from .queries import REVIEW_STATS_FIELDS, movie_queryset
 from .serializers import MovieSerializer, GenreSerializer
 from .services import TMDBService
 from common.permissions import IsAdminOrReadOnly
-from common.mixins import ApiResponseMixin
+from common.mixins import AnonymousResponseCacheMixin, ApiResponseMixin, ConditionalGetMixin
+from common.pagination import CursorOptInPagination
+from common.search import FullTextSearchFilter
 
 
-class GenreViewSet(ApiResponseMixin, viewsets.ModelViewSet):
+class GenreViewSet(AnonymousResponseCacheMixin, ConditionalGetMixin, ApiResponseMixin, viewsets.ModelViewSet):
 	"""
 	ViewSet for Genre CRUD operations.
 	- List/Read: Anyone
@@ -36,21 +49,33 @@ class GenreViewSet(ApiResponseMixin, viewsets.ModelViewSet):
 		'PATCH': 'Genre updated successfully',
 		'DELETE': 'Genre deleted successfully',
 	}
-	
-	def get_queryset(self):
-		"""Prefetch related movies for efficiency"""
-		return super().get_queryset().prefetch_related('movies')
 
+	def get_validators(self, request, *args, **kwargs):
+		# Genre writes and membership changes (movie_count) all move the version
+		return (get_genre_version(),), None
+
+	def get_response_cache_tags(self, data):
+		if self.action == 'retrieve':
+			return {f"genre:{data['id']}"}
+		return {'genres'}
+
+	def list(self, request, *args, **kwargs):
+		return self.handle_get(super().list, request, *args, **kwargs)
 
-class MovieListView(ApiResponseMixin, generics.ListCreateAPIView):
+	def retrieve(self, request, *args, **kwargs):
+		return self.handle_get(super().retrieve, request, *args, **kwargs)
+
+
+class MovieListView(MovieResponseCacheMixin, ConditionalGetMixin, ApiResponseMixin, generics.ListCreateAPIView):
 	queryset = Movie.objects.all()
 	serializer_class = MovieSerializer
+	pagination_class = CursorOptInPagination
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-	filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+	filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
 	filterset_fields = ['genres__slug', 'genres__id']
-	search_fields = ['title', 'description']
 	ordering_fields = ['release_date', 'avg_rating', 'created_at', 'review_count']
 	ordering = ['-created_at']
+	response_cache_tags = ('movies',)
 	success_messages = {
 		'GET': 'Movies retrieved successfully',
 		'POST': 'Movie created successfully',
@@ -61,8 +86,21 @@ class MovieListView(ApiResponseMixin, generics.ListCreateAPIView):
 			return [IsAdminOrReadOnly()]
 		return super().get_permissions()
 
+	def get_response_cache_timeout(self):
+		# Rating changes purge only the movies they touch, so pages ranked or
+		# filtered by rating pick up other movies' changes on a short expiry
+		params = self.request.query_params
+		ordering = params.get('ordering', '')
+		if 'avg_rating' in ordering or 'review_count' in ordering or params.get('min_rating') or params.get('max_rating'):
+			return settings.RESPONSE_CACHE_RANKED_TTL
+		return super().get_response_cache_timeout()
+
+	def get_validators(self, request, *args, **kwargs):
+		# Any movie write or rating change moves the catalogue version; no query runs
+		return (get_catalogue_version(), get_genre_version()), None
+
 	def get_queryset(self):
-		queryset = super().get_queryset().prefetch_related('reviews', 'genres').annotate(review_count=Count('reviews'))
+		queryset = movie_queryset(super().get_queryset())
 		params = self.request.query_params
 
 		# Support comma-separated genre IDs
@@ -89,22 +127,98 @@ class MovieListView(ApiResponseMixin, generics.ListCreateAPIView):
 				queryset = queryset.filter(avg_rating__lte=Decimal(max_rating))
 			except (InvalidOperation, TypeError):
 				pass
+		# Year bounds become plain date ranges so the release_date index applies
 		if year_from is not None:
 			try:
-				year_val = int(year_from)
-				queryset = queryset.filter(release_date__year__gte=year_val)
-			except ValueError:
+				queryset = queryset.filter(release_date__gte=date(int(year_from), 1, 1))
+			except (ValueError, OverflowError):
 				pass
 		if year_to is not None:
 			try:
-				year_val = int(year_to)
-				queryset = queryset.filter(release_date__year__lte=year_val)
-			except ValueError:
+				queryset = queryset.filter(release_date__lt=date(int(year_to) + 1, 1, 1))
+			except (ValueError, OverflowError):
 				pass
 
 		return queryset
 
-class MovieDetailView(ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):
+@extend_schema(
+	summary="Autocomplete movie titles",
+	description="Typeahead matches for a title prefix; any word of the title can start the match",
+	parameters=[
+		OpenApiParameter(name='q', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, required=True, description='Title prefix'),
+		OpenApiParameter(
+			name='limit', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, required=False,
+			description=f'Maximum matches (default: {AUTOCOMPLETE_DEFAULT_LIMIT}, max: {AUTOCOMPLETE_MAX_LIMIT})'
+		),
+	],
+	responses={200: OpenApiTypes.OBJECT},
+)
+class MovieAutocompleteView(ApiResponseMixin, APIView):
+	"""
+	Title typeahead served from the in-process title index (movies.autocomplete)
+
+	Responses are cached per prefix in the http cache for
+	MOVIE_AUTOCOMPLETE_TTL seconds and marked publicly cacheable for as long.
+	"""
+	permission_classes = [permissions.AllowAny]
+	success_messages = {'GET': 'Movie suggestions retrieved successfully'}
+
+	def get(self, request):
+		prefix = normalize(request.query_params.get('q', ''))[:100]
+		try:
+			limit = min(max(int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT)), 1), AUTOCOMPLETE_MAX_LIMIT)
+		except (TypeError, ValueError):
+			limit = AUTOCOMPLETE_DEFAULT_LIMIT
+
+		# The index is only loaded (or rebuilt after a write) on a cache miss
+		cache = caches['http']
+		key = f'movies:autocomplete:{get_title_index_version()}:{limit}:{prefix}'
+		results = cache.get(key)
+		if results is None:
+			results = [
+				{'id': entry.id, 'title': entry.title, 'year': entry.year, 'poster_url': entry.poster_url}
+				for entry in get_title_index().lookup(prefix, limit)
+			]
+			cache.set(key, results, settings.MOVIE_AUTOCOMPLETE_TTL)
+
+		response = Response({'query': prefix, 'results': results})
+		patch_cache_control(response, public=True, max_age=settings.MOVIE_AUTOCOMPLETE_TTL)
+		return response
+
+
+@extend_schema(
+	summary="Catalogue facet counts",
+	description=(
+		"Genre, decade and rating-bucket counts for the movies matching the same filters "
+		"as the movie list (search, genres, min_rating, year_from, ...)"
+	),
+	responses={200: OpenApiTypes.OBJECT},
+)
+class MovieFacetsView(MovieListView):
+	"""
+	Facet counts for the current MovieListView filter set (movies.facets)
+
+	Counts are cached per normalised filter signature for MOVIE_FACETS_TTL
+	seconds and movie writes and imports invalidate them immediately; rating
+	buckets follow reviews within RESPONSE_CACHE_RANKED_TTL seconds.
+	"""
+	http_method_names = ['get', 'head', 'options']
+	pagination_class = None
+	response_cache_tags = ('movies', 'facets')
+	success_messages = {'GET': 'Movie facets retrieved successfully'}
+
+	def get_response_cache_timeout(self):
+		# Rating buckets follow reviews on the short expiry
+		return settings.RESPONSE_CACHE_RANKED_TTL
+
+	def get(self, request, *args, **kwargs):
+		return self.handle_get(self.facets, request, *args, **kwargs)
+
+	def facets(self, request, *args, **kwargs):
+		return Response(get_facets(self.filter_queryset(self.get_queryset()), request.query_params))
+
+
+class MovieDetailView(MovieResponseCacheMixin, ConditionalGetMixin, ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):
 	queryset = Movie.objects.all()
 	serializer_class = MovieSerializer
 	permission_classes = [IsAdminOrReadOnly]
@@ -115,23 +229,22 @@ class MovieDetailView(ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):
 		'DELETE': 'Movie deleted successfully',
 	}
 
+	def get_validators(self, request, *args, **kwargs):
+		# Rating changes move the movie's version although updated_at stays put
+		movie_id = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+		return (get_movie_version(movie_id), get_genre_version()), None
+
 	def retrieve(self, request, *args, **kwargs):
 		instance = self.get_object()
 		serializer = self.get_serializer(instance)
 
-		reviews = instance.reviews.all()
-		review_stats = {
-			'total_reviews': reviews.count(),
-			'average_rating': reviews.aggregate(Avg('rating'))['rating__avg'] or 0,
-			'rating_distribution': {i: reviews.filter(rating=i).count() for i in range(1, 6)},
-		}
-
+		# Served from the denormalized histogram columns loaded with the movie
 		data = serializer.data
-		data['review_stats'] = review_stats
+		data['review_stats'] = instance.review_stats()
 		return Response(data)
 
 	def get_queryset(self):
-		return super().get_queryset().prefetch_related('reviews', 'genres').annotate(review_count=Count('reviews'))
+		return movie_queryset(super().get_queryset(), extra_fields=REVIEW_STATS_FIELDS)
 
 	def destroy(self, request, *args, **kwargs):
 		instance = self.get_object()
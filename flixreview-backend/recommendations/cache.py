@@ -0,0 +1,70 @@
+"""
+Recommendation cache keys and invalidation
+
+Per-user entries (personalized lists, taste profile) live in the user's
+namespace and per-movie entries (similar movies) in the movie's namespace,
+so invalidating either is a single counter bump (see common.cache).
+Entries and namespace counters live in the dedicated ``recommendations``
+cache alias.
+"""
+from typing import Iterable
+
+from django.core.cache import caches
+
+from common.cache import bump_namespace, versioned_key
+
+
+CACHE_ALIAS = 'recommendations'
+
+
+def get_cache():
+	"""Return the cache backing recommendation entries"""
+	return caches[CACHE_ALIAS]
+
+
+def user_namespace(user_id: int) -> str:
+	return f"recommendations:user:{user_id}"
+
+
+def movie_namespace(movie_id: int) -> str:
+	return f"recommendations:movie:{movie_id}"
+
+
+def recommendations_key(user_id: int, algorithm: str) -> str:
+	# One full-length list per algorithm; views slice it for any limit
+	return versioned_key(user_namespace(user_id), 'algo', algorithm, alias=CACHE_ALIAS)
+
+
+def taste_profile_key(user_id: int) -> str:
+	return versioned_key(user_namespace(user_id), 'taste_profile', alias=CACHE_ALIAS)
+
+
+def similar_movies_key(movie_id: int) -> str:
+	return versioned_key(movie_namespace(movie_id), 'similar', alias=CACHE_ALIAS)
+
+
+def invalidate_user(user_id: int) -> None:
+	"""Drop the user's cached recommendations, taste profile and precomputed lists"""
+	from .models import UserRecommendation
+
+	bump_namespace(user_namespace(user_id), alias=CACHE_ALIAS)
+	UserRecommendation.objects.filter(user_id=user_id).delete()
+
+
+def invalidate_movies(movie_ids: Iterable[int]) -> None:
+	"""Drop cached similar-movie lists for the given source movies"""
+	for movie_id in set(movie_ids):
+		bump_namespace(movie_namespace(movie_id), alias=CACHE_ALIAS)
+
+
+def invalidate_movie(movie_id: int) -> None:
+	"""
+	Drop every cached list that shows the movie
+
+	That is the movie's own entries plus the similar-movie lists of every
+	movie that has it as a stored neighbour (they embed its average rating).
+	"""
+	from .models import SimilarMovie
+
+	listed_by = SimilarMovie.objects.filter(neighbor_id=movie_id).order_by().values_list('movie_id', flat=True)
+	invalidate_movies([movie_id, *listed_by])
@@ -0,0 +1,59 @@
+"""
+Homepage recommendations dashboard
+
+The four lists are assembled from one ranked leaderboard query, one query
+for the newest movie ids and a single fetch (and serialization) of every
+movie involved, then split back into sections in Python. The finished
+payload is cached for RECOMMENDATIONS_DASHBOARD_TTL seconds with
+common.cache.get_or_refresh, so a burst of requests on a cold cache costs
+one build and an expiring payload is refreshed by one worker while the
+others keep serving it.
+"""
+from django.conf import settings
+
+from common.cache import get_or_refresh
+from movies.models import Movie
+from movies.queries import movie_queryset
+from movies.serializers import MovieSerializer
+from .cache import CACHE_ALIAS
+from .leaderboards import top_movie_ids
+from .models import LeaderboardEntry
+
+
+DASHBOARD_CACHE_KEY = 'recommendations:dashboard'
+DASHBOARD_LIST_SIZE = 5
+
+# section -> leaderboard board
+DASHBOARD_BOARDS = {
+	'top_rated': LeaderboardEntry.TOP_RATED,
+	'trending': LeaderboardEntry.TRENDING,
+	'most_reviewed': LeaderboardEntry.MOST_REVIEWED,
+}
+
+
+def build_dashboard(limit: int = DASHBOARD_LIST_SIZE) -> dict:
+	ranked = top_movie_ids(DASHBOARD_BOARDS.values(), limit)
+	sections = {section: ranked[board] for section, board in DASHBOARD_BOARDS.items()}
+	sections['recent'] = list(Movie.objects.order_by('-created_at').values_list('id', flat=True)[:limit])
+
+	movie_ids = {movie_id for ids in sections.values() for movie_id in ids}
+	movies = list(movie_queryset().filter(id__in=movie_ids))
+	serialized = {
+		movie.id: data
+		for movie, data in zip(movies, MovieSerializer(movies, many=True).data)
+	}
+
+	return {
+		section: [serialized[movie_id] for movie_id in ids if movie_id in serialized]
+		for section, ids in sections.items()
+	}
+
+
+def get_dashboard() -> dict:
+	dashboard, _ = get_or_refresh(
+		DASHBOARD_CACHE_KEY,
+		build_dashboard,
+		timeout=settings.RECOMMENDATIONS_DASHBOARD_TTL,
+		alias=CACHE_ALIAS,
+	)
+	return dashboard
@@ -0,0 +1,147 @@
+"""
+Materialized homepage leaderboards
+
+Top rated, trending (per window, see recommendations.trending) and most
+reviewed rankings are stored as LeaderboardEntry rows (board, movie, score,
+tiebreak) behind a (board, -score, -tiebreak) index, so serving a list
+reads ``limit`` rows instead of ranking the whole movies table. Review
+signals refresh the affected movie's rows; rebuild_leaderboards recomputes
+every board and also ages activity out of the trending windows. The recent
+list needs no table: it is an index scan on Movie.created_at.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from common.response_cache import purge_tags, purge_tags_throttled
+from movies.models import Movie
+from .models import LeaderboardEntry
+from .trending import all_trending_scores, movie_trending_scores, prune_activity
+
+
+BOARDS = [board for board, _ in LeaderboardEntry.BOARD_CHOICES]
+
+Scores = Dict[str, Tuple[float, float]]
+
+
+def _movie_scores(avg_rating, review_count: int, trending: Dict[str, float]) -> Scores:
+	"""Return {board: (score, tiebreak)} for the boards the movie qualifies for"""
+	avg_rating = float(avg_rating or 0)
+	scores = {}
+	if review_count > 0 and avg_rating > 0:
+		scores[LeaderboardEntry.TOP_RATED] = (avg_rating, review_count)
+	for board, score in trending.items():
+		scores[board] = (score, avg_rating)
+	if review_count > 0:
+		scores[LeaderboardEntry.MOST_REVIEWED] = (review_count, avg_rating)
+	return scores
+
+
+def _upsert(entries: List[LeaderboardEntry], batch_size: int = 500) -> None:
+	LeaderboardEntry.objects.bulk_create(
+		entries,
+		batch_size=batch_size,
+		update_conflicts=True,
+		unique_fields=['board', 'movie'],
+		update_fields=['score', 'tiebreak', 'updated_at'],
+	)
+
+
+def refresh_movie(movie_id: int) -> None:
+	"""Recompute one movie's entries on every board from its stored aggregates"""
+	movie = Movie.objects.filter(pk=movie_id).values('avg_rating', 'review_count').first()
+	if movie is None:
+		return
+
+	trending = movie_trending_scores(movie_id) if movie['review_count'] else {}
+	scores = _movie_scores(movie['avg_rating'], movie['review_count'], trending)
+
+	now = timezone.now()
+	with transaction.atomic():
+		LeaderboardEntry.objects.filter(movie_id=movie_id).exclude(board__in=list(scores)).delete()
+		if scores:
+			_upsert([
+				LeaderboardEntry(board=board, movie_id=movie_id, score=score, tiebreak=tiebreak, updated_at=now)
+				for board, (score, tiebreak) in scores.items()
+			])
+	# Coalesced: under write load the boards are re-rendered at most once per interval
+	purge_tags_throttled('leaderboards', settings.RESPONSE_CACHE_RANKED_TTL)
+
+
+def refresh_movies(movie_ids: Iterable[int]) -> None:
+	for movie_id in set(movie_ids):
+		refresh_movie(movie_id)
+
+
+def rebuild_leaderboards(batch_size: int = 500) -> Dict[str, int]:
+	"""
+	Recompute every board from scratch
+
+	Returns the number of entries written per board.
+	"""
+	now = timezone.now()
+	prune_activity(now)
+	trending = all_trending_scores(now)
+	movies = (
+		Movie.objects
+		.filter(review_count__gt=0)
+		.order_by()
+		.values_list('id', 'avg_rating', 'review_count')
+	)
+
+	entries = []
+	counts = dict.fromkeys(BOARDS, 0)
+	for movie_id, avg_rating, review_count in movies.iterator(chunk_size=batch_size):
+		for board, (score, tiebreak) in _movie_scores(avg_rating, review_count, trending.get(movie_id, {})).items():
+			entries.append(LeaderboardEntry(board=board, movie_id=movie_id, score=score, tiebreak=tiebreak, updated_at=now))
+			counts[board] += 1
+
+	with transaction.atomic():
+		LeaderboardEntry.objects.all().delete()
+		LeaderboardEntry.objects.bulk_create(entries, batch_size=batch_size)
+	purge_tags('leaderboards')
+	return counts
+
+
+def leaderboard_queryset(board: str, queryset=None):
+	"""
+	Order a movie queryset by its position on ``board``
+
+	Only movies on the board are returned; slice the result to the list size.
+	"""
+	if queryset is None:
+		queryset = Movie.objects.all()
+	return (
+		queryset
+		.filter(leaderboard_entries__board=board)
+		.order_by('-leaderboard_entries__score', '-leaderboard_entries__tiebreak', 'id')
+	)
+
+
+def top_movie_ids(boards: Iterable[str], limit: int) -> Dict[str, List[int]]:
+	"""
+	Return {board: [movie_id, ...]} with the first ``limit`` movies of each board
+
+	Every board is read in one query, ranked with ROW_NUMBER() per board.
+	"""
+	boards = list(boards)
+	ranked = (
+		LeaderboardEntry.objects
+		.filter(board__in=boards)
+		.annotate(position=Window(
+			RowNumber(),
+			partition_by=F('board'),
+			order_by=[F('score').desc(), F('tiebreak').desc(), F('movie_id').asc()],
+		))
+		.filter(position__lte=limit)
+		.order_by()
+		.values_list('board', 'position', 'movie_id')
+	)
+	top = {board: [] for board in boards}
+	for board, _, movie_id in sorted(ranked):
+		top[board].append(movie_id)
+	return top
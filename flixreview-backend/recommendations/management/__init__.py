@@ -0,0 +1 @@
+"""Management command package"""
@@ -0,0 +1,68 @@
+"""
+Management command to build the persistent TF-IDF content model
+
+Usage:
+    python manage.py build_content_model                      # Build into RECOMMENDATION_MODEL_DIR
+    python manage.py build_content_model --max-features 1000  # Larger vocabulary
+    python manage.py build_content_model --output /tmp/models # Custom artifact directory
+    python manage.py build_content_model --top-k 100          # Store 100 neighbours per movie
+    python manage.py build_content_model --top-k 0            # Empty the neighbour table
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.services.artifacts import get_model_directory
+from recommendations.services.content_model import DEFAULT_TOP_K, ContentModel, store_similarity_index
+
+
+class Command(BaseCommand):
+    help = 'Build the TF-IDF content model used for similar-movie recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-features',
+            type=int,
+            default=500,
+            help='Maximum TF-IDF vocabulary size (default: 500)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Artifact directory (default: RECOMMENDATION_MODEL_DIR setting)'
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=DEFAULT_TOP_K,
+            help=f'Neighbours stored per movie in the similarity table, 0 to empty it (default: {DEFAULT_TOP_K})'
+        )
+
+    def handle(self, *args, **options):
+        max_features = options['max_features']
+        output = options.get('output') or get_model_directory()
+        top_k = options['top_k']
+
+        if max_features < 1:
+            raise CommandError('--max-features must be a positive integer')
+        if top_k < 0:
+            raise CommandError('--top-k cannot be negative')
+
+        self.stdout.write('Fitting TF-IDF content model...')
+        model = ContentModel.build(max_features=max_features)
+
+        if model is None:
+            raise CommandError('At least two movies are required to build the content model.')
+
+        build_dir = model.save(output)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Content model built for {len(model)} movies '
+                f'({model.matrix.shape[1]} features) at {build_dir}'
+            )
+        )
+
+        if top_k:
+            self.stdout.write(f'Computing top-{top_k} neighbours per movie...')
+        # Rows of a previous build would otherwise be served as current
+        written = store_similarity_index(model, top_k=top_k, directory=output)
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} similar-movie rows'))
@@ -0,0 +1,96 @@
+"""
+Management command to precompute personalized recommendations
+
+Usage:
+    python manage.py precompute_recommendations                         # Users active in the last 7 days
+    python manage.py precompute_recommendations --days 30 --workers 4   # Wider window, 4 processes
+    python manage.py precompute_recommendations --algorithms hybrid     # Only the default algorithm
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from recommendations.services.precompute import (
+    ALGORITHMS,
+    PRECOMPUTED_LIST_LENGTH,
+    active_user_ids,
+    compute_shard,
+    compute_user_recommendations,
+    init_worker,
+    store_user_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute top recommendation lists for recently active users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Include users active within this many days (default: 7)'
+        )
+        parser.add_argument(
+            '--algorithms',
+            type=str,
+            default=','.join(ALGORITHMS),
+            help=f'Comma-separated algorithms to precompute (default: {",".join(ALGORITHMS)})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes, 1 to run in-process (default: CPU count)'
+        )
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            default=100,
+            help='Users per worker task (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        workers = options['workers']
+        shard_size = options['shard_size']
+        algorithms = [a.strip() for a in options['algorithms'].split(',') if a.strip()]
+
+        unknown = set(algorithms) - set(ALGORITHMS)
+        if unknown:
+            raise CommandError(f'Unknown algorithm(s): {", ".join(sorted(unknown))}')
+        if days < 1 or workers < 1 or shard_size < 1:
+            raise CommandError('--days, --workers and --shard-size must be positive integers')
+
+        user_ids = active_user_ids(days)
+        if not user_ids:
+            self.stdout.write(self.style.WARNING(f'No users active in the last {days} days.'))
+            return
+
+        shards = [user_ids[i:i + shard_size] for i in range(0, len(user_ids), shard_size)]
+        self.stdout.write(
+            f'Precomputing {", ".join(algorithms)} recommendations for {len(user_ids)} users '
+            f'in {len(shards)} shard(s)...'
+        )
+
+        written = 0
+        if workers == 1 or len(shards) == 1:
+            for shard in shards:
+                written += store_user_recommendations(
+                    compute_user_recommendations(shard, algorithms, PRECOMPUTED_LIST_LENGTH)
+                )
+        else:
+            # Forked workers must not reuse the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                futures = [
+                    pool.submit(compute_shard, (shard, algorithms, PRECOMPUTED_LIST_LENGTH))
+                    for shard in shards
+                ]
+                for future in as_completed(futures):
+                    written += store_user_recommendations(future.result())
+                    self.stdout.write(f'  {written} lists stored')
+
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} precomputed recommendation lists'))
@@ -0,0 +1,45 @@
+"""
+Management command to rebuild the materialized homepage leaderboards
+
+Review writes keep the boards current; run this periodically (e.g. hourly)
+so activity ages out of the trending windows, and after bulk imports.
+
+Usage:
+    python manage.py rebuild_leaderboards                     # Rebuild every board
+    python manage.py rebuild_leaderboards --recount-activity  # Also rebuild hourly activity from reviews
+    python manage.py rebuild_leaderboards --batch-size 1000
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.leaderboards import rebuild_leaderboards
+from recommendations.trending import recount_activity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the top rated, trending and most reviewed leaderboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Entries per bulk insert (default: 500)'
+        )
+        parser.add_argument(
+            '--recount-activity',
+            action='store_true',
+            help='Recount the hourly trending buckets from reviews before rebuilding'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        if options['recount_activity']:
+            buckets = recount_activity(batch_size=batch_size)
+            self.stdout.write(f'Recounted {buckets} hourly activity bucket(s)')
+
+        counts = rebuild_leaderboards(batch_size=batch_size)
+        summary = ', '.join(f'{board}: {count}' for board, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt leaderboards ({summary})'))
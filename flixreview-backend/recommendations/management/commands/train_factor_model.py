@@ -0,0 +1,52 @@
+"""
+Management command to train the matrix-factorization recommender
+
+Usage:
+    python manage.py train_factor_model                 # 32 latent factors
+    python manage.py train_factor_model --factors 64    # Larger model
+    python manage.py train_factor_model --output /tmp/models
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.services.artifacts import get_model_directory
+from recommendations.services.factor_model import DEFAULT_FACTORS, FactorModel
+from recommendations.services.rating_matrix import RatingMatrix
+
+
+class Command(BaseCommand):
+    help = 'Train the truncated-SVD model used for factorization recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--factors',
+            type=int,
+            default=DEFAULT_FACTORS,
+            help=f'Number of latent factors (default: {DEFAULT_FACTORS})'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Artifact directory (default: RECOMMENDATION_MODEL_DIR setting)'
+        )
+
+    def handle(self, *args, **options):
+        factors = options['factors']
+        output = options.get('output') or get_model_directory()
+
+        if factors < 1:
+            raise CommandError('--factors must be a positive integer')
+
+        self.stdout.write('Building rating matrix...')
+        rating_matrix = RatingMatrix.build()
+        n_users, n_movies = rating_matrix.matrix.shape
+        self.stdout.write(f'{rating_matrix.n_ratings} ratings from {n_users} users on {n_movies} movies')
+
+        model = FactorModel.train(rating_matrix, factors=factors)
+        if model is None:
+            raise CommandError('At least two users and two rated movies are required to train the model.')
+
+        build_dir = model.save(output)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Factor model trained with {model.n_factors} factors at {build_dir}')
+        )
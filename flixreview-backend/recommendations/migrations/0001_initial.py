@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        (
+            "movies",
+            "0005_rename_movies_movi_tmdb_id_idx_movies_movi_tmdb_id_0e4cad_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarMovie",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_movies",
+                        to="movies.movie",
+                    ),
+                ),
+                (
+                    "neighbor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="movies.movie",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["movie", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("movie", "rank"), name="unique_similar_movie_rank"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recommendations", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("algorithm", models.CharField(max_length=20)),
+                ("items", models.JSONField(default=list)),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="precomputed_recommendations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["user", "algorithm"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "algorithm"), name="unique_user_recommendation"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:26
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def backfill_leaderboards(apps, schema_editor):
+    """Seed the boards from the stored movie aggregates and recent reviews"""
+    Movie = apps.get_model("movies", "Movie")
+    LeaderboardEntry = apps.get_model("recommendations", "LeaderboardEntry")
+
+    since = timezone.now() - timedelta(days=30)
+    movies = (
+        Movie.objects.filter(review_count__gt=0)
+        .order_by()
+        .annotate(recent_review_count=Count("reviews", filter=Q(reviews__created_at__gte=since)))
+        .values_list("id", "avg_rating", "review_count", "recent_review_count")
+    )
+
+    entries = []
+    for movie_id, avg_rating, review_count, recent_review_count in movies:
+        avg_rating = float(avg_rating or 0)
+        if avg_rating > 0:
+            entries.append(LeaderboardEntry(board="top_rated", movie_id=movie_id, score=avg_rating, tiebreak=review_count))
+        if recent_review_count:
+            entries.append(LeaderboardEntry(board="trending", movie_id=movie_id, score=recent_review_count, tiebreak=avg_rating))
+        entries.append(LeaderboardEntry(board="most_reviewed", movie_id=movie_id, score=review_count, tiebreak=avg_rating))
+
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0007_movie_created_at_index"),
+        ("recommendations", "0002_userrecommendation"),
+        ("reviews", "0003_review_like_comment_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "board",
+                    models.CharField(
+                        choices=[
+                            ("top_rated", "Top rated"),
+                            ("trending", "Trending"),
+                            ("most_reviewed", "Most reviewed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("tiebreak", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="movies.movie",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["board", "-score", "-tiebreak", "movie"],
+                "indexes": [
+                    models.Index(
+                        fields=["board", "-score", "-tiebreak", "movie"],
+                        name="leaderboard_rank_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("board", "movie"), name="unique_leaderboard_movie"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboards, migrations.RunPython.noop),
+    ]
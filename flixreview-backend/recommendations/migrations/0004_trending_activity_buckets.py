@@ -0,0 +1,122 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:33
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import groupby
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+# board -> (window hours, default half-life hours), as in recommendations.trending
+WINDOWS = {
+    "trending_24h": (24, 6),
+    "trending_7d": (24 * 7, 48),
+    "trending_30d": (24 * 30, 168),
+}
+
+
+def backfill_trending(apps, schema_editor):
+    """Bucket the last 30 days of reviews and seed the per-window trending boards"""
+    Movie = apps.get_model("movies", "Movie")
+    Review = apps.get_model("reviews", "Review")
+    LeaderboardEntry = apps.get_model("recommendations", "LeaderboardEntry")
+    MovieActivityBucket = apps.get_model("recommendations", "MovieActivityBucket")
+
+    now = timezone.now().astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    rows = (
+        Review.objects.filter(created_at__gte=now - timedelta(days=30))
+        .annotate(hour=TruncHour("created_at", tzinfo=dt_timezone.utc))
+        .order_by()
+        .values("movie_id", "hour")
+        .annotate(review_count=Count("id"))
+    )
+    buckets = [MovieActivityBucket(**row) for row in rows]
+    MovieActivityBucket.objects.bulk_create(buckets, batch_size=500)
+
+    avg_ratings = dict(Movie.objects.filter(review_count__gt=0).values_list("id", "avg_rating"))
+    entries = []
+    buckets.sort(key=lambda bucket: bucket.movie_id)
+    for movie_id, group in groupby(buckets, key=lambda bucket: bucket.movie_id):
+        group = list(group)
+        for board, (window_hours, half_life) in WINDOWS.items():
+            since = now - timedelta(hours=window_hours)
+            terms = [
+                ((bucket.hour - EPOCH).total_seconds() / 3600 / half_life, bucket.review_count)
+                for bucket in group
+                if bucket.hour >= since
+            ]
+            if not terms:
+                continue
+            top = max(exponent for exponent, _ in terms)
+            score = top + math.log2(sum(count * 2 ** (exponent - top) for exponent, count in terms))
+            entries.append(LeaderboardEntry(
+                board=board, movie_id=movie_id, score=score, tiebreak=float(avg_ratings.get(movie_id) or 0)
+            ))
+
+    LeaderboardEntry.objects.filter(board="trending").delete()
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0007_movie_created_at_index"),
+        ("recommendations", "0003_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="leaderboardentry",
+            name="board",
+            field=models.CharField(
+                choices=[
+                    ("top_rated", "Top rated"),
+                    ("trending_24h", "Trending (24 hours)"),
+                    ("trending_7d", "Trending (7 days)"),
+                    ("trending_30d", "Trending (30 days)"),
+                    ("most_reviewed", "Most reviewed"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="MovieActivityBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField()),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_buckets",
+                        to="movies.movie",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["movie", "hour"],
+                "indexes": [
+                    models.Index(fields=["hour"], name="recommendat_hour_172d8b_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("movie", "hour"), name="unique_movie_activity_hour"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_trending, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,92 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+from movies.models import Movie
+
+
+class SimilarMovie(models.Model):
+	"""Precomputed content-based neighbour of a movie (top-K per movie)"""
+	movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='similar_movies')
+	neighbor = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='+')
+	score = models.FloatField()
+	rank = models.PositiveSmallIntegerField()
+
+	def __str__(self):
+		return f"{self.movie_id} -> {self.neighbor_id} ({self.score:.3f})"
+
+	class Meta:
+		ordering = ['movie', 'rank']
+		constraints = [
+			models.UniqueConstraint(fields=['movie', 'rank'], name='unique_similar_movie_rank'),
+		]
+
+
+class UserRecommendation(models.Model):
+	"""Precomputed, ranked recommendation list for a user and algorithm"""
+	user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='precomputed_recommendations')
+	algorithm = models.CharField(max_length=20)
+	items = models.JSONField(default=list)
+	computed_at = models.DateTimeField()
+
+	def __str__(self):
+		return f"{self.algorithm} recommendations for user {self.user_id}"
+
+	class Meta:
+		ordering = ['user', 'algorithm']
+		constraints = [
+			models.UniqueConstraint(fields=['user', 'algorithm'], name='unique_user_recommendation'),
+		]
+
+
+class LeaderboardEntry(models.Model):
+	"""A movie's precomputed position on one of the homepage leaderboards"""
+	TOP_RATED = 'top_rated'
+	TRENDING_24H = 'trending_24h'
+	TRENDING_7D = 'trending_7d'
+	TRENDING_30D = 'trending_30d'
+	TRENDING = TRENDING_30D
+	MOST_REVIEWED = 'most_reviewed'
+	BOARD_CHOICES = [
+		(TOP_RATED, 'Top rated'),
+		(TRENDING_24H, 'Trending (24 hours)'),
+		(TRENDING_7D, 'Trending (7 days)'),
+		(TRENDING_30D, 'Trending (30 days)'),
+		(MOST_REVIEWED, 'Most reviewed'),
+	]
+
+	board = models.CharField(max_length=20, choices=BOARD_CHOICES)
+	movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='leaderboard_entries')
+	score = models.FloatField()
+	tiebreak = models.FloatField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"{self.board}: {self.movie_id} ({self.score:g})"
+
+	class Meta:
+		ordering = ['board', '-score', '-tiebreak', 'movie']
+		constraints = [
+			models.UniqueConstraint(fields=['board', 'movie'], name='unique_leaderboard_movie'),
+		]
+		indexes = [
+			models.Index(fields=['board', '-score', '-tiebreak', 'movie'], name='leaderboard_rank_idx'),
+		]
+
+
+class MovieActivityBucket(models.Model):
+	"""Number of reviews a movie received in one clock hour (feeds trending)"""
+	movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='activity_buckets')
+	hour = models.DateTimeField()
+	review_count = models.PositiveIntegerField(default=0)
+
+	def __str__(self):
+		return f"{self.movie_id} @ {self.hour:%Y-%m-%d %H}:00 ({self.review_count})"
+
+	class Meta:
+		ordering = ['movie', 'hour']
+		constraints = [
+			models.UniqueConstraint(fields=['movie', 'hour'], name='unique_movie_activity_hour'),
+		]
+		indexes = [
+			models.Index(fields=['hour']),
+		]
@@ -1,4 +1,14 @@
 """Services module for recommendations app"""
 from .recommendation_engine import RecommendationEngine
+from .content_model import ContentModel, get_content_model
+from .factor_model import FactorModel, get_factor_model
+from .rating_matrix import RatingMatrix
 
-__all__ = ['RecommendationEngine']
+__all__ = [
+    'RecommendationEngine',
+    'ContentModel',
+    'get_content_model',
+    'FactorModel',
+    'get_factor_model',
+    'RatingMatrix',
+]
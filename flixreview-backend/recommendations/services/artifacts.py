@@ -0,0 +1,111 @@
+"""
+Recommendation Model Artifacts
+
+Shared helpers for models that are trained offline and published to disk:
+- Versioned build directories under RECOMMENDATION_MODEL_DIR
+- Atomic manifest publishing so workers never read a half-written build
+- A per-process loader that reads each published build once
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Number of previous artifact builds kept next to the current one
+KEEP_PREVIOUS_BUILDS = 1
+
+
+def get_model_directory() -> Path:
+    """Return the root directory holding recommendation model artifacts"""
+    return Path(settings.RECOMMENDATION_MODEL_DIR)
+
+
+def new_build_directory(root: Path, prefix: str) -> Path:
+    """Create an empty, timestamped build directory such as ``content-v1-<timestamp>``"""
+    build_dir = root / f"{prefix}-{timezone.now().strftime('%Y%m%d%H%M%S%f')}"
+    build_dir.mkdir(parents=True, exist_ok=False)
+    return build_dir
+
+
+def write_manifest(root: Path, manifest_name: str, manifest: Dict[str, Any]) -> None:
+    """Atomically replace a manifest"""
+    root.mkdir(parents=True, exist_ok=True)
+    tmp_manifest = root / f".{manifest_name}.tmp"
+    tmp_manifest.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_manifest, root / manifest_name)
+
+
+def publish_build(root: Path, manifest_name: str, build_dir: Path, manifest: Dict[str, Any]) -> None:
+    """Atomically point the manifest at a finished build and prune older builds"""
+    write_manifest(root, manifest_name, {**manifest, 'build': build_dir.name})
+
+    prefix = build_dir.name.rsplit('-', 1)[0]
+    builds = sorted(
+        (path for path in root.glob(f'{prefix}-*') if path.is_dir() and path.name != build_dir.name),
+        key=lambda path: path.name,
+        reverse=True,
+    )
+    for path in builds[KEEP_PREVIOUS_BUILDS:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def read_manifest(root: Path, manifest_name: str, version: int) -> Optional[Tuple[Dict[str, Any], Path]]:
+    """
+    Return (manifest, build_dir) for the published build
+
+    Returns None when nothing is published or the build was written by an
+    incompatible artifact version.
+    """
+    manifest_path = root / manifest_name
+    if not manifest_path.exists():
+        return None
+
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get('version') != version:
+        logger.warning(
+            f"Ignoring {manifest_name} version {manifest.get('version')} (expected {version}). "
+            f"Rebuild the artifact."
+        )
+        return None
+
+    return manifest, root / manifest['build']
+
+
+_loaded: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_load_lock = threading.Lock()
+
+
+def load_published(manifest_name: str, loader: Callable[[Path], Any]) -> Any:
+    """
+    Return the published artifact for this process
+
+    ``loader`` is called with the artifact root at most once per published
+    build; the result is reused until the manifest is replaced.
+    """
+    root = get_model_directory()
+    try:
+        mtime = (root / manifest_name).stat().st_mtime
+    except OSError:
+        return None
+
+    key = (str(root), manifest_name)
+    cached = _loaded.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with _load_lock:
+        cached = _loaded.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        artifact = loader(root)
+        _loaded[key] = (mtime, artifact)
+        return artifact
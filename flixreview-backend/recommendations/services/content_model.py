@@ -0,0 +1,289 @@
+"""
+Persistent TF-IDF Content Model
+
+This service provides:
+- Building the TF-IDF vectorizer and sparse movie matrix used for content-based filtering
+- Versioned on-disk artifacts so the model is built once by a management command
+- A per-process loader so each worker reads the artifact a single time
+- Single-row similarity queries (one sparse row-by-matrix product per request)
+- A precomputed top-K neighbour table so similar-movie lookups become an indexed read
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.utils import timezone
+
+from .artifacts import (
+    get_model_directory,
+    load_published,
+    new_build_directory,
+    publish_build,
+    read_manifest,
+    write_manifest,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout or feature construction changes so stale
+# artifacts are ignored instead of being loaded with the wrong assumptions.
+CONTENT_MODEL_VERSION = 1
+
+MANIFEST_NAME = 'content_model.json'
+VECTORIZER_NAME = 'vectorizer.joblib'
+MATRIX_NAME = 'tfidf_matrix.npz'
+MOVIE_IDS_NAME = 'movie_ids.npy'
+# Records how the SimilarMovie table was last built
+SIMILARITY_MANIFEST_NAME = 'similar_movies.json'
+
+# Neighbours stored per movie in the SimilarMovie table
+DEFAULT_TOP_K = 50
+
+
+def movie_document(movie) -> str:
+    """Build the text document used to vectorize a movie (genres weighted twice)"""
+    genres_text = ' '.join([g.name for g in movie.genres.all()])
+    return f"{movie.description} {genres_text} {genres_text}"
+
+
+class ContentModel:
+    """TF-IDF vectorizer plus the sparse, L2-normalised movie matrix it produced"""
+
+    def __init__(self, vectorizer, matrix, movie_ids: Iterable[int], built_at: str = ''):
+        self.vectorizer = vectorizer
+        self.matrix = matrix.tocsr()
+        self.movie_ids = [int(movie_id) for movie_id in movie_ids]
+        self.movie_index: Dict[int, int] = {movie_id: idx for idx, movie_id in enumerate(self.movie_ids)}
+        self.built_at = built_at
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    def __contains__(self, movie_id: int) -> bool:
+        return movie_id in self.movie_index
+
+    @classmethod
+    def build(cls, movies=None, max_features: int = 500) -> Optional['ContentModel']:
+        """
+        Fit a new model over the given movies (all movies by default)
+
+        Returns None when there are not enough movies to compare.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from movies.models import Movie
+
+        if movies is None:
+            movies = Movie.objects.only('id', 'description').prefetch_related('genres').order_by('id')
+
+        movie_ids = []
+        documents = []
+        for movie in movies:
+            movie_ids.append(movie.id)
+            documents.append(movie_document(movie))
+
+        if len(movie_ids) < 2:
+            return None
+
+        vectorizer = TfidfVectorizer(
+            max_features=max_features,
+            stop_words='english',
+            ngram_range=(1, 2)
+        )
+        matrix = vectorizer.fit_transform(documents)
+
+        return cls(vectorizer, matrix, movie_ids, built_at=timezone.now().isoformat())
+
+    def vector_for(self, movie):
+        """Return the TF-IDF row for a movie, transforming it if it was added after the build"""
+        idx = self.movie_index.get(movie.id)
+        if idx is not None:
+            return self.matrix[idx]
+        return self.vectorizer.transform([movie_document(movie)])
+
+    def similar_to(self, movie, limit: int) -> List[Tuple[int, float]]:
+        """
+        Return up to ``limit`` (movie_id, similarity) pairs for the given movie
+
+        Rows are L2-normalised, so cosine similarity is a single sparse
+        row-by-matrix product rather than a full N x N computation.
+        """
+        import numpy as np
+
+        if limit < 1 or not self.movie_ids:
+            return []
+
+        scores = (self.matrix @ self.vector_for(movie).T).toarray().ravel()
+
+        source_idx = self.movie_index.get(movie.id)
+        if source_idx is not None:
+            scores[source_idx] = -np.inf
+
+        candidates = min(limit, len(scores))
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [
+            (self.movie_ids[idx], float(scores[idx]))
+            for idx in top
+            if np.isfinite(scores[idx])
+        ]
+
+    def iter_top_neighbors(self, k: int, batch_size: int = 500) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+        """
+        Yield (movie_id, [(neighbor_id, similarity), ...]) for every movie
+
+        Similarities are computed in row blocks so memory stays bounded at
+        batch_size x N instead of materialising the full N x N matrix.
+        """
+        import numpy as np
+
+        total = len(self.movie_ids)
+        k = min(k, total - 1)
+        if k < 1:
+            return
+
+        matrix_t = self.matrix.T.tocsc()
+        for start in range(0, total, batch_size):
+            block = (self.matrix[start:start + batch_size] @ matrix_t).toarray()
+            rows = np.arange(block.shape[0])
+            block[rows, rows + start] = -np.inf
+
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row in rows:
+                neighbors = [
+                    (self.movie_ids[idx], float(score))
+                    for idx, score in zip(top[row], top_scores[row])
+                    if np.isfinite(score)
+                ]
+                yield self.movie_ids[start + row], neighbors
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """
+        Write the model to a new versioned build directory and publish it
+
+        The manifest is replaced atomically, so workers never observe a
+        half-written artifact.
+        """
+        import joblib
+        import numpy as np
+        from scipy import sparse
+
+        root = Path(directory) if directory else get_model_directory()
+        build_dir = new_build_directory(root, f"content-v{CONTENT_MODEL_VERSION}")
+
+        joblib.dump(self.vectorizer, build_dir / VECTORIZER_NAME)
+        sparse.save_npz(build_dir / MATRIX_NAME, self.matrix)
+        np.save(build_dir / MOVIE_IDS_NAME, np.asarray(self.movie_ids, dtype=np.int64))
+
+        publish_build(root, MANIFEST_NAME, build_dir, {
+            'version': CONTENT_MODEL_VERSION,
+            'built_at': self.built_at,
+            'movies': len(self.movie_ids),
+            'features': int(self.matrix.shape[1]),
+        })
+        return build_dir
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional['ContentModel']:
+        """Load the currently published model, or None if none is available"""
+        import joblib
+        import numpy as np
+        from scipy import sparse
+
+        root = Path(directory) if directory else get_model_directory()
+
+        try:
+            published = read_manifest(root, MANIFEST_NAME, CONTENT_MODEL_VERSION)
+            if published is None:
+                return None
+            manifest, build_dir = published
+
+            vectorizer = joblib.load(build_dir / VECTORIZER_NAME)
+            matrix = sparse.load_npz(build_dir / MATRIX_NAME)
+            movie_ids = np.load(build_dir / MOVIE_IDS_NAME)
+        except Exception as e:
+            logger.error(f"Could not load content model from {root}: {e}")
+            return None
+
+        return cls(vectorizer, matrix, movie_ids, built_at=manifest.get('built_at', ''))
+
+
+def store_similarity_index(
+    model: ContentModel,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = 500,
+    directory: Optional[Path] = None,
+) -> int:
+    """
+    Replace the SimilarMovie table with the model's top-K neighbours
+
+    A top_k of 0 empties the table. The K and catalogue size of the build
+    are published next to the model artifacts (see get_similarity_depth).
+    Returns the number of neighbour rows written.
+    """
+    from django.db import transaction
+    from recommendations.models import SimilarMovie
+
+    written = 0
+    with transaction.atomic():
+        SimilarMovie.objects.all().delete()
+        pending = []
+        for movie_id, neighbors in model.iter_top_neighbors(top_k, batch_size=batch_size):
+            pending.extend(
+                SimilarMovie(movie_id=movie_id, neighbor_id=neighbor_id, score=score, rank=rank)
+                for rank, (neighbor_id, score) in enumerate(neighbors, start=1)
+            )
+            if len(pending) >= 5000:
+                SimilarMovie.objects.bulk_create(pending)
+                written += len(pending)
+                pending = []
+        if pending:
+            SimilarMovie.objects.bulk_create(pending)
+            written += len(pending)
+
+    write_manifest(Path(directory) if directory else get_model_directory(), SIMILARITY_MANIFEST_NAME, {
+        'version': CONTENT_MODEL_VERSION,
+        'built_at': timezone.now().isoformat(),
+        'top_k': top_k,
+        'movies': len(model),
+    })
+    return written
+
+
+def _load_similarity_manifest(root: Path) -> Optional[Dict]:
+    try:
+        manifest = json.loads((root / SIMILARITY_MANIFEST_NAME).read_text())
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read {SIMILARITY_MANIFEST_NAME} from {root}: {e}")
+        return None
+    return manifest if manifest.get('version') == CONTENT_MODEL_VERSION else None
+
+
+def get_similarity_depth() -> Optional[int]:
+    """
+    Return the number of neighbours the last build stored per movie
+
+    That is the build's K, capped by its catalogue size less the movie
+    itself; None when no build has been published.
+    """
+    manifest = load_published(SIMILARITY_MANIFEST_NAME, _load_similarity_manifest)
+    if manifest is None:
+        return None
+    return max(min(manifest['top_k'], manifest['movies'] - 1), 0)
+
+
+def get_content_model() -> Optional[ContentModel]:
+    """
+    Return the published content model for this process
+
+    The artifact is read from disk once per worker and only re-read when
+    the manifest is replaced by a newer build.
+    """
+    return load_published(MANIFEST_NAME, ContentModel.load)
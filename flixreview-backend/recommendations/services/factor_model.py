@@ -0,0 +1,181 @@
+"""
+Matrix-Factorization Recommender
+
+This service provides:
+- Offline truncated-SVD training over the sparse rating matrix
+- User and item factor arrays published to disk as a versioned artifact
+- Fold-in of a user's current ratings, so new reviews personalise results
+  immediately without retraining
+- Scoring as a single dot product against the item factor matrix
+"""
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from .artifacts import (
+    get_model_directory,
+    load_published,
+    new_build_directory,
+    publish_build,
+    read_manifest,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout or training procedure changes
+FACTOR_MODEL_VERSION = 1
+
+MANIFEST_NAME = 'factor_model.json'
+ITEM_FACTORS_NAME = 'item_factors.npy'
+USER_FACTORS_NAME = 'user_factors.npy'
+MOVIE_IDS_NAME = 'movie_ids.npy'
+USER_IDS_NAME = 'user_ids.npy'
+
+DEFAULT_FACTORS = 32
+
+
+class FactorModel:
+    """
+    Truncated-SVD factorization R ~ U S V^T of the users x movies rating matrix
+
+    Item factors are V; a user's vector is their rating row projected onto
+    V (r_u V, which equals the user's row of U S for training users). That
+    projection is the fold-in used for users and ratings added after training.
+    """
+
+    def __init__(self, item_factors, movie_ids: Iterable[int], user_factors, user_ids: Iterable[int], built_at: str = ''):
+        import numpy as np
+
+        self.item_factors = np.asarray(item_factors, dtype=np.float64)
+        self.user_factors = np.asarray(user_factors, dtype=np.float64)
+        self.movie_ids = [int(movie_id) for movie_id in movie_ids]
+        self.user_ids = [int(user_id) for user_id in user_ids]
+        self.movie_index: Dict[int, int] = {movie_id: idx for idx, movie_id in enumerate(self.movie_ids)}
+        self.user_index: Dict[int, int] = {user_id: idx for idx, user_id in enumerate(self.user_ids)}
+        self.built_at = built_at
+
+    @property
+    def n_factors(self) -> int:
+        return int(self.item_factors.shape[1])
+
+    @classmethod
+    def train(cls, rating_matrix=None, factors: int = DEFAULT_FACTORS, random_state: int = 42) -> Optional['FactorModel']:
+        """
+        Fit the factorization (all reviews by default)
+
+        Returns None when there is not enough data for a rank-1 model.
+        """
+        from sklearn.decomposition import TruncatedSVD
+        from .rating_matrix import RatingMatrix
+
+        if rating_matrix is None:
+            rating_matrix = RatingMatrix.build()
+
+        n_users, n_movies = rating_matrix.matrix.shape
+        factors = min(factors, n_users - 1, n_movies - 1)
+        if factors < 1:
+            return None
+
+        svd = TruncatedSVD(n_components=factors, random_state=random_state)
+        user_factors = svd.fit_transform(rating_matrix.matrix)
+        item_factors = svd.components_.T
+
+        return cls(
+            item_factors,
+            rating_matrix.movie_ids,
+            user_factors,
+            rating_matrix.user_ids,
+            built_at=timezone.now().isoformat(),
+        )
+
+    def fold_in(self, ratings: Dict[int, float]):
+        """Project a {movie_id: rating} mapping into the latent space"""
+        import numpy as np
+
+        vector = np.zeros(self.n_factors)
+        for movie_id, rating in ratings.items():
+            idx = self.movie_index.get(movie_id)
+            if idx is not None:
+                vector += rating * self.item_factors[idx]
+        return vector
+
+    def recommend(self, ratings: Dict[int, float], limit: int) -> List[Tuple[int, float]]:
+        """
+        Return up to ``limit`` (movie_id, score) pairs for unseen movies
+
+        ``ratings`` are the user's current ratings; folding them in keeps
+        results fresh for reviews written after training.
+        """
+        import numpy as np
+
+        if limit < 1 or not ratings:
+            return []
+
+        scores = self.item_factors @ self.fold_in(ratings)
+        for movie_id in ratings:
+            idx = self.movie_index.get(movie_id)
+            if idx is not None:
+                scores[idx] = -np.inf
+
+        candidates = min(limit, len(scores))
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        return [
+            (self.movie_ids[idx], float(scores[idx]))
+            for idx in top
+            if np.isfinite(scores[idx])
+        ]
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """Write the factor arrays to a new versioned build directory and publish it"""
+        import numpy as np
+
+        root = Path(directory) if directory else get_model_directory()
+        build_dir = new_build_directory(root, f"factors-v{FACTOR_MODEL_VERSION}")
+
+        np.save(build_dir / ITEM_FACTORS_NAME, self.item_factors)
+        np.save(build_dir / USER_FACTORS_NAME, self.user_factors)
+        np.save(build_dir / MOVIE_IDS_NAME, np.asarray(self.movie_ids, dtype=np.int64))
+        np.save(build_dir / USER_IDS_NAME, np.asarray(self.user_ids, dtype=np.int64))
+
+        publish_build(root, MANIFEST_NAME, build_dir, {
+            'version': FACTOR_MODEL_VERSION,
+            'built_at': self.built_at,
+            'users': len(self.user_ids),
+            'movies': len(self.movie_ids),
+            'factors': self.n_factors,
+        })
+        return build_dir
+
+    @classmethod
+    def load(cls, directory: Optional[Path] = None) -> Optional['FactorModel']:
+        """Load the currently published model, or None if none is available"""
+        import numpy as np
+
+        root = Path(directory) if directory else get_model_directory()
+
+        try:
+            published = read_manifest(root, MANIFEST_NAME, FACTOR_MODEL_VERSION)
+            if published is None:
+                return None
+            manifest, build_dir = published
+
+            # Memory-map the large arrays so workers share pages with the OS cache
+            item_factors = np.load(build_dir / ITEM_FACTORS_NAME, mmap_mode='r')
+            user_factors = np.load(build_dir / USER_FACTORS_NAME, mmap_mode='r')
+            movie_ids = np.load(build_dir / MOVIE_IDS_NAME)
+            user_ids = np.load(build_dir / USER_IDS_NAME)
+        except Exception as e:
+            logger.error(f"Could not load factor model from {root}: {e}")
+            return None
+
+        return cls(item_factors, movie_ids, user_factors, user_ids, built_at=manifest.get('built_at', ''))
+
+
+def get_factor_model() -> Optional[FactorModel]:
+    """Return the published factor model for this process (loaded once per build)"""
+    return load_published(MANIFEST_NAME, FactorModel.load)
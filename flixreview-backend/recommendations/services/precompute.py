@@ -0,0 +1,123 @@
+"""
+Batch Recommendation Precomputation
+
+This service provides:
+- Selection of recently active users
+- Sharded computation of one canonical top-N list per user and algorithm
+- Storage and lookup of the precomputed lists (views slice them for any limit)
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ('hybrid', 'collaborative', 'factorization', 'content')
+
+# Length of every stored list; the for-you endpoint never asks for more
+PRECOMPUTED_LIST_LENGTH = 50
+
+
+def active_user_ids(days: int) -> List[int]:
+    """Return ids of users who logged in or wrote a review in the last ``days`` days"""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Q
+
+    User = get_user_model()
+    cutoff = timezone.now() - timedelta(days=days)
+
+    return list(
+        User.objects
+        .filter(is_active=True)
+        .filter(Q(last_login__gte=cutoff) | Q(reviews__created_at__gte=cutoff) | Q(reviews__updated_at__gte=cutoff))
+        .values_list('id', flat=True)
+        .distinct()
+        .order_by('id')
+    )
+
+
+def compute_user_recommendations(
+    user_ids: Sequence[int],
+    algorithms: Sequence[str] = ALGORITHMS,
+    length: int = PRECOMPUTED_LIST_LENGTH,
+) -> List[Tuple[int, str, List[Dict]]]:
+    """Compute (user_id, algorithm, items) for every user and algorithm in the shard"""
+    from .recommendation_engine import RecommendationEngine
+
+    engine = RecommendationEngine()
+    results = []
+    for user_id in user_ids:
+        for algorithm in algorithms:
+            try:
+                items = engine.get_recommendations(user_id, algorithm=algorithm, limit=length)
+            except Exception as e:
+                logger.error(f"Could not precompute {algorithm} recommendations for user {user_id}: {e}")
+                continue
+            results.append((user_id, algorithm, items))
+    return results
+
+
+def store_user_recommendations(results: Iterable[Tuple[int, str, List[Dict]]]) -> int:
+    """Replace the stored lists for the given (user, algorithm) pairs; returns rows written"""
+    from django.db import transaction
+    from recommendations.models import UserRecommendation
+
+    computed_at = timezone.now()
+    rows = [
+        UserRecommendation(user_id=user_id, algorithm=algorithm, items=items, computed_at=computed_at)
+        for user_id, algorithm, items in results
+    ]
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        UserRecommendation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'algorithm'],
+            update_fields=['items', 'computed_at'],
+        )
+    return len(rows)
+
+
+def get_precomputed_recommendations(user_id: int, algorithm: str) -> Optional[List[Dict]]:
+    """
+    Return the stored list for a user and algorithm, or None when missing or expired
+
+    Lists older than PRECOMPUTED_RECOMMENDATIONS_MAX_AGE seconds are ignored.
+    """
+    from recommendations.models import UserRecommendation
+
+    max_age = getattr(settings, 'PRECOMPUTED_RECOMMENDATIONS_MAX_AGE', 86400)
+    entry = (
+        UserRecommendation.objects
+        .filter(
+            user_id=user_id,
+            algorithm=algorithm,
+            computed_at__gte=timezone.now() - timedelta(seconds=max_age),
+        )
+        .only('items')
+        .first()
+    )
+    return entry.items if entry else None
+
+
+def init_worker() -> None:
+    """Process-pool initializer: make Django usable and drop inherited DB connections"""
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def compute_shard(args: Tuple[Sequence[int], Sequence[str], int]) -> List[Tuple[int, str, List[Dict]]]:
+    """Process-pool entry point for one shard of users"""
+    user_ids, algorithms, length = args
+    return compute_user_recommendations(user_ids, algorithms, length)
@@ -0,0 +1,158 @@
+"""
+Sparse User-Item Rating Matrix
+
+This service provides:
+- A scipy CSR users x movies rating matrix built straight from review tuples
+- Integer index maps between user/movie ids and matrix rows/columns
+- Cosine similarity computed only for a target user's row
+- Vectorized neighbour scoring over the in-memory matrix (no per-neighbour queries)
+
+Memory scales with the number of reviews rather than users x movies.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class RatingMatrix:
+    """CSR rating matrix with user and movie index maps"""
+
+    def __init__(self, matrix, user_ids: Iterable[int], movie_ids: Iterable[int]):
+        self.matrix = matrix.tocsr()
+        self.user_ids = list(user_ids)
+        self.movie_ids = list(movie_ids)
+        self.user_index: Dict[int, int] = {user_id: idx for idx, user_id in enumerate(self.user_ids)}
+        self.movie_index: Dict[int, int] = {movie_id: idx for idx, movie_id in enumerate(self.movie_ids)}
+        self._row_norms = None
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.user_index
+
+    @property
+    def n_ratings(self) -> int:
+        """Number of stored (user, movie) ratings"""
+        return int(self.matrix.nnz)
+
+    @classmethod
+    def build(cls, ratings: Optional[Iterable[Tuple[int, int, int]]] = None) -> 'RatingMatrix':
+        """
+        Build the matrix from (user_id, movie_id, rating) tuples
+
+        Defaults to every review, fetched as plain tuples without model instances.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        if ratings is None:
+            from reviews.models import Review
+            ratings = Review.objects.values_list('user_id', 'movie_id', 'rating').iterator()
+
+        triples = np.fromiter(
+            (value for triple in ratings for value in triple),
+            dtype=np.int64,
+        ).reshape(-1, 3)
+
+        user_ids, rows = np.unique(triples[:, 0], return_inverse=True)
+        movie_ids, cols = np.unique(triples[:, 1], return_inverse=True)
+
+        matrix = sparse.csr_matrix(
+            (triples[:, 2].astype(np.float64), (rows, cols)),
+            shape=(len(user_ids), len(movie_ids)),
+        )
+        return cls(matrix, user_ids.tolist(), movie_ids.tolist())
+
+    @property
+    def row_norms(self):
+        """L2 norm of every user's rating vector (computed once)"""
+        import numpy as np
+
+        if self._row_norms is None:
+            self._row_norms = np.sqrt(np.asarray(self.matrix.multiply(self.matrix).sum(axis=1)).ravel())
+        return self._row_norms
+
+    def user_row(self, user_id: int):
+        """Return the user's sparse rating row"""
+        return self.matrix[self.user_index[user_id]]
+
+    def user_similarities(self, user_id: int):
+        """
+        Cosine similarity between the user and every other user
+
+        Only the target row is multiplied against the matrix, so no
+        users x users matrix is ever materialised.
+        """
+        import numpy as np
+
+        idx = self.user_index[user_id]
+        dots = (self.matrix @ self.matrix[idx].T).toarray().ravel()
+        norms = self.row_norms * self.row_norms[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarities = np.where(norms > 0, dots / norms, 0.0)
+        similarities[idx] = -np.inf
+        return similarities
+
+    def similar_users(self, user_id: int, limit: int) -> List[Tuple[int, float]]:
+        """Return the ``limit`` most similar (user_id, similarity) pairs, best first"""
+        import numpy as np
+
+        if user_id not in self.user_index or limit < 1:
+            return []
+
+        similarities = self.user_similarities(user_id)
+        candidates = min(limit, len(similarities) - 1)
+        if candidates < 1:
+            return []
+
+        top = np.argpartition(-similarities, candidates - 1)[:candidates]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+
+        return [(self.user_ids[idx], float(similarities[idx])) for idx in top]
+
+    def score_unseen_movies(
+        self,
+        user_id: int,
+        neighbors: List[Tuple[int, float]],
+        limit: int,
+        min_rating: int = 4,
+    ) -> List[Tuple[int, float]]:
+        """
+        Predict ratings for movies the user has not reviewed
+
+        Each movie's score is the similarity-weighted sum of the neighbours'
+        high ratings (>= min_rating) divided by how many neighbours gave one,
+        computed as one sparse product over the neighbour rows and masked by
+        the user's already-reviewed movies.
+
+        Returns up to ``limit`` (movie_id, predicted_rating) pairs, best first.
+        """
+        import numpy as np
+
+        if user_id not in self.user_index or limit < 1:
+            return []
+
+        positive = [(self.user_index[uid], sim) for uid, sim in neighbors if sim > 0 and uid in self.user_index]
+        if not positive:
+            return []
+
+        rows = [row for row, _ in positive]
+        weights = np.asarray([sim for _, sim in positive], dtype=np.float64)
+
+        neighbor_ratings = self.matrix[rows]
+        liked = neighbor_ratings.multiply(neighbor_ratings >= min_rating).tocsr()
+
+        weighted = np.asarray(liked.T @ weights).ravel()
+        counts = np.asarray((liked > 0).sum(axis=0)).ravel()
+
+        seen = self.user_row(user_id).indices
+        counts[seen] = 0
+
+        candidates = np.flatnonzero(counts)
+        if not len(candidates):
+            return []
+
+        predicted = weighted[candidates] / counts[candidates]
+        order = np.argsort(-predicted, kind='stable')[:limit]
+
+        return [(self.movie_ids[candidates[idx]], float(predicted[idx])) for idx in order]
@@ -4,12 +4,15 @@ ML-Based Recommendation Engine
 This service provides:
 - Content-based filtering (TF-IDF on descriptions and genres)
 - Collaborative filtering (user-user similarity based on ratings)
+- Matrix factorization (offline truncated SVD with per-request fold-in)
 - Hybrid recommendations combining both approaches
 """
 import logging
 from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
 
+from .content_model import DEFAULT_TOP_K, get_similarity_depth
+
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +39,41 @@ class RecommendationEngine:
         """Check if ML recommendations are enabled"""
         return self.enabled
     
+    def get_recommendations(
+        self,
+        user_id: int,
+        algorithm: str = 'hybrid',
+        limit: int = 10
+    ) -> List[Dict]:
+        """
+        Get ranked recommendations for a user with the named algorithm
+        
+        Args:
+            user_id: ID of the user to get recommendations for
+            algorithm: 'hybrid' (default), 'collaborative', 'factorization' or 'content'
+            limit: Number of recommendations to return
+            
+        Returns:
+            List of movie dictionaries ordered by rank
+        """
+        if algorithm == 'collaborative':
+            return self.get_collaborative_recommendations(user_id, limit=limit)
+        if algorithm == 'factorization':
+            return self.get_factorization_recommendations(user_id, limit=limit)
+        if algorithm == 'content':
+            from reviews.models import Review
+            
+            # Use most recent highly-rated movie as seed
+            recent_liked = Review.objects.filter(
+                user_id=user_id,
+                rating__gte=4
+            ).order_by('-created_at').only('movie_id').first()
+            
+            if not recent_liked:
+                return []
+            return self.get_content_based_recommendations(recent_liked.movie_id, limit=limit)
+        return self.get_hybrid_recommendations(user_id, limit=limit)
+    
     def get_content_based_recommendations(
         self, 
         movie_id: int, 
@@ -57,84 +95,101 @@ class RecommendationEngine:
         from django.db.models import Q
         
         try:
-            source_movie = Movie.objects.prefetch_related('genres').get(id=movie_id)
+            source_movie = Movie.objects.get(id=movie_id)
         except Movie.DoesNotExist:
             logger.error(f"Movie {movie_id} not found")
             return []
         
+        # Precomputed neighbours turn the lookup into an indexed read
+        indexed = self._indexed_content_based(source_movie, limit)
+        if indexed is not None:
+            return indexed
+        
         if self.enabled:
             return self._ml_content_based(source_movie, limit)
         else:
             # Fallback to simple genre-based recommendations
             return self._simple_genre_based(source_movie, limit)
     
+    def _indexed_content_based(self, source_movie, limit: int) -> Optional[List[Dict]]:
+        """
+        Serve content recommendations from the precomputed SimilarMovie table
+        
+        A movie with as many rows as its build stored (get_similarity_depth:
+        the build's K capped by its catalogue size) is complete even when
+        ``limit`` is larger, e.g. the hybrid path asking for twice its list
+        length. Returns None when the table holds fewer than that for the
+        movie (e.g. it was imported after the last build).
+        """
+        from recommendations.models import SimilarMovie
+        
+        neighbors = list(
+            SimilarMovie.objects
+            .filter(movie=source_movie)
+            .select_related('neighbor')
+            .only(
+                'score', 'rank', 'neighbor__id', 'neighbor__title', 'neighbor__avg_rating',
+                'neighbor__poster_url', 'neighbor__release_date'
+            )
+            .order_by('rank')[:limit]
+        )
+        
+        depth = get_similarity_depth()
+        if depth is None:
+            depth = DEFAULT_TOP_K
+        if not neighbors or len(neighbors) < min(limit, depth):
+            return None
+        
+        recommendations = []
+        for idx, entry in enumerate(neighbors):
+            movie = entry.neighbor
+            recommendations.append({
+                'movie_id': movie.id,
+                'title': movie.title,
+                'similarity_score': entry.score,
+                'avg_rating': float(movie.avg_rating),
+                'poster_url': movie.poster_url or '',
+                'release_date': str(movie.release_date) if movie.release_date else '',
+                'rank': idx + 1
+            })
+        
+        return recommendations
+    
     def _ml_content_based(self, source_movie, limit: int) -> List[Dict]:
-        """ML-based content filtering using TF-IDF"""
+        """ML-based content filtering using the persisted TF-IDF model"""
         try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            import numpy as np
-            import pandas as pd
             from movies.models import Movie
+            from .content_model import ContentModel, get_content_model
             
-            # Get all movies
-            movies = Movie.objects.prefetch_related('genres').all()
-            
-            if len(movies) < 2:
+            # Prefer the prebuilt artifact; fit in-process only when none is published
+            model = get_content_model() or ContentModel.build()
+            if model is None:
                 return []
             
-            # Create feature matrix: combine description and genres
-            movie_data = []
-            for movie in movies:
-                genres_text = ' '.join([g.name for g in movie.genres.all()])
-                combined_text = f"{movie.description} {genres_text} {genres_text}"  # Weight genres more
-                movie_data.append({
-                    'id': movie.id,
-                    'text': combined_text,
-                    'title': movie.title,
-                    'avg_rating': float(movie.avg_rating),
-                    'poster_url': movie.poster_url or '',
-                    'release_date': str(movie.release_date) if movie.release_date else '',
-                })
-            
-            df = pd.DataFrame(movie_data)
-            
-            # TF-IDF vectorization
-            tfidf = TfidfVectorizer(
-                max_features=500,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            tfidf_matrix = tfidf.fit_transform(df['text'])
-            
-            # Calculate cosine similarity
-            similarities = cosine_similarity(tfidf_matrix, tfidf_matrix)
-            
-            # Get index of source movie
-            source_idx = df[df['id'] == source_movie.id].index[0]
-            
-            # Get similarity scores
-            sim_scores = list(enumerate(similarities[source_idx]))
-            
-            # Sort by similarity (excluding the source movie itself)
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:limit+1]
+            # Ask for a few extra neighbours in case some were deleted since the build
+            sim_scores = model.similar_to(source_movie, limit + 5)
             
-            # Get movie indices
-            movie_indices = [i[0] for i in sim_scores]
+            movies = Movie.objects.only(
+                'id', 'title', 'avg_rating', 'poster_url', 'release_date'
+            ).in_bulk([movie_id for movie_id, _ in sim_scores])
             
             # Build recommendations
             recommendations = []
-            for idx, (movie_idx, score) in enumerate(sim_scores):
-                movie_row = df.iloc[movie_idx]
+            for movie_id, score in sim_scores:
+                movie = movies.get(movie_id)
+                if movie is None:
+                    continue
                 recommendations.append({
-                    'movie_id': int(movie_row['id']),
-                    'title': movie_row['title'],
+                    'movie_id': movie.id,
+                    'title': movie.title,
                     'similarity_score': float(score),
-                    'avg_rating': movie_row['avg_rating'],
-                    'poster_url': movie_row['poster_url'],
-                    'release_date': movie_row['release_date'],
-                    'rank': idx + 1
+                    'avg_rating': float(movie.avg_rating),
+                    'poster_url': movie.poster_url or '',
+                    'release_date': str(movie.release_date) if movie.release_date else '',
+                    'rank': len(recommendations) + 1
                 })
+                if len(recommendations) >= limit:
+                    break
             
             return recommendations
             
@@ -226,81 +281,24 @@ class RecommendationEngine:
     def _ml_collaborative(self, user, user_ratings, limit: int) -> List[Dict]:
         """ML-based collaborative filtering using user-user similarity"""
         try:
-            from sklearn.metrics.pairwise import cosine_similarity
-            import numpy as np
-            import pandas as pd
-            from reviews.models import Review
             from movies.models import Movie
-            from django.contrib.auth import get_user_model
-            
-            User = get_user_model()
-            
-            # Build user-item rating matrix
-            all_reviews = Review.objects.select_related('user', 'movie').all()
+            from .rating_matrix import RatingMatrix
             
-            # Create DataFrame
-            ratings_data = []
-            for review in all_reviews:
-                ratings_data.append({
-                    'user_id': review.user.id,
-                    'movie_id': review.movie.id,
-                    'rating': review.rating
-                })
+            # Build sparse user-item rating matrix
+            rating_matrix = RatingMatrix.build()
             
-            if len(ratings_data) < 10:
+            if rating_matrix.n_ratings < 10:
                 return self._popular_unwatched(user, limit)
             
-            df = pd.DataFrame(ratings_data)
-            
-            # Create pivot table (users x movies)
-            rating_matrix = df.pivot_table(
-                index='user_id',
-                columns='movie_id',
-                values='rating'
-            ).fillna(0)
-            
-            # Calculate user-user similarity
-            user_similarity = cosine_similarity(rating_matrix)
-            user_similarity_df = pd.DataFrame(
-                user_similarity,
-                index=rating_matrix.index,
-                columns=rating_matrix.index
-            )
-            
             # Get similar users
-            if user.id not in user_similarity_df.index:
+            if user.id not in rating_matrix:
                 return self._popular_unwatched(user, limit)
             
-            similar_users = user_similarity_df[user.id].sort_values(ascending=False)[1:21]  # Top 20 similar users
+            similar_users = rating_matrix.similar_users(user.id, 20)  # Top 20 similar users
             
-            # Get movies rated highly by similar users that target user hasn't seen
-            user_movie_ids = set(user_ratings.values_list('movie_id', flat=True))
-            
-            recommendations = defaultdict(lambda: {'score': 0, 'count': 0})
-            
-            for similar_user_id, similarity in similar_users.items():
-                if similarity <= 0:
-                    continue
-                
-                similar_user_reviews = Review.objects.filter(
-                    user_id=similar_user_id,
-                    rating__gte=4  # Only high ratings
-                ).exclude(movie_id__in=user_movie_ids)
-                
-                for review in similar_user_reviews:
-                    recommendations[review.movie_id]['score'] += similarity * review.rating
-                    recommendations[review.movie_id]['count'] += 1
-            
-            # Calculate predicted ratings
-            movie_scores = []
-            for movie_id, data in recommendations.items():
-                if data['count'] > 0:
-                    predicted_rating = data['score'] / data['count']
-                    movie_scores.append((movie_id, predicted_rating))
-            
-            # Sort by predicted rating
-            movie_scores.sort(key=lambda x: x[1], reverse=True)
-            top_movie_ids = [movie_id for movie_id, _ in movie_scores[:limit]]
+            # Score movies rated highly by similar users that target user hasn't seen
+            movie_scores = rating_matrix.score_unseen_movies(user.id, similar_users, limit)
+            top_movie_ids = [movie_id for movie_id, _ in movie_scores]
             
             # Fetch movie details
             movies = Movie.objects.filter(id__in=top_movie_ids).prefetch_related('genres')
@@ -308,7 +306,7 @@ class RecommendationEngine:
             
             # Build recommendations
             result = []
-            for idx, (movie_id, predicted_rating) in enumerate(movie_scores[:limit]):
+            for idx, (movie_id, predicted_rating) in enumerate(movie_scores):
                 if movie_id in movie_dict:
                     movie = movie_dict[movie_id]
                     result.append({
@@ -327,6 +325,58 @@ class RecommendationEngine:
             logger.error(f"Error in ML collaborative filtering: {e}")
             return self._simple_collaborative(user, user_ratings, limit)
     
+    def get_factorization_recommendations(
+        self,
+        user_id: int,
+        limit: int = 10
+    ) -> List[Dict]:
+        """
+        Get recommendations from the offline matrix-factorization model
+        
+        The user's current ratings are folded into the latent space, so
+        reviews written after training are reflected immediately. Falls
+        back to collaborative filtering when no model has been trained.
+        
+        Args:
+            user_id: ID of the user to get recommendations for
+            limit: Number of recommendations to return
+            
+        Returns:
+            List of movie dictionaries with predicted ratings
+        """
+        from movies.models import Movie
+        from reviews.models import Review
+        from .factor_model import get_factor_model
+        
+        model = get_factor_model() if self.enabled else None
+        ratings = dict(Review.objects.filter(user_id=user_id).values_list('movie_id', 'rating'))
+        
+        if model is None or not ratings:
+            return self.get_collaborative_recommendations(user_id, limit=limit)
+        
+        movie_scores = model.recommend(ratings, limit)
+        movies = Movie.objects.only(
+            'id', 'title', 'avg_rating', 'poster_url', 'release_date'
+        ).in_bulk([movie_id for movie_id, _ in movie_scores])
+        
+        result = []
+        for movie_id, score in movie_scores:
+            movie = movies.get(movie_id)
+            if movie is None:
+                continue
+            result.append({
+                'movie_id': movie.id,
+                'title': movie.title,
+                'predicted_rating': min(max(score, 0.0), 5.0),
+                'factor_score': score,
+                'avg_rating': float(movie.avg_rating),
+                'poster_url': movie.poster_url or '',
+                'release_date': str(movie.release_date) if movie.release_date else '',
+                'rank': len(result) + 1
+            })
+        
+        return result
+    
     def _simple_collaborative(self, user, user_ratings, limit: int) -> List[Dict]:
         """Fallback: Simple collaborative filtering"""
         from reviews.models import Review
@@ -516,7 +566,6 @@ class RecommendationEngine:
         limit: int,
     ) -> List[Dict]:
         """Return high-quality movies matching the user's preferred genres"""
-        from django.db.models import Count
         from movies.models import Movie
 
         exclude_movie_ids = exclude_movie_ids or set()
@@ -525,9 +574,6 @@ class RecommendationEngine:
             Movie.objects
             .filter(genres__id__in=preferred_genre_ids)
             .exclude(id__in=exclude_movie_ids)
-            .annotate(
-                review_count=Count('reviews', distinct=True),
-            )
             .prefetch_related('genres')
             .distinct()
             .order_by('-avg_rating', '-review_count', '-release_date')[:limit]
@@ -0,0 +1,55 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from movies.models import Movie
+from reviews.models import Review
+from .cache import invalidate_movie, invalidate_user
+from .leaderboards import refresh_movies
+from .trending import add_review_activity, move_review_activity, remove_review_activity
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_recommendations_on_review(sender, instance, **kwargs):
+	invalidate_user(instance.user_id)
+	invalidate_movie(instance.movie_id)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_created_at(sender, instance, **kwargs):
+	instance._persisted_created_at = instance.__dict__.get('created_at')
+
+
+@receiver(pre_save, sender=Review)
+def remember_leaderboard_movie(sender, instance, **kwargs):
+	# The rating signals reset the persisted snapshot in post_save, so keep
+	# the previous movie here in case the review is moved
+	old_movie_id = getattr(instance, '_persisted_movie_id', None)
+	old_created_at = getattr(instance, '_persisted_created_at', None)
+	instance._previous_activity = (
+		(old_movie_id, old_created_at)
+		if old_movie_id is not None and old_created_at is not None
+		else None
+	)
+	instance._leaderboard_movie_ids = {instance.movie_id, old_movie_id} - {None}
+
+
+@receiver(post_save, sender=Review)
+def refresh_leaderboards_on_save(sender, instance, created, **kwargs):
+	if created:
+		add_review_activity(instance.movie_id, instance.created_at)
+	elif instance._previous_activity is not None:
+		move_review_activity(instance._previous_activity, (instance.movie_id, instance.created_at))
+	instance._persisted_created_at = instance.__dict__.get('created_at')
+
+	refresh_movies(instance._leaderboard_movie_ids)
+
+
+@receiver(post_delete, sender=Review)
+def refresh_leaderboards_on_delete(sender, instance, origin=None, **kwargs):
+	origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+	if origin_model is Movie:
+		# The movie itself is being deleted; its buckets and entries cascade with it
+		return
+	remove_review_activity(instance.movie_id, instance._persisted_created_at or instance.created_at)
+	refresh_movies([instance.movie_id])
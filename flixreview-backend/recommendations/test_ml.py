@@ -9,10 +9,13 @@ Tests cover:
 - ML API endpoints
 - Caching behavior
 """
+import time
+
 import pytest
+from io import StringIO
 from unittest.mock import Mock, patch, MagicMock
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from django.core.cache import cache, caches
 from rest_framework.test import APIClient
 from rest_framework import status
 from datetime import date, timedelta
@@ -20,7 +23,21 @@ from django.utils import timezone
 
 from movies.models import Movie, Genre
 from reviews.models import Review
-from recommendations.services import RecommendationEngine
+from recommendations.models import SimilarMovie, UserRecommendation
+from recommendations.services import (
+    RecommendationEngine,
+    ContentModel,
+    get_content_model,
+    FactorModel,
+    get_factor_model,
+)
+from recommendations.services.content_model import store_similarity_index
+from recommendations.services.rating_matrix import RatingMatrix
+from recommendations.services.precompute import (
+    PRECOMPUTED_LIST_LENGTH,
+    active_user_ids,
+    store_user_recommendations,
+)
 
 
 User = get_user_model()
@@ -33,10 +50,12 @@ def api_client():
 
 @pytest.fixture(autouse=True)
 def clear_cache():
-    """Clear cache before each test"""
-    cache.clear()
+    """Clear every cache alias before each test"""
+    for backend in caches.all():
+        backend.clear()
     yield
-    cache.clear()
+    for backend in caches.all():
+        backend.clear()
 
 
 @pytest.fixture
@@ -259,6 +278,534 @@ class TestRecommendationEngine:
         assert 'message' in profile
 
 
+# ==========================================
+# Content Model Tests
+# ==========================================
+
+@pytest.fixture
+def model_dir(settings, tmp_path):
+    """Point the recommendation artifact directory at a temporary path"""
+    settings.RECOMMENDATION_MODEL_DIR = str(tmp_path / 'models')
+    return tmp_path / 'models'
+
+
+@pytest.mark.django_db
+class TestContentModel:
+    
+    def test_build_requires_two_movies(self, genres):
+        """Test model is not built without enough movies"""
+        assert ContentModel.build() is None
+    
+    def test_similar_to_excludes_source(self, movies):
+        """Test similarity query never returns the source movie"""
+        model = ContentModel.build()
+        
+        similar = model.similar_to(movies['matrix'], limit=3)
+        
+        assert len(similar) == 3
+        similar_ids = [movie_id for movie_id, _ in similar]
+        assert movies['matrix'].id not in similar_ids
+        assert similar_ids[0] == movies['inception'].id
+        scores = [score for _, score in similar]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_save_and_load_roundtrip(self, movies, model_dir):
+        """Test the artifact is versioned on disk and loads back identically"""
+        model = ContentModel.build()
+        model.save()
+        
+        loaded = get_content_model()
+        
+        assert loaded is not None
+        assert loaded.movie_ids == model.movie_ids
+        assert (loaded.matrix != model.matrix).nnz == 0
+        assert loaded.similar_to(movies['matrix'], 2) == model.similar_to(movies['matrix'], 2)
+    
+    def test_loaded_once_per_process(self, movies, model_dir):
+        """Test workers reuse the loaded model until a new build is published"""
+        ContentModel.build().save()
+        
+        assert get_content_model() is get_content_model()
+    
+    def test_movie_added_after_build(self, movies, genres, model_dir):
+        """Test movies missing from the artifact are scored against it"""
+        ContentModel.build().save()
+        new_movie = Movie.objects.create(
+            title='The Matrix Reloaded',
+            genre='Sci-Fi',
+            description='Neo and the hacker rebels fight the machines',
+            release_date=date(2003, 5, 15)
+        )
+        new_movie.genres.add(genres['action'], genres['scifi'])
+        
+        recommendations = RecommendationEngine().get_content_based_recommendations(new_movie.id, limit=2)
+        
+        recommended_ids = [rec['movie_id'] for rec in recommendations]
+        assert new_movie.id not in recommended_ids
+        assert movies['matrix'].id in recommended_ids
+    
+    def test_top_neighbors_match_single_row_query(self, movies):
+        """Test batched top-K neighbours agree with per-movie similarity queries"""
+        model = ContentModel.build()
+        
+        neighbors = dict(model.iter_top_neighbors(3, batch_size=2))
+        
+        assert set(neighbors) == set(model.movie_ids)
+        for movie in movies.values():
+            expected = model.similar_to(movie, 3)
+            assert [movie_id for movie_id, _ in neighbors[movie.id]] == [movie_id for movie_id, _ in expected]
+    
+    def test_similarity_index_serves_lookups(self, movies, model_dir, django_assert_num_queries):
+        """Test similar movies become an indexed lookup once the table is built"""
+        written = store_similarity_index(ContentModel.build(), top_k=3)
+        
+        assert written == len(movies) * 3
+        assert SimilarMovie.objects.filter(movie=movies['matrix']).count() == 3
+        
+        engine = RecommendationEngine()
+        # One query for the source movie, one for its neighbours
+        with django_assert_num_queries(2):
+            recommendations = engine.get_content_based_recommendations(movies['matrix'].id, limit=3)
+        
+        assert [rec['rank'] for rec in recommendations] == [1, 2, 3]
+        assert recommendations[0]['movie_id'] == movies['inception'].id
+    
+    def test_similarity_index_is_complete_at_its_build_depth(self, movies, model_dir, monkeypatch):
+        """Test a table built with a small K serves larger limits without the content model"""
+        store_similarity_index(ContentModel.build(), top_k=2)
+        monkeypatch.setattr(RecommendationEngine, '_ml_content_based', lambda *args: pytest.fail('fell back'))
+        
+        recommendations = RecommendationEngine().get_content_based_recommendations(movies['matrix'].id, limit=4)
+        
+        assert len(recommendations) == 2
+    
+    def test_similarity_index_falls_back_for_movies_missing_rows(self, movies, model_dir):
+        """Test movies with fewer rows than the build stored fall back to the content model"""
+        store_similarity_index(ContentModel.build(), top_k=2)
+        SimilarMovie.objects.filter(movie=movies['matrix'], rank=2).delete()
+        
+        recommendations = RecommendationEngine().get_content_based_recommendations(movies['matrix'].id, limit=4)
+        
+        assert len(recommendations) == 4
+    
+    def test_small_catalogue_is_served_from_the_index(self, movies, model_dir, monkeypatch):
+        """Test a catalogue smaller than K stores every other movie and needs no fallback"""
+        store_similarity_index(ContentModel.build())
+        monkeypatch.setattr(RecommendationEngine, '_ml_content_based', lambda *args: pytest.fail('fell back'))
+        
+        recommendations = RecommendationEngine().get_content_based_recommendations(movies['matrix'].id, limit=20)
+        
+        assert len(recommendations) == len(movies) - 1
+    
+    def test_hybrid_path_reads_full_similarity_index(self, users, movies, reviews, model_dir, monkeypatch):
+        """Test hybrid lists ask for more neighbours than are stored without refitting TF-IDF"""
+        store_similarity_index(ContentModel.build(), top_k=2)
+        builds = []
+        monkeypatch.setattr(ContentModel, 'build', classmethod(lambda cls: builds.append(cls)))
+
+        recommendations = RecommendationEngine().get_hybrid_recommendations(users['alice'].id, limit=5)
+
+        assert builds == []
+        assert any(rec.get('similarity_score') for rec in recommendations)
+    
+    def test_build_content_model_command(self, movies, model_dir):
+        """Test management command publishes an artifact the engine uses"""
+        from django.core.management import call_command
+        
+        call_command('build_content_model', stdout=StringIO())
+        
+        assert (model_dir / 'content_model.json').exists()
+        model = get_content_model()
+        assert model is not None
+        assert len(model) == len(movies)
+        assert SimilarMovie.objects.filter(movie=movies['matrix']).count() == len(movies) - 1
+
+    def test_build_content_model_command_with_zero_k_empties_the_index(self, movies, model_dir):
+        """Test --top-k 0 leaves no rows of a previous build behind"""
+        from django.core.management import call_command
+        
+        call_command('build_content_model', stdout=StringIO())
+        call_command('build_content_model', '--top-k', '0', stdout=StringIO())
+        
+        assert not SimilarMovie.objects.exists()
+
+
+# ==========================================
+# Rating Matrix Tests
+# ==========================================
+
+@pytest.mark.django_db
+class TestRatingMatrix:
+    
+    def test_build_from_reviews(self, users, movies, reviews):
+        """Test the sparse matrix holds one entry per review"""
+        matrix = RatingMatrix.build()
+        
+        assert matrix.n_ratings == Review.objects.count()
+        assert matrix.matrix.shape == (3, 5)
+        row = matrix.user_row(users['alice'].id)
+        assert row[0, matrix.movie_index[movies['matrix'].id]] == 5
+        assert row[0, matrix.movie_index[movies['hangover'].id]] == 0
+    
+    def test_similar_users_match_dense_cosine(self):
+        """Test target-row similarities agree with a full cosine computation"""
+        from sklearn.metrics.pairwise import cosine_similarity
+        
+        ratings = [(1, 10, 5), (1, 20, 4), (2, 10, 5), (2, 30, 2), (3, 20, 1), (3, 30, 5), (4, 40, 3)]
+        matrix = RatingMatrix.build(ratings)
+        dense = cosine_similarity(matrix.matrix.toarray())
+        
+        similar = matrix.similar_users(1, 3)
+        
+        assert [user_id for user_id, _ in similar] == [2, 3, 4]
+        for user_id, similarity in similar:
+            assert similarity == pytest.approx(dense[0, matrix.user_index[user_id]])
+    
+    def test_score_unseen_movies_matches_neighbour_loop(self):
+        """Test vectorized scoring equals the per-neighbour weighted average"""
+        ratings = [
+            (1, 10, 5), (1, 20, 4),
+            (2, 10, 5), (2, 30, 5), (2, 40, 3),
+            (3, 20, 4), (3, 30, 4), (3, 50, 5),
+            (4, 60, 5),
+        ]
+        matrix = RatingMatrix.build(ratings)
+        neighbors = matrix.similar_users(1, 3)
+        
+        expected = {}
+        for neighbor_id, similarity in neighbors:
+            if similarity <= 0:
+                continue
+            for user_id, movie_id, rating in ratings:
+                if user_id == neighbor_id and rating >= 4 and movie_id not in (10, 20):
+                    score, count = expected.get(movie_id, (0.0, 0))
+                    expected[movie_id] = (score + similarity * rating, count + 1)
+        
+        scored = dict(matrix.score_unseen_movies(1, neighbors, limit=10))
+        
+        assert set(scored) == {30, 50}
+        for movie_id, (score, count) in expected.items():
+            assert scored[movie_id] == pytest.approx(score / count)
+    
+    def test_collaborative_runs_without_per_neighbour_queries(self, users, movies, reviews, django_assert_max_num_queries):
+        """Test collaborative filtering query count does not grow with neighbours"""
+        for idx in range(25):
+            neighbor = User.objects.create_user(username=f'fan{idx}', email=f'fan{idx}@test.com', password='pass123')
+            Review.objects.create(user=neighbor, movie=movies['matrix'], rating=5, content='Great')
+            Review.objects.create(user=neighbor, movie=movies['interstellar'], rating=4, content='Good')
+        engine = RecommendationEngine()
+        
+        with django_assert_max_num_queries(8):
+            recommendations = engine.get_collaborative_recommendations(users['alice'].id, limit=5)
+        
+        assert movies['interstellar'].id in [rec['movie_id'] for rec in recommendations]
+    
+    def test_similar_users_unknown_user(self):
+        """Test users without ratings have no neighbours"""
+        matrix = RatingMatrix.build([(1, 10, 5), (2, 10, 4)])
+        
+        assert matrix.similar_users(99, 5) == []
+
+
+# ==========================================
+# Factor Model Tests
+# ==========================================
+
+@pytest.mark.django_db
+class TestFactorModel:
+    
+    def test_train_requires_enough_data(self, users, movies):
+        """Test training is skipped without ratings"""
+        assert FactorModel.train() is None
+    
+    def test_fold_in_matches_training_user_factors(self, users, movies, reviews):
+        """Test folding in a training user's ratings reproduces their stored vector"""
+        model = FactorModel.train(factors=2)
+        alice = users['alice']
+        ratings = dict(Review.objects.filter(user=alice).values_list('movie_id', 'rating'))
+        
+        folded = model.fold_in(ratings)
+        
+        assert folded == pytest.approx(model.user_factors[model.user_index[alice.id]])
+    
+    def test_recommend_excludes_rated_movies(self, users, movies, reviews):
+        """Test scoring never returns movies the user already rated"""
+        model = FactorModel.train(factors=2)
+        ratings = dict(Review.objects.filter(user=users['alice']).values_list('movie_id', 'rating'))
+        
+        recommended = model.recommend(ratings, limit=5)
+        
+        assert recommended
+        assert not set(ratings) & {movie_id for movie_id, _ in recommended}
+    
+    def test_new_review_folded_in_without_retraining(self, users, movies, reviews, model_dir):
+        """Test a fresh reviewer gets personalised results from the trained model"""
+        FactorModel.train(factors=2).save()
+        newbie = User.objects.create_user(username='newbie', email='newbie@test.com', password='pass123')
+        Review.objects.create(user=newbie, movie=movies['matrix'], rating=5, content='Whoa')
+        
+        recommendations = RecommendationEngine().get_factorization_recommendations(newbie.id, limit=3)
+        
+        assert recommendations
+        assert movies['matrix'].id not in [rec['movie_id'] for rec in recommendations]
+        assert all('factor_score' in rec for rec in recommendations)
+    
+    def test_falls_back_without_trained_model(self, users, movies, reviews, model_dir):
+        """Test factorization falls back to collaborative filtering"""
+        recommendations = RecommendationEngine().get_factorization_recommendations(users['alice'].id, limit=3)
+        
+        assert recommendations
+        assert all('factor_score' not in rec for rec in recommendations)
+    
+    def test_train_factor_model_command(self, users, movies, reviews, model_dir):
+        """Test management command publishes user and item factor arrays"""
+        from django.core.management import call_command
+        
+        call_command('train_factor_model', '--factors', '2', stdout=StringIO())
+        
+        model = get_factor_model()
+        assert model is not None
+        assert model.item_factors.shape == (5, 2)
+        assert model.user_factors.shape == (3, 2)
+
+
+# ==========================================
+# Precomputed Recommendations Tests
+# ==========================================
+
+@pytest.mark.django_db
+class TestPrecomputedRecommendations:
+    
+    def test_active_users_only(self, users, movies, reviews):
+        """Test only recently active users are selected"""
+        idle = User.objects.create_user(username='idle', email='idle@test.com', password='pass123')
+        
+        user_ids = active_user_ids(days=7)
+        
+        assert users['alice'].id in user_ids
+        assert idle.id not in user_ids
+    
+    def test_command_stores_one_list_per_user_and_algorithm(self, users, movies, reviews):
+        """Test the batch job stores a canonical list per user and algorithm"""
+        from django.core.management import call_command
+        
+        call_command(
+            'precompute_recommendations', '--workers', '1', '--algorithms', 'hybrid,collaborative',
+            stdout=StringIO()
+        )
+        
+        assert UserRecommendation.objects.count() == 6
+        entry = UserRecommendation.objects.get(user=users['alice'], algorithm='hybrid')
+        assert entry.items == RecommendationEngine().get_recommendations(
+            users['alice'].id, algorithm='hybrid', limit=PRECOMPUTED_LIST_LENGTH
+        )
+    
+    def test_rerun_replaces_existing_lists(self, users, movies, reviews):
+        """Test storing again updates rows instead of duplicating them"""
+        store_user_recommendations([(users['alice'].id, 'hybrid', [{'movie_id': 1}])])
+        store_user_recommendations([(users['alice'].id, 'hybrid', [{'movie_id': 2}])])
+        
+        assert UserRecommendation.objects.get(user=users['alice'], algorithm='hybrid').items == [{'movie_id': 2}]
+    
+    def test_view_slices_precomputed_list(self, api_client, users, movies, reviews):
+        """Test the for-you endpoint serves any limit from the stored list"""
+        items = [{'movie_id': movie.id, 'title': movie.title, 'rank': idx + 1} for idx, movie in enumerate(movies.values())]
+        store_user_recommendations([(users['alice'].id, 'hybrid', items)])
+        api_client.force_authenticate(user=users['alice'])
+        
+        response = api_client.get('/api/recommendations/for-you/?limit=2')
+        
+        assert response.data['data']['precomputed'] is True
+        assert response.data['data']['recommendations'] == items[:2]
+    
+    def test_expired_list_is_ignored(self, api_client, users, movies, reviews, settings):
+        """Test stale precomputed lists fall back to on-demand computation"""
+        settings.PRECOMPUTED_RECOMMENDATIONS_MAX_AGE = 60
+        store_user_recommendations([(users['alice'].id, 'hybrid', [{'movie_id': 1}])])
+        UserRecommendation.objects.update(computed_at=timezone.now() - timedelta(minutes=5))
+        api_client.force_authenticate(user=users['alice'])
+        
+        response = api_client.get('/api/recommendations/for-you/')
+        
+        assert response.data['data']['precomputed'] is False
+
+
+# ==========================================
+# Cache Invalidation Tests
+# ==========================================
+
+@pytest.mark.django_db
+class TestRecommendationInvalidation:
+    
+    def test_bump_changes_namespaced_keys(self):
+        """Test bumping a namespace moves every key to a new version"""
+        from common.cache import bump_namespace, versioned_key
+        
+        before = versioned_key('ns-test', 'a')
+        cache.set(before, 'value')
+        bump_namespace('ns-test')
+        after = versioned_key('ns-test', 'a')
+        
+        assert after != before
+        assert cache.get(after) is None
+        assert versioned_key('ns-test', 'a') == after
+    
+    def test_entries_use_recommendations_alias(self, api_client, users, movies, reviews):
+        """Test recommendation payloads are stored in their own cache alias"""
+        from recommendations.cache import recommendations_key
+        
+        api_client.force_authenticate(user=users['alice'])
+        api_client.get('/api/recommendations/for-you/')
+        key = recommendations_key(users['alice'].id, 'hybrid')
+        
+        assert caches['recommendations'].get(key) is not None
+        assert cache.get(key) is None
+    
+    def test_review_write_invalidates_recommendations(self, api_client, users, movies, reviews):
+        """Test creating a review evicts the author's cached recommendations"""
+        api_client.force_authenticate(user=users['alice'])
+        api_client.get('/api/recommendations/for-you/')
+        assert api_client.get('/api/recommendations/for-you/').data['data']['cached'] is True
+        
+        Review.objects.create(user=users['alice'], movie=movies['hangover'], rating=5, content='Hilarious!')
+        
+        assert api_client.get('/api/recommendations/for-you/').data['data']['cached'] is False
+    
+    def test_review_delete_invalidates_taste_profile(self, api_client, users, movies, reviews):
+        """Test deleting a review evicts the author's taste profile"""
+        api_client.force_authenticate(user=users['alice'])
+        api_client.get('/api/recommendations/profile/taste/')
+        
+        Review.objects.filter(user=users['alice'], movie=movies['fight_club']).delete()
+        
+        response = api_client.get('/api/recommendations/profile/taste/')
+        assert response.data['data']['cached'] is False
+        assert response.data['data']['total_reviews'] == 2
+    
+    def test_other_users_keep_their_cache(self, api_client, users, movies, reviews):
+        """Test only the review author's entries are evicted"""
+        api_client.force_authenticate(user=users['bob'])
+        api_client.get('/api/recommendations/for-you/')
+        
+        Review.objects.create(user=users['alice'], movie=movies['hangover'], rating=5, content='Hilarious!')
+        
+        assert api_client.get('/api/recommendations/for-you/').data['data']['cached'] is True
+    
+    def test_review_write_drops_precomputed_lists(self, users, movies, reviews):
+        """Test the author's precomputed lists are removed so they are never served stale"""
+        store_user_recommendations([
+            (users['alice'].id, 'hybrid', [{'movie_id': 1}]),
+            (users['bob'].id, 'hybrid', [{'movie_id': 1}]),
+        ])
+        
+        Review.objects.create(user=users['alice'], movie=movies['hangover'], rating=5, content='Hilarious!')
+        
+        assert list(UserRecommendation.objects.values_list('user_id', flat=True)) == [users['bob'].id]
+    
+    def test_review_write_invalidates_lists_showing_movie(self, api_client, users, movies):
+        """Test similar-movie lists that include the reviewed movie are evicted"""
+        SimilarMovie.objects.create(movie=movies['matrix'], neighbor=movies['inception'], score=0.9, rank=1)
+        url = f'/api/recommendations/movies/{movies["matrix"].id}/similar/?limit=1'
+        api_client.get(url)
+        assert api_client.get(url).data['data']['cached'] is True
+        
+        Review.objects.create(user=users['bob'], movie=movies['inception'], rating=1, content='Confusing')
+        
+        response = api_client.get(url)
+        assert response.data['data']['cached'] is False
+        assert response.data['data']['similar_movies'][0]['avg_rating'] == 1.0
+
+
+# ==========================================
+# Stampede Protection Tests
+# ==========================================
+
+class TestStampedeProtection:
+    
+    def compute(self, value='fresh'):
+        return Mock(return_value=value)
+    
+    def store(self, key, value, expires_in, delta=0.0):
+        from common.cache import CacheEntry
+        
+        cache.set(key, CacheEntry(value, time.time() + expires_in, delta), 600)
+    
+    def test_miss_computes_once_then_serves_cache(self):
+        """Test a missing key is computed once and then served from cache"""
+        from common.cache import get_or_refresh
+        
+        compute = self.compute()
+        
+        assert get_or_refresh('sf-test', compute, timeout=60) == ('fresh', False)
+        assert get_or_refresh('sf-test', compute, timeout=60) == ('fresh', True)
+        assert compute.call_count == 1
+    
+    def test_expired_entry_is_served_stale_while_another_worker_refreshes(self):
+        """Test callers that lose the refresh lock keep serving the previous value"""
+        from common.cache import get_or_refresh
+        
+        self.store('sf-test', 'stale', expires_in=-1)
+        cache.add('lock:sf-test', 1)
+        compute = self.compute()
+        
+        assert get_or_refresh('sf-test', compute, timeout=60) == ('stale', True)
+        compute.assert_not_called()
+    
+    def test_expired_entry_is_refreshed_by_lock_holder(self):
+        """Test the caller that takes the lock recomputes and releases it"""
+        from common.cache import get_or_refresh
+        
+        self.store('sf-test', 'stale', expires_in=-1)
+        
+        assert get_or_refresh('sf-test', self.compute(), timeout=60) == ('fresh', False)
+        assert get_or_refresh('sf-test', self.compute('other'), timeout=60) == ('fresh', True)
+        assert cache.get('lock:sf-test') is None
+    
+    def test_slow_entries_refresh_probabilistically_before_expiry(self):
+        """Test XFetch refreshes early when expiry is near relative to compute cost"""
+        from common.cache import get_or_refresh
+        
+        self.store('sf-test', 'old', expires_in=5, delta=10.0)
+        
+        with patch('common.cache.random.random', return_value=0.0):
+            assert get_or_refresh('sf-test', self.compute(), timeout=60) == ('old', True)
+        with patch('common.cache.random.random', return_value=0.9):
+            assert get_or_refresh('sf-test', self.compute(), timeout=60) == ('fresh', False)
+    
+    def test_miss_waits_for_concurrent_computation(self):
+        """Test a caller that loses the fill lock waits instead of recomputing"""
+        from common.cache import CacheEntry, get_or_refresh
+        
+        cache.add('lock:sf-test', 1)
+        compute = self.compute()
+        
+        def other_worker_finishes(seconds):
+            cache.set('sf-test', CacheEntry('theirs', time.time() + 60, 0.0), 600)
+        
+        with patch('common.cache.time.sleep', side_effect=other_worker_finishes):
+            assert get_or_refresh('sf-test', compute, timeout=60) == ('theirs', True)
+        compute.assert_not_called()
+    
+    @pytest.mark.django_db
+    def test_similar_movies_serve_stale_list_during_refresh(self, api_client, movies):
+        """Test concurrent requests on an expired list never refit the content model"""
+        from common.cache import CacheEntry
+        from recommendations.cache import similar_movies_key
+        
+        movie_id = movies['matrix'].id
+        key = similar_movies_key(movie_id)
+        stale = [{'id': movies['inception'].id}]
+        caches['recommendations'].set(key, CacheEntry(stale, time.time() - 1, 1.0), 600)
+        caches['recommendations'].add(f'lock:{key}', 1)
+        
+        with patch.object(RecommendationEngine, 'get_content_based_recommendations') as recompute:
+            response = api_client.get(f'/api/recommendations/movies/{movie_id}/similar/')
+        
+        recompute.assert_not_called()
+        assert response.data['data']['cached'] is True
+        assert response.data['data']['similar_movies'] == stale
+
+
 # ==========================================
 # ML API Endpoints Tests
 # ==========================================
@@ -302,6 +849,11 @@ class TestMLEndpoints:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['data']['algorithm'] == 'collaborative'
         
+        # Test factorization
+        response = api_client.get('/api/recommendations/for-you/?algorithm=factorization')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['data']['algorithm'] == 'factorization'
+        
         # Test content
         response = api_client.get('/api/recommendations/for-you/?algorithm=content')
         assert response.status_code == status.HTTP_200_OK
@@ -324,6 +876,29 @@ class TestMLEndpoints:
         response2 = api_client.get('/api/recommendations/for-you/')
         assert response2.data['data']['cached'] is True
     
+    def test_personalized_limits_share_one_cached_list(self, api_client, users, movies, reviews):
+        """Test every limit is a slice of one full-length computation"""
+        api_client.force_authenticate(user=users['alice'])
+        
+        with patch.object(RecommendationEngine, 'get_recommendations', wraps=RecommendationEngine().get_recommendations) as compute:
+            full = api_client.get('/api/recommendations/for-you/?limit=50').data['data']['recommendations']
+            response = api_client.get('/api/recommendations/for-you/?limit=2')
+        
+        assert compute.call_count == 1
+        assert compute.call_args.kwargs['limit'] == 50
+        assert response.data['data']['cached'] is True
+        assert response.data['data']['recommendations'] == full[:2]
+    
+    def test_similar_movie_limits_share_one_cached_list(self, api_client, movies):
+        """Test similar-movie limits slice one cached list per movie"""
+        url = f'/api/recommendations/movies/{movies["matrix"].id}/similar/'
+        full = api_client.get(url, {'limit': 30}).data['data']['similar_movies']
+        
+        response = api_client.get(url, {'limit': 2})
+        
+        assert response.data['data']['cached'] is True
+        assert response.data['data']['similar_movies'] == full[:2]
+    
     def test_similar_movies_success(self, api_client, movies):
         """Test getting similar movies"""
         response = api_client.get(f'/api/recommendations/movies/{movies["matrix"].id}/similar/')
@@ -1,4 +1,10 @@
+import time
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
@@ -6,9 +12,16 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from datetime import date
+from io import StringIO
+from unittest.mock import patch
 
-from movies.models import Movie
+from common.cache import CacheEntry
+from movies.models import Genre, Movie
 from reviews.models import Review
+from .cache import get_cache
+from .dashboard import DASHBOARD_CACHE_KEY
+from .models import LeaderboardEntry, MovieActivityBucket
+from .trending import TRENDING_EPOCH, bucket_hour, decayed_log_score
 
 User = get_user_model()
 
@@ -113,6 +126,12 @@ class RecommendationsAPITests(APITestCase):
 		self.most_reviewed_url = reverse('recommendations-most-reviewed')
 		self.recent_url = reverse('recommendations-recent')
 		self.dashboard_url = reverse('recommendations-dashboard')
+		self.rebuild_dashboard()
+
+	def rebuild_dashboard(self):
+		"""Drop the cached dashboard and any cached anonymous response on top of it"""
+		get_cache().delete(DASHBOARD_CACHE_KEY)
+		caches['http'].clear()
 
 	def test_top_rated_movies(self):
 		"""Test top rated movies endpoint returns highest rated movies"""
@@ -130,6 +149,65 @@ class RecommendationsAPITests(APITestCase):
 		self.assertIn('title', first_movie)
 		self.assertIn('avg_rating', first_movie)
 
+	def test_dashboard_query_count_is_independent_of_genres(self):
+		"""Nested genres are prefetched, so extra genres add no queries"""
+		self.client.get(self.dashboard_url)
+		self.rebuild_dashboard()
+		with CaptureQueriesContext(connection) as without_genres:
+			self.client.get(self.dashboard_url)
+
+		genres = [Genre.objects.create(name=name) for name in ('Drama', 'Action', 'Sci-Fi')]
+		for movie in Movie.objects.all():
+			movie.genres.set(genres)
+		self.rebuild_dashboard()
+		self.client.get(self.dashboard_url)
+		self.rebuild_dashboard()
+		with CaptureQueriesContext(connection) as with_genres:
+			self.client.get(self.dashboard_url)
+
+		self.assertEqual(len(without_genres.captured_queries), len(with_genres.captured_queries))
+
+	def test_dashboard_is_built_in_one_pass(self):
+		"""Ranked boards, recent ids, one movie fetch and one genre prefetch"""
+		self.client.get(self.dashboard_url)
+		self.rebuild_dashboard()
+		with self.assertNumQueries(4):
+			self.client.get(self.dashboard_url)
+
+	def test_dashboard_is_served_from_cache(self):
+		first = self.client.get(self.dashboard_url)
+		with self.assertNumQueries(0):
+			second = self.client.get(self.dashboard_url)
+
+		self.assertEqual(first.json()['data'], second.json()['data'])
+
+	def test_dashboard_sections_match_list_endpoints(self):
+		res = self.client.get(self.dashboard_url)
+
+		data = res.data['data']
+		for section, url in [
+			('top_rated', self.top_rated_url),
+			('trending', self.trending_url),
+			('most_reviewed', self.most_reviewed_url),
+			('recent', self.recent_url),
+		]:
+			expected = [movie['id'] for movie in self.client.get(url).data['data']['results']][:5]
+			self.assertEqual([movie['id'] for movie in data[section]], expected, section)
+
+	def test_dashboard_waits_for_concurrent_build(self):
+		"""A request that loses the fill lock reuses the winner's payload"""
+		cache = get_cache()
+		cache.add(f'lock:{DASHBOARD_CACHE_KEY}', 1, timeout=30)
+		payload = {'top_rated': [], 'trending': [], 'most_reviewed': [], 'recent': []}
+
+		def finish_build(seconds):
+			cache.set(DASHBOARD_CACHE_KEY, CacheEntry(payload, time.time() + 60, 0.1), 120)
+
+		with patch('common.cache.time.sleep', side_effect=finish_build), self.assertNumQueries(0):
+			res = self.client.get(self.dashboard_url)
+
+		self.assertEqual(res.data['data'], payload)
+
 	def test_trending_movies(self):
 		"""Test trending movies shows recent activity"""
 		res = self.client.get(self.trending_url)
@@ -213,3 +291,159 @@ class RecommendationsAPITests(APITestCase):
 		# Should return empty results
 		results = res.data['data']['results']
 		self.assertEqual(len(results), 0)
+
+
+class LeaderboardTests(TestCase):
+	"""Review writes keep the materialized leaderboards in step"""
+
+	def setUp(self):
+		self.user1 = User.objects.create_user(email='lb1@example.com', username='lb1', password='TestPass123!')
+		self.user2 = User.objects.create_user(email='lb2@example.com', username='lb2', password='TestPass123!')
+		self.movie = Movie.objects.create(title='Board Movie', genre='Drama', description='d', release_date=date(2020, 1, 1))
+		self.other = Movie.objects.create(title='Other Movie', genre='Drama', description='d', release_date=date(2020, 1, 1))
+		caches['http'].clear()
+
+	def test_cached_leaderboard_responses_are_purged_by_reviews(self):
+		url = reverse('recommendations-top-rated')
+		self.assertEqual(self.client.get(url).json()['data']['results'], [])
+
+		Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		res = self.client.get(url)
+		self.assertEqual(res['X-Cache'], 'MISS')
+		self.assertEqual([movie['title'] for movie in res.json()['data']['results']], ['Board Movie'])
+
+		# Purges are coalesced: a burst of reviews re-renders the boards once
+		Review.objects.create(user=self.user1, movie=self.other, content='Fine', rating=3)
+		self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+	def entries(self, movie):
+		return {
+			entry.board: (entry.score, entry.tiebreak)
+			for entry in LeaderboardEntry.objects.filter(movie=movie)
+		}
+
+	def test_review_places_movie_on_every_board(self):
+		Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		Review.objects.create(user=self.user2, movie=self.movie, content='Great', rating=5)
+
+		entries = self.entries(self.movie)
+		self.assertEqual(set(entries), {board for board, _ in LeaderboardEntry.BOARD_CHOICES})
+		self.assertEqual(entries[LeaderboardEntry.TOP_RATED], (4.5, 2))
+		self.assertEqual(entries[LeaderboardEntry.MOST_REVIEWED], (2, 4.5))
+		self.assertEqual(self.entries(self.other), {})
+
+	def test_rating_edit_and_delete_update_entries(self):
+		review = Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		review.rating = 2
+		review.save()
+		self.assertEqual(self.entries(self.movie)[LeaderboardEntry.TOP_RATED], (2.0, 1))
+
+		review.delete()
+		self.assertEqual(self.entries(self.movie), {})
+
+	def test_moved_review_refreshes_both_movies(self):
+		review = Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		review.movie = self.other
+		review.save()
+
+		self.assertEqual(self.entries(self.movie), {})
+		self.assertEqual(self.entries(self.other)[LeaderboardEntry.MOST_REVIEWED], (1, 4.0))
+
+	def test_deleting_movie_with_reviews_drops_its_entries(self):
+		Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		self.movie.delete()
+
+		self.assertFalse(LeaderboardEntry.objects.exists())
+
+	def test_rebuild_matches_incremental_state(self):
+		Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		Review.objects.create(user=self.user2, movie=self.other, content='Ok', rating=3)
+		incremental = {
+			(entry.board, entry.movie_id, round(entry.score, 9), entry.tiebreak)
+			for entry in LeaderboardEntry.objects.all()
+		}
+
+		call_command('rebuild_leaderboards', stdout=StringIO())
+
+		rebuilt = {
+			(entry.board, entry.movie_id, round(entry.score, 9), entry.tiebreak)
+			for entry in LeaderboardEntry.objects.all()
+		}
+		self.assertEqual(rebuilt, incremental)
+
+	def test_rebuild_ages_activity_out_of_trending(self):
+		Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		# Age the bucket without signals, as if the hours simply passed
+		MovieActivityBucket.objects.update(hour=timezone.now() - timedelta(days=60))
+
+		call_command('rebuild_leaderboards', stdout=StringIO())
+
+		self.assertEqual(set(self.entries(self.movie)), {LeaderboardEntry.TOP_RATED, LeaderboardEntry.MOST_REVIEWED})
+		self.assertFalse(MovieActivityBucket.objects.exists())
+
+	def test_recount_activity_rebuilds_buckets_from_reviews(self):
+		review = Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		Review.objects.filter(pk=review.pk).update(created_at=timezone.now() - timedelta(days=3))
+		MovieActivityBucket.objects.all().delete()
+
+		call_command('rebuild_leaderboards', '--recount-activity', stdout=StringIO())
+
+		self.assertEqual(MovieActivityBucket.objects.get().review_count, 1)
+		self.assertEqual(set(self.entries(self.movie)) - {LeaderboardEntry.TOP_RATED, LeaderboardEntry.MOST_REVIEWED}, {
+			LeaderboardEntry.TRENDING_7D,
+			LeaderboardEntry.TRENDING_30D,
+		})
+
+	def test_backdated_review_moves_between_buckets(self):
+		review = Review.objects.create(user=self.user1, movie=self.movie, content='Good', rating=4)
+		review.created_at = timezone.now() - timedelta(days=3)
+		review.save()
+
+		bucket = MovieActivityBucket.objects.get()
+		self.assertEqual(bucket.hour, bucket_hour(review.created_at))
+		self.assertNotIn(LeaderboardEntry.TRENDING_24H, self.entries(self.movie))
+
+	def test_trending_window_weighs_recent_activity(self):
+		third = Movie.objects.create(title='Third Movie', genre='Drama', description='d', release_date=date(2020, 1, 1))
+		for user, movie in [(self.user1, self.movie), (self.user2, self.movie), (self.user1, self.other)]:
+			Review.objects.create(user=user, movie=movie, content='Good', rating=4)
+		# Two reviews five days ago against one review now
+		Review.objects.filter(movie=self.movie).update(created_at=timezone.now() - timedelta(days=5))
+		call_command('rebuild_leaderboards', '--recount-activity', stdout=StringIO())
+		url = reverse('recommendations-trending')
+
+		def titles(window):
+			res = self.client.get(url, {'window': window})
+			return [movie['title'] for movie in res.json()['data']['results']]
+
+		# 30d half-life is a week: 2 * 2^(-120/168) > 1
+		self.assertEqual(titles('30d'), ['Board Movie', 'Other Movie'])
+		# 7d half-life is two days: 2 * 2^(-120/48) < 1
+		self.assertEqual(titles('7d'), ['Other Movie', 'Board Movie'])
+		self.assertEqual(titles('24h'), ['Other Movie'])
+		self.assertNotIn(third.title, titles('30d'))
+
+	def test_invalid_trending_window_is_rejected(self):
+		res = self.client.get(reverse('recommendations-trending'), {'window': '1y'})
+
+		self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+	def test_decayed_log_score_matches_direct_decay(self):
+		now = bucket_hour(timezone.now())
+		buckets = [(now, 3), (now - timedelta(hours=12), 2), (now - timedelta(hours=48), 5)]
+		half_life = 24
+
+		score = decayed_log_score(buckets, half_life)
+
+		hours_since_epoch = (now - TRENDING_EPOCH).total_seconds() / 3600
+		decayed = sum(count * 2 ** (-(now - hour).total_seconds() / 3600 / half_life) for hour, count in buckets)
+		self.assertAlmostEqual(2 ** (score - hours_since_epoch / half_life), decayed)
+
+	def test_top_rated_view_reads_ranked_entries(self):
+		Review.objects.create(user=self.user1, movie=self.movie, content='Ok', rating=3)
+		Review.objects.create(user=self.user1, movie=self.other, content='Great', rating=5)
+
+		res = self.client.get(reverse('recommendations-top-rated'))
+
+		titles = [movie['title'] for movie in res.data['data']['results']]
+		self.assertEqual(titles, ['Other Movie', 'Board Movie'])
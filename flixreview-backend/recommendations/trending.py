@@ -0,0 +1,172 @@
+"""
+Time-decayed trending scores from hourly review activity
+
+Every review increments its movie's MovieActivityBucket for the clock hour
+it was written in. A movie's trending score for a window (24h, 7d, 30d) is
+the sum of its buckets inside the window, each weighted by
+2^(-age / half_life), so scoring a movie costs O(buckets) rather than a scan
+of its reviews.
+
+Scores use forward decay: weights are taken relative to a fixed epoch
+instead of "now", so a stored score never needs re-decaying as time passes
+(every movie's score shrinks by the same factor, leaving the ranking
+unchanged). Scores are stored as base-2 logarithms so they stay finite
+however far the clock moves from the epoch. Only buckets leaving a window
+need a rebuild, which rebuild_leaderboards does.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import LeaderboardEntry, MovieActivityBucket
+
+
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+# window -> (span, leaderboard board)
+TRENDING_WINDOWS = {
+	'24h': (timedelta(hours=24), LeaderboardEntry.TRENDING_24H),
+	'7d': (timedelta(days=7), LeaderboardEntry.TRENDING_7D),
+	'30d': (timedelta(days=30), LeaderboardEntry.TRENDING_30D),
+}
+DEFAULT_WINDOW = '30d'
+
+# Override per window with settings.TRENDING_HALF_LIFE_HOURS, e.g. {'7d': 24}
+DEFAULT_HALF_LIFE_HOURS = {
+	'24h': 6,
+	'7d': 48,
+	'30d': 168,
+}
+
+# Buckets older than the widest window are never read again
+RETENTION = max(span for span, _ in TRENDING_WINDOWS.values())
+
+Buckets = Iterable[Tuple[datetime, int]]
+
+
+def half_life_hours(window: str) -> float:
+	overrides = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', {})
+	return float(overrides.get(window, DEFAULT_HALF_LIFE_HOURS[window]))
+
+
+def bucket_hour(moment: datetime) -> datetime:
+	"""Truncate an aware datetime to the start of its UTC hour"""
+	return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def window_start(span: timedelta, now: Optional[datetime] = None) -> datetime:
+	return bucket_hour((now or timezone.now()) - span)
+
+
+def add_review_activity(movie_id: int, created_at: datetime) -> None:
+	hour = bucket_hour(created_at)
+	if hour < window_start(RETENTION):
+		return
+	bucket, created = MovieActivityBucket.objects.get_or_create(
+		movie_id=movie_id,
+		hour=hour,
+		defaults={'review_count': 1},
+	)
+	if not created:
+		MovieActivityBucket.objects.filter(pk=bucket.pk).update(review_count=F('review_count') + 1)
+
+
+def remove_review_activity(movie_id: int, created_at: datetime) -> None:
+	buckets = MovieActivityBucket.objects.filter(movie_id=movie_id, hour=bucket_hour(created_at))
+	if not buckets.filter(review_count__gt=1).update(review_count=F('review_count') - 1):
+		buckets.delete()
+
+
+def move_review_activity(old: Tuple[int, datetime], new: Tuple[int, datetime]) -> None:
+	"""Re-bucket an edited review whose movie or created_at changed"""
+	if (old[0], bucket_hour(old[1])) != (new[0], bucket_hour(new[1])):
+		remove_review_activity(*old)
+		add_review_activity(*new)
+
+
+def decayed_log_score(buckets: Buckets, half_life: float) -> Optional[float]:
+	"""
+	Return log2(sum(count * 2^((hour - epoch) / half_life))), or None for no activity
+
+	The largest exponent is factored out so the sum never overflows.
+	"""
+	terms = [
+		((hour - TRENDING_EPOCH).total_seconds() / 3600 / half_life, count)
+		for hour, count in buckets
+		if count > 0
+	]
+	if not terms:
+		return None
+	top = max(exponent for exponent, _ in terms)
+	return top + math.log2(sum(count * 2 ** (exponent - top) for exponent, count in terms))
+
+
+def trending_scores(buckets: Buckets, now: Optional[datetime] = None) -> Dict[str, float]:
+	"""Return {board: log score} for every window the movie has activity in"""
+	now = now or timezone.now()
+	buckets = list(buckets)
+	scores = {}
+	for window, (span, board) in TRENDING_WINDOWS.items():
+		since = window_start(span, now)
+		score = decayed_log_score([(hour, count) for hour, count in buckets if hour >= since], half_life_hours(window))
+		if score is not None:
+			scores[board] = score
+	return scores
+
+
+def movie_trending_scores(movie_id: int, now: Optional[datetime] = None) -> Dict[str, float]:
+	now = now or timezone.now()
+	buckets = (
+		MovieActivityBucket.objects
+		.filter(movie_id=movie_id, hour__gte=window_start(RETENTION, now))
+		.values_list('hour', 'review_count')
+	)
+	return trending_scores(buckets, now)
+
+
+def all_trending_scores(now: Optional[datetime] = None, batch_size: int = 2000) -> Dict[int, Dict[str, float]]:
+	"""Return {movie_id: {board: log score}} for every movie with activity in retention"""
+	now = now or timezone.now()
+	rows = (
+		MovieActivityBucket.objects
+		.filter(hour__gte=window_start(RETENTION, now))
+		.order_by('movie_id', 'hour')
+		.values_list('movie_id', 'hour', 'review_count')
+		.iterator(chunk_size=batch_size)
+	)
+	return {
+		movie_id: trending_scores(((hour, count) for _, hour, count in group), now)
+		for movie_id, group in groupby(rows, key=lambda row: row[0])
+	}
+
+
+def prune_activity(now: Optional[datetime] = None) -> int:
+	"""Delete buckets that have left the widest window"""
+	deleted, _ = MovieActivityBucket.objects.filter(hour__lt=window_start(RETENTION, now)).delete()
+	return deleted
+
+
+def recount_activity(batch_size: int = 500) -> int:
+	"""Rebuild every bucket inside retention from the reviews table"""
+	from reviews.models import Review
+
+	rows = (
+		Review.objects
+		.filter(created_at__gte=window_start(RETENTION))
+		.annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+		.order_by()
+		.values('movie_id', 'hour')
+		.annotate(review_count=Count('id'))
+	)
+	buckets = [MovieActivityBucket(**row) for row in rows]
+	with transaction.atomic():
+		MovieActivityBucket.objects.all().delete()
+		MovieActivityBucket.objects.bulk_create(buckets, batch_size=batch_size)
+	return len(buckets)
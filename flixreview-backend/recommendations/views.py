@@ -1,66 +1,85 @@
-from datetime import timedelta
-from django.db.models import Count, Q, Avg
-from django.utils import timezone
-from django.core.cache import cache
+from django.conf import settings
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
 from accounts.models import UserProfile
+from movies.cache import movie_response_tags
 from movies.models import Movie
+from movies.mixins import MovieResponseCacheMixin
+from movies.queries import movie_queryset
 from movies.serializers import MovieSerializer, GenreSerializer
-from common.mixins import ApiResponseMixin
+from common.cache import get_or_refresh
+from common.mixins import AnonymousResponseCacheMixin, ApiResponseMixin
+from .cache import CACHE_ALIAS, invalidate_user, recommendations_key, similar_movies_key, taste_profile_key
+from .dashboard import get_dashboard
+from .leaderboards import leaderboard_queryset
+from .models import LeaderboardEntry
+from .trending import DEFAULT_WINDOW, TRENDING_WINDOWS
 from .services import RecommendationEngine
+from .services.precompute import PRECOMPUTED_LIST_LENGTH, get_precomputed_recommendations
 
 
-class TopRatedMoviesView(ApiResponseMixin, generics.ListAPIView):
+# Longest lists the endpoints serve; one list of this length is cached and sliced
+MAX_RECOMMENDATIONS = PRECOMPUTED_LIST_LENGTH
+MAX_SIMILAR_MOVIES = 30
+
+
+class LeaderboardResponseCacheMixin(MovieResponseCacheMixin):
+	"""Anonymous response cache for leaderboard lists, whose purges are coalesced (see recommendations.leaderboards)"""
+	response_cache_tags = ('leaderboards',)
+
+	def get_response_cache_timeout(self):
+		return settings.RESPONSE_CACHE_RANKED_TTL
+
+
+class TopRatedMoviesView(LeaderboardResponseCacheMixin, ApiResponseMixin, generics.ListAPIView):
 	"""
 	Returns top 10 movies ordered by average rating.
-	Filters out movies with no reviews.
+	Filters out movies with no reviews. Served from the materialized
+	leaderboard table (see recommendations.leaderboards).
 	"""
 	serializer_class = MovieSerializer
 	permission_classes = [permissions.AllowAny]
 	success_messages = {'GET': 'Top rated movies retrieved successfully'}
 
 	def get_queryset(self):
-		return (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
-			.filter(review_count__gt=0, avg_rating__gt=0)
-			.order_by('-avg_rating', '-review_count')[:10]
-		)
+		return leaderboard_queryset(LeaderboardEntry.TOP_RATED, movie_queryset())[:10]
 
 
-class TrendingMoviesView(ApiResponseMixin, generics.ListAPIView):
+@extend_schema(
+	parameters=[
+		OpenApiParameter(
+			name='window',
+			type=OpenApiTypes.STR,
+			location=OpenApiParameter.QUERY,
+			required=False,
+			enum=list(TRENDING_WINDOWS),
+			description=f'Activity window: 24h, 7d or 30d (default: {DEFAULT_WINDOW})'
+		),
+	]
+)
+class TrendingMoviesView(LeaderboardResponseCacheMixin, ApiResponseMixin, generics.ListAPIView):
 	"""
-	Returns movies with most reviews in the last 30 days.
-	Shows what's currently popular.
+	Returns movies with the most review activity in the chosen window.
+	Shows what's currently popular; recent reviews weigh more than older
+	ones (see recommendations.trending).
 	"""
 	serializer_class = MovieSerializer
 	permission_classes = [permissions.AllowAny]
 	success_messages = {'GET': 'Trending movies retrieved successfully'}
 
 	def get_queryset(self):
-		thirty_days_ago = timezone.now() - timedelta(days=30)
-		
-		return (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(
-				recent_review_count=Count(
-					'reviews',
-					filter=Q(reviews__created_at__gte=thirty_days_ago)
-				),
-				review_count=Count('reviews')
-			)
-			.filter(recent_review_count__gt=0)
-			.order_by('-recent_review_count', '-avg_rating')[:10]
-		)
+		window = self.request.query_params.get('window', DEFAULT_WINDOW)
+		if window not in TRENDING_WINDOWS:
+			raise ValidationError({'window': f"Must be one of: {', '.join(TRENDING_WINDOWS)}"})
+		_, board = TRENDING_WINDOWS[window]
+		return leaderboard_queryset(board, movie_queryset())[:10]
 
 
-class MostReviewedMoviesView(ApiResponseMixin, generics.ListAPIView):
+class MostReviewedMoviesView(LeaderboardResponseCacheMixin, ApiResponseMixin, generics.ListAPIView):
 	"""
 	Returns movies with the highest number of total reviews.
 	Shows most discussed movies of all time.
@@ -70,95 +89,50 @@ class MostReviewedMoviesView(ApiResponseMixin, generics.ListAPIView):
 	success_messages = {'GET': 'Most reviewed movies retrieved successfully'}
 
 	def get_queryset(self):
-		return (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
-			.filter(review_count__gt=0)
-			.order_by('-review_count', '-avg_rating')[:10]
-		)
+		return leaderboard_queryset(LeaderboardEntry.MOST_REVIEWED, movie_queryset())[:10]
 
 
-class RecentMoviesView(ApiResponseMixin, generics.ListAPIView):
+class RecentMoviesView(MovieResponseCacheMixin, ApiResponseMixin, generics.ListAPIView):
 	"""
 	Returns recently added movies to the platform.
 	Helps users discover new content.
 	"""
 	serializer_class = MovieSerializer
 	permission_classes = [permissions.AllowAny]
+	response_cache_tags = ('movies',)
 	success_messages = {'GET': 'Recent movies retrieved successfully'}
 
 	def get_queryset(self):
 		return (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
+			movie_queryset()
 			.order_by('-created_at')[:10]
 		)
 
 
-class RecommendationsDashboardView(ApiResponseMixin, generics.GenericAPIView):
+class RecommendationsDashboardView(AnonymousResponseCacheMixin, ApiResponseMixin, generics.GenericAPIView):
 	"""
 	Returns a comprehensive dashboard with all recommendation types.
-	Useful for homepage/dashboard display.
+	Useful for homepage/dashboard display. Built in one pass and cached
+	briefly (see recommendations.dashboard).
 	"""
 	permission_classes = [permissions.AllowAny]
 	serializer_class = MovieSerializer
+	response_cache_tags = ('leaderboards', 'movies')
 	success_messages = {'GET': 'Recommendations dashboard retrieved successfully'}
 
-	def get(self, request, *args, **kwargs):
-		thirty_days_ago = timezone.now() - timedelta(days=30)
-
-		# Top Rated
-		top_rated = (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
-			.filter(review_count__gt=0, avg_rating__gt=0)
-			.order_by('-avg_rating', '-review_count')[:5]
-		)
-
-		# Trending
-		trending = (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(
-				recent_review_count=Count(
-					'reviews',
-					filter=Q(reviews__created_at__gte=thirty_days_ago)
-				),
-				review_count=Count('reviews')
-			)
-			.filter(recent_review_count__gt=0)
-			.order_by('-recent_review_count', '-avg_rating')[:5]
-		)
-
-		# Most Reviewed
-		most_reviewed = (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
-			.filter(review_count__gt=0)
-			.order_by('-review_count', '-avg_rating')[:5]
-		)
+	def get_response_cache_tags(self, data):
+		movies = [movie for section in data.values() for movie in section]
+		return {*self.response_cache_tags, *movie_response_tags(movies)}
 
-		# Recent
-		recent = (
-			Movie.objects
-			.prefetch_related('reviews')
-			.annotate(review_count=Count('reviews'))
-			.order_by('-created_at')[:5]
-		)
+	def get_response_cache_timeout(self):
+		# A purge re-renders from the dashboard cache, so never outlive it
+		return settings.RECOMMENDATIONS_DASHBOARD_TTL
 
-		serializer = MovieSerializer(top_rated, many=True)
-		data = {
-			'top_rated': MovieSerializer(top_rated, many=True).data,
-			'trending': MovieSerializer(trending, many=True).data,
-			'most_reviewed': MovieSerializer(most_reviewed, many=True).data,
-			'recent': MovieSerializer(recent, many=True).data,
-		}
+	def get(self, request, *args, **kwargs):
+		return self.handle_get(self.render_dashboard, request, *args, **kwargs)
 
-		return Response(data)
+	def render_dashboard(self, request, *args, **kwargs):
+		return Response(get_dashboard())
 
 
 # ==================================================
@@ -170,7 +144,7 @@ class RecommendationsDashboardView(ApiResponseMixin, generics.GenericAPIView):
 	description="Get personalized movie recommendations for the authenticated user using ML algorithms",
 	parameters=[
 		OpenApiParameter(name='limit', type=OpenApiTypes.INT, description='Number of recommendations (default: 10, max: 50)'),
-		OpenApiParameter(name='algorithm', type=OpenApiTypes.STR, description='Algorithm type: hybrid (default), collaborative, or content')
+		OpenApiParameter(name='algorithm', type=OpenApiTypes.STR, description='Algorithm type: hybrid (default), collaborative, factorization, or content')
 	],
 	responses={200: MovieSerializer(many=True)}
 )
@@ -184,7 +158,7 @@ def personalized_recommendations(request):
 	
 	Query Parameters:
 	- limit: Number of recommendations (default: 10, max: 50)
-	- algorithm: 'hybrid' (default), 'collaborative', or 'content'
+	- algorithm: 'hybrid' (default), 'collaborative', 'factorization', or 'content'
 	"""
 	user = request.user
 	limit = int(request.query_params.get('limit', 10))
@@ -193,31 +167,45 @@ def personalized_recommendations(request):
 	# Validate limit
 	if limit < 1:
 		limit = 10
-	elif limit > 50:
-		limit = 50
+	elif limit > MAX_RECOMMENDATIONS:
+		limit = MAX_RECOMMENDATIONS
 	
 	profile, _ = UserProfile.objects.get_or_create(user=user)
 	preferred_genre_ids = list(profile.preferred_genres.values_list('id', flat=True))
 	preferred_genres_data = GenreSerializer(profile.preferred_genres.all(), many=True).data
 	
-	# Check cache first
-	cache_key = f"recommendations:user:{user.id}:algo:{algorithm}:limit:{limit}"
-	cached_result = cache.get(cache_key)
-	
-	if cached_result:
-		if isinstance(cached_result, dict):
-			recommendation_payload = cached_result
+	engine = RecommendationEngine()
+	sources = {}
+
+	def compute():
+		# Prefer the list from the batch precompute job
+		precomputed = get_precomputed_recommendations(user.id, algorithm)
+		sources['precomputed'] = precomputed is not None
+		if precomputed is not None:
+			recommendations = precomputed[:MAX_RECOMMENDATIONS]
 		else:
-			recommendation_payload = {
-				'items': cached_result,
-				'preferences_applied': bool(preferred_genre_ids),
-				'preferred_genre_ids': preferred_genre_ids,
-			}
+			recommendations = engine.get_recommendations(user.id, algorithm=algorithm, limit=MAX_RECOMMENDATIONS)
+		return {
+			'items': recommendations,
+			'preferences_applied': bool(preferred_genre_ids),
+			'preferred_genre_ids': preferred_genre_ids,
+		}
+
+	# Cache the full-length list for 1 hour; one worker recomputes while the
+	# others serve the previous list, and every limit is a slice of it
+	recommendation_payload, cached = get_or_refresh(
+		recommendations_key(user.id, algorithm),
+		compute,
+		timeout=3600,
+		alias=CACHE_ALIAS,
+	)
+
+	if cached:
 		return Response({
 			'success': True,
 			'message': 'Personalized recommendations retrieved successfully',
 			'data': {
-				'recommendations': recommendation_payload.get('items', []),
+				'recommendations': recommendation_payload.get('items', [])[:limit],
 				'cached': True,
 				'algorithm': algorithm,
 				'preferences_applied': recommendation_payload.get('preferences_applied', bool(preferred_genre_ids)),
@@ -225,46 +213,15 @@ def personalized_recommendations(request):
 				'preferred_genres': preferred_genres_data,
 			}
 		})
-	
-	# Generate recommendations
-	engine = RecommendationEngine()
-	
-	if algorithm == 'collaborative':
-		recommendations = engine.get_collaborative_recommendations(user.id, limit=limit)
-	elif algorithm == 'content':
-		# Use most recent highly-rated movie as seed
-		from reviews.models import Review
-		recent_liked = Review.objects.filter(
-			user=user,
-			rating__gte=4
-		).order_by('-created_at').select_related('movie').first()
-		
-		if recent_liked:
-			recommendations = engine.get_content_based_recommendations(
-				recent_liked.movie_id,
-				limit=limit
-			)
-		else:
-			# Fallback to popular movies
-			recommendations = []
-	else:  # hybrid (default)
-		recommendations = engine.get_hybrid_recommendations(user.id, limit=limit)
-	
-	recommendation_payload = {
-		'items': recommendations,
-		'preferences_applied': bool(preferred_genre_ids),
-		'preferred_genre_ids': preferred_genre_ids,
-	}
 
-	# Cache for 1 hour
-	cache.set(cache_key, recommendation_payload, 3600)
-	
+	recommendations = recommendation_payload['items'][:limit]
 	return Response({
 		'success': True,
 		'message': f'Found {len(recommendations)} personalized recommendations',
 		'data': {
 			'recommendations': recommendations,
 			'cached': False,
+			'precomputed': sources['precomputed'],
 			'algorithm': algorithm,
 			'ml_enabled': engine.is_enabled(),
 			'preferences_applied': bool(preferred_genre_ids),
@@ -299,43 +256,43 @@ def similar_movies(request, pk):
 	# Validate limit
 	if limit < 1:
 		limit = 10
-	elif limit > 30:
-		limit = 30
+	elif limit > MAX_SIMILAR_MOVIES:
+		limit = MAX_SIMILAR_MOVIES
 	
 	# Check if movie exists
 	try:
-		movie = Movie.objects.get(pk=pk)
+		movie = Movie.objects.only('id', 'title').get(pk=pk)
 	except Movie.DoesNotExist:
 		return Response(
 			{'error': 'Movie not found'},
 			status=status.HTTP_404_NOT_FOUND
 		)
 	
-	# Check cache
-	cache_key = f"similar_movies:movie:{pk}:limit:{limit}"
-	cached_result = cache.get(cache_key)
-	
-	if cached_result:
+	engine = RecommendationEngine()
+
+	# Cache for 6 hours; concurrent requests never fit the content model twice
+	similar, cached = get_or_refresh(
+		similar_movies_key(pk),
+		lambda: engine.get_content_based_recommendations(pk, limit=MAX_SIMILAR_MOVIES),
+		timeout=21600,
+		alias=CACHE_ALIAS,
+	)
+	similar = similar[:limit]
+
+	if cached:
 		return Response({
 			'success': True,
-			'message': f'Found {len(cached_result)} similar movies',
+			'message': f'Found {len(similar)} similar movies',
 			'data': {
 				'source_movie': {
 					'id': movie.id,
 					'title': movie.title
 				},
-				'similar_movies': cached_result,
+				'similar_movies': similar,
 				'cached': True
 			}
 		})
-	
-	# Generate similar movies
-	engine = RecommendationEngine()
-	similar = engine.get_content_based_recommendations(pk, limit=limit)
-	
-	# Cache for 6 hours
-	cache.set(cache_key, similar, 21600)
-	
+
 	return Response({
 		'success': True,
 		'message': f'Found {len(similar)} similar movies',
@@ -379,40 +336,29 @@ def user_taste_profile(request):
 	"""
 	user = request.user
 	
-	# Check cache
-	cache_key = f"taste_profile:user:{user.id}"
-	cached_result = cache.get(cache_key)
-	
-	if cached_result:
-		return Response({
-			'success': True,
-			'message': 'Taste profile retrieved successfully',
-			'data': {
-				**cached_result,
-				'cached': True
-			}
-		})
-	
-	# Generate taste profile
 	engine = RecommendationEngine()
-	profile = engine.get_user_taste_profile(user.id)
-	
+
 	# Cache for 30 minutes
-	cache.set(cache_key, profile, 1800)
-	
+	profile, cached = get_or_refresh(
+		taste_profile_key(user.id),
+		lambda: engine.get_user_taste_profile(user.id),
+		timeout=1800,
+		alias=CACHE_ALIAS,
+	)
+
 	return Response({
 		'success': True,
 		'message': 'Taste profile retrieved successfully',
 		'data': {
 			**profile,
-			'cached': False
+			'cached': cached
 		}
 	})
 
 
 @extend_schema(
 	summary="Clear recommendation cache",
-	description="Clear cached recommendations for the authenticated user (useful after rating new movies)",
+	description="Clear cached recommendations and precomputed lists for the authenticated user (review writes already do this automatically)",
 	request=None,
 	responses={
 		200: {
@@ -423,7 +369,7 @@ def user_taste_profile(request):
 				'data': {
 					'type': 'object',
 					'properties': {
-						'cleared_keys': {'type': 'integer'}
+						'invalidated': {'type': 'boolean'}
 					}
 				}
 			}
@@ -436,29 +382,16 @@ def clear_recommendation_cache(request):
 	"""
 	Clear cached recommendations for the authenticated user
 	
-	Useful after user has rated new movies
+	Review writes already invalidate these automatically; this remains
+	for clients that want to force a refresh.
 	"""
-	user = request.user
-	
-	# Clear all user-related recommendation caches
-	cache_patterns = [
-		f"recommendations:user:{user.id}:*",
-		f"taste_profile:user:{user.id}"
-	]
-	
-	cleared = 0
-	# Note: This is a simplified version. In production, use Redis SCAN for pattern matching
-	for pattern in cache_patterns:
-		try:
-			cache.delete(pattern)
-			cleared += 1
-		except:
-			pass
+	# Bumping the user's namespace orphans every cached entry in one step
+	invalidate_user(request.user.id)
 	
 	return Response({
 		'success': True,
 		'message': 'Recommendation cache cleared successfully',
 		'data': {
-			'cleared_patterns': cleared
+			'invalidated': True
 		}
 	})
@@ -83,16 +83,8 @@ class ReviewAdmin(admin.ModelAdmin):
         """Delete selected reviews and update movie ratings"""
         deleted_count = 0
         for review in queryset:
-            movie = review.movie
+            # Movie rating aggregates are adjusted by the post_delete signal
             review.delete()
-
-            # Update movie average rating
-            reviews = movie.reviews.all()
-            if reviews:
-                avg_rating = sum(r.rating for r in reviews) / len(reviews)
-                movie.avg_rating = round(avg_rating, 2)
-                movie.save()
-
             deleted_count += 1
 
         self.message_user(request, f'Deleted {deleted_count} review(s) and updated movie ratings.')
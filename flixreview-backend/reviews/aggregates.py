@@ -0,0 +1,174 @@
+"""
+Denormalized movie rating aggregates
+
+Movie.review_count, rating_sum, rating_<n>_count and avg_rating are kept
+current from review signals with atomic F() deltas; recount_movie_ratings
+rebuilds them from the reviews table to repair any drift (bulk updates,
+raw SQL, manual edits). recount_review_counters does the same for the
+per-review likes_count and comments_count.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Round
+
+from common.response_cache import purge_tags
+from movies.cache import touch_movies
+from movies.models import Movie
+
+
+RATING_VALUES = range(1, 6)
+AGGREGATE_FIELDS = Movie.RATING_AGGREGATE_FIELDS
+COUNTER_FIELDS = tuple(field for field in AGGREGATE_FIELDS if field != 'avg_rating')
+
+
+def apply_rating_delta(movie_id: int, count_delta: int, sum_delta: int, histogram_delta: Dict[int, int]) -> None:
+    """
+    Apply a change to a movie's rating aggregates in a single UPDATE
+
+    Every counter is written as ``F(column) + delta`` so concurrent reviews
+    never lose updates, and avg_rating is derived from the same row values.
+    Only aggregate columns are written (``updated_at`` is left alone), so
+    the movie's HTTP validators are moved explicitly.
+    """
+    new_count = F('review_count') + count_delta
+    new_sum = F('rating_sum') + sum_delta
+
+    updates = {
+        'rating_sum': new_sum,
+        'avg_rating': Case(
+            When(review_count__gt=-count_delta, then=Round(Cast(new_sum, FloatField()) / new_count, 2)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    }
+    if count_delta:
+        updates['review_count'] = new_count
+    for rating, delta in histogram_delta.items():
+        if delta:
+            column = f'rating_{rating}_count'
+            updates[column] = F(column) + delta
+
+    Movie.objects.filter(pk=movie_id).update(**updates)
+    touch_movies(movie_id)
+    # Only cached responses showing this movie; rating-ordered lists and
+    # facet rating buckets expire on RESPONSE_CACHE_RANKED_TTL instead of
+    # being purged on every review
+    purge_tags(f'movie:{movie_id}')
+
+
+def compute_rating_aggregates(movie_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+    """Return {movie_id: {field: value}} recounted from reviews in one grouped query"""
+    from .models import Review
+
+    reviews = Review.objects.all()
+    if movie_ids is not None:
+        reviews = reviews.filter(movie_id__in=list(movie_ids))
+
+    rows = (
+        reviews
+        .order_by()
+        .values('movie_id')
+        .annotate(
+            review_count=Count('id'),
+            rating_sum=Sum('rating'),
+            **{
+                f'rating_{rating}_count': Count('id', filter=Q(rating=rating))
+                for rating in RATING_VALUES
+            },
+        )
+    )
+
+    aggregates = {}
+    for row in rows:
+        values = {field: row[field] for field in COUNTER_FIELDS}
+        values['avg_rating'] = (
+            Decimal(values['rating_sum']) / Decimal(values['review_count'])
+        ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        aggregates[row['movie_id']] = values
+    return aggregates
+
+
+def _empty_aggregates() -> Dict:
+    return {**{field: 0 for field in COUNTER_FIELDS}, 'avg_rating': Decimal('0.00')}
+
+
+def _has_drifted(movie, expected: Dict) -> bool:
+    if any(getattr(movie, field) != expected[field] for field in COUNTER_FIELDS):
+        return True
+    # The incremental path rounds in SQL; tolerate a one-cent rounding difference
+    return abs(Decimal(movie.avg_rating) - expected['avg_rating']) > Decimal('0.01')
+
+
+def recount_movie_ratings(
+    movie_ids: Optional[Iterable[int]] = None,
+    dry_run: bool = False,
+    batch_size: int = 500,
+) -> int:
+    """
+    Rewrite the aggregates of every movie whose stored values have drifted
+
+    Returns the number of movies that were (or, with dry_run, would be) repaired.
+    """
+    if movie_ids is not None:
+        movie_ids = list(movie_ids)
+
+    expected = compute_rating_aggregates(movie_ids)
+
+    movies = Movie.objects.only('id', *AGGREGATE_FIELDS).order_by('id')
+    if movie_ids is not None:
+        movies = movies.filter(id__in=movie_ids)
+
+    drifted = []
+    for movie in movies.iterator(chunk_size=batch_size):
+        values = expected.get(movie.id) or _empty_aggregates()
+        if _has_drifted(movie, values):
+            for field, value in values.items():
+                setattr(movie, field, value)
+            drifted.append(movie)
+
+    if drifted and not dry_run:
+        Movie.objects.bulk_update(drifted, AGGREGATE_FIELDS, batch_size=batch_size)
+        touch_movies(*(movie.id for movie in drifted))
+        purge_tags('movies', *(f'movie:{movie.id}' for movie in drifted))
+    return len(drifted)
+
+
+def recount_review_counters(
+    review_ids: Optional[Iterable[int]] = None,
+    dry_run: bool = False,
+    batch_size: int = 500,
+) -> int:
+    """
+    Rewrite likes_count and comments_count of every review whose stored values have drifted
+
+    Returns the number of reviews that were (or, with dry_run, would be) repaired.
+    """
+    from .models import Review, ReviewComment, ReviewLike
+
+    if review_ids is not None:
+        review_ids = list(review_ids)
+
+    def counts(model):
+        rows = model.objects.all()
+        if review_ids is not None:
+            rows = rows.filter(review_id__in=review_ids)
+        return dict(rows.order_by().values('review_id').annotate(total=Count('id')).values_list('review_id', 'total'))
+
+    likes, comments = counts(ReviewLike), counts(ReviewComment)
+
+    reviews = Review.objects.only('id', 'likes_count', 'comments_count').order_by('id')
+    if review_ids is not None:
+        reviews = reviews.filter(id__in=review_ids)
+
+    drifted = []
+    for review in reviews.iterator(chunk_size=batch_size):
+        expected = (likes.get(review.id, 0), comments.get(review.id, 0))
+        if (review.likes_count, review.comments_count) != expected:
+            review.likes_count, review.comments_count = expected
+            drifted.append(review)
+
+    if drifted and not dry_run:
+        Review.objects.bulk_update(drifted, ['likes_count', 'comments_count'], batch_size=batch_size)
+    return len(drifted)
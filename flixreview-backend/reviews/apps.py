@@ -8,3 +8,8 @@ class ReviewsConfig(AppConfig):
     def ready(self):
         # Use relative import so static analyzers can resolve it
         from . import signals  # noqa: F401
+
+        from common.search import register_search_document
+        from .models import Review
+
+        register_search_document(Review, {'content': 'A'})
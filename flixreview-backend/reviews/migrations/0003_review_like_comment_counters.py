@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Populate likes_count and comments_count from existing rows in one UPDATE each"""
+    Review = apps.get_model("reviews", "Review")
+    ReviewLike = apps.get_model("reviews", "ReviewLike")
+    ReviewComment = apps.get_model("reviews", "ReviewComment")
+
+    for model, field in ((ReviewLike, "likes_count"), (ReviewComment, "comments_count")):
+        counts = (
+            model.objects.filter(review_id=OuterRef("pk"))
+            .order_by()
+            .values("review_id")
+            .annotate(total=Count("id"))
+            .values("total")
+        )
+        Review.objects.update(
+            **{field: Coalesce(Subquery(counts, output_field=IntegerField()), 0)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0006_movie_rating_aggregates"),
+        ("reviews", "0002_reviewcomment_reviewlike"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["likes_count", "created_at"],
+                name="reviews_rev_likes_c_0f9221_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from common.search import InstallSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_review_like_comment_counters"),
+    ]
+
+    operations = [
+        InstallSearchIndex("Review", {"content": "A"}),
+    ]
@@ -16,6 +16,10 @@ class Review(models.Model):
 	updated_at = models.DateTimeField(auto_now=True)
 	is_edited = models.BooleanField(default=False)
 
+	# Denormalized counters, adjusted with F() by ReviewLike/ReviewComment signals
+	likes_count = models.PositiveIntegerField(default=0)
+	comments_count = models.PositiveIntegerField(default=0)
+
 	def __str__(self):
 		return f"{self.user.username} - {self.movie.title}"
 
@@ -27,6 +31,7 @@ class Review(models.Model):
 			models.Index(fields=['user', 'created_at']),
 			models.Index(fields=['rating', 'created_at']),
 			models.Index(fields=['movie', 'created_at']),
+			models.Index(fields=['likes_count', 'created_at']),
 		]
 
 
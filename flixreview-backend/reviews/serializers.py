@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import models
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 
@@ -9,6 +10,22 @@ from movies.serializers import MovieSerializer
 User = get_user_model()
 
 
+class ReviewListSerializer(serializers.ListSerializer):
+    """Resolves ``user_has_liked`` for a whole page of reviews with one query"""
+
+    def to_representation(self, data):
+        reviews = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            self.context['liked_review_ids'] = set(
+                ReviewLike.objects
+                .filter(user=request.user, review_id__in=[review.pk for review in reviews])
+                .values_list('review_id', flat=True)
+            )
+        return super().to_representation(reviews)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
     movie = MovieSerializer(read_only=True)
@@ -17,8 +34,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         write_only=True,
         source='movie'
     )
-    likes_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
     user_has_liked = serializers.SerializerMethodField()
 
     class Meta:
@@ -29,6 +44,7 @@ class ReviewSerializer(serializers.ModelSerializer):
             'likes_count', 'comments_count', 'user_has_liked'
         )
         read_only_fields = ('user', 'created_at', 'updated_at', 'is_edited', 'likes_count', 'comments_count', 'user_has_liked')
+        list_serializer_class = ReviewListSerializer
 
     @extend_schema_field(serializers.DictField)
     def get_user(self, obj):
@@ -48,18 +64,13 @@ class ReviewSerializer(serializers.ModelSerializer):
             } if profile_picture_url else None
         }
 
-    @extend_schema_field(serializers.IntegerField)
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-
-    @extend_schema_field(serializers.IntegerField)
-    def get_comments_count(self, obj):
-        return obj.comments.count()
-
     @extend_schema_field(serializers.BooleanField)
     def get_user_has_liked(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            liked_review_ids = self.context.get('liked_review_ids')
+            if liked_review_ids is not None:
+                return obj.pk in liked_review_ids
             return obj.likes.filter(user=request.user).exists()
         return False
 
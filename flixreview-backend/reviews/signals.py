@@ -1,12 +1,102 @@
-from django.db.models.signals import post_save, post_delete
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Avg
-from .models import Review
 
+from movies.cache import touch_movie_reviews
+from .aggregates import apply_rating_delta, recount_movie_ratings
+from .models import Review, ReviewComment, ReviewLike
 
-@receiver([post_save, post_delete], sender=Review)
-def update_movie_avg_rating(sender, instance, **kwargs):
-    movie = instance.movie
-    avg_rating = Review.objects.filter(movie=movie).aggregate(Avg('rating'))['rating__avg']
-    movie.avg_rating = round(avg_rating, 2) if avg_rating is not None else 0.00
-    movie.save()
+
+# User fields rendered with each review (ReviewSerializer.get_user)
+REVIEW_AUTHOR_FIELDS = {'username', 'profile_picture'}
+
+
+def _remember_persisted_rating(instance):
+    # Read through __dict__ so deferred fields (e.g. .only('movie_id')) are
+    # never loaded just to take the snapshot
+    instance._persisted_movie_id = instance.__dict__.get('movie_id')
+    instance._persisted_rating = instance.__dict__.get('rating')
+
+
+@receiver(post_init, sender=Review)
+def track_persisted_rating(sender, instance, **kwargs):
+    _remember_persisted_rating(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_movie_rating_on_save(sender, instance, created, **kwargs):
+    old_movie_id = instance._persisted_movie_id
+    old_rating = instance._persisted_rating
+
+    if created:
+        apply_rating_delta(instance.movie_id, 1, instance.rating, {instance.rating: 1})
+    elif old_movie_id is None or old_rating is None:
+        # Loaded without the rating, so the previous value is unknown
+        recount_movie_ratings([instance.movie_id])
+    elif old_movie_id != instance.movie_id:
+        apply_rating_delta(old_movie_id, -1, -old_rating, {old_rating: -1})
+        apply_rating_delta(instance.movie_id, 1, instance.rating, {instance.rating: 1})
+    elif old_rating != instance.rating:
+        # An edit shifts the sum and two histogram buckets; nothing is recounted
+        apply_rating_delta(
+            instance.movie_id,
+            0,
+            instance.rating - old_rating,
+            {old_rating: -1, instance.rating: 1},
+        )
+
+    touch_movie_reviews(old_movie_id, instance.movie_id)
+    _remember_persisted_rating(instance)
+
+
+@receiver(post_delete, sender=Review)
+def update_movie_rating_on_delete(sender, instance, **kwargs):
+    rating = instance._persisted_rating
+    if rating is None:
+        recount_movie_ratings([instance.movie_id])
+    else:
+        apply_rating_delta(instance.movie_id, -1, -rating, {rating: -1})
+    touch_movie_reviews(instance.movie_id)
+
+
+# Like and comment counters follow the rows themselves, so cascades (a user
+# account or review deleted) and admin or queryset deletes keep them exact
+
+def _adjust_review_counter(sender, instance, field, delta):
+    Review.objects.filter(pk=instance.review_id).update(**{field: F(field) + delta})
+    if sender.review.is_cached(instance):
+        movie_id = instance.review.movie_id
+    else:
+        movie_id = Review.objects.filter(pk=instance.review_id).values_list('movie_id', flat=True).first()
+    touch_movie_reviews(movie_id)
+
+
+@receiver(post_save, sender=ReviewLike)
+def count_review_like(sender, instance, created, **kwargs):
+    if created:
+        _adjust_review_counter(sender, instance, 'likes_count', 1)
+
+
+@receiver(post_delete, sender=ReviewLike)
+def uncount_review_like(sender, instance, **kwargs):
+    _adjust_review_counter(sender, instance, 'likes_count', -1)
+
+
+@receiver(post_save, sender=ReviewComment)
+def count_review_comment(sender, instance, created, **kwargs):
+    if created:
+        _adjust_review_counter(sender, instance, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=ReviewComment)
+def uncount_review_comment(sender, instance, **kwargs):
+    _adjust_review_counter(sender, instance, 'comments_count', -1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_reviews_of_updated_author(sender, instance, created, update_fields=None, **kwargs):
+    # Saves limited to other fields (e.g. last_login on every login) skip the lookup
+    if created or (update_fields is not None and not REVIEW_AUTHOR_FIELDS & set(update_fields)):
+        return
+    touch_movie_reviews(*Review.objects.filter(user=instance).values_list('movie_id', flat=True).distinct())
@@ -1,11 +1,13 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from datetime import date
 
-from movies.models import Movie
+from movies.models import Genre, Movie
 from .models import Review
 
 
@@ -50,6 +52,73 @@ class ReviewModelTests(TestCase):
 		self.movie.refresh_from_db()
 		self.assertEqual(self.movie.avg_rating, 5)
 
+	def test_rating_aggregates_apply_deltas(self):
+		review = Review.objects.create(user=self.user, movie=self.movie, content='Great', rating=5)
+		Review.objects.create(user=self.other_user, movie=self.movie, content='Ok', rating=2)
+
+		review.rating = 4
+		review.save()
+		self.movie.refresh_from_db()
+		self.assertEqual(self.movie.review_count, 2)
+		self.assertEqual(self.movie.rating_sum, 6)
+		self.assertEqual(
+			[getattr(self.movie, f'rating_{n}_count') for n in range(1, 6)],
+			[0, 1, 0, 1, 0]
+		)
+		self.assertEqual(self.movie.avg_rating, 3)
+
+		Review.objects.filter(movie=self.movie).delete()
+		self.movie.refresh_from_db()
+		self.assertEqual((self.movie.review_count, self.movie.rating_sum, self.movie.avg_rating), (0, 0, 0))
+
+	def test_review_write_is_one_update_without_touching_updated_at(self):
+		updated_at = self.movie.updated_at
+		review = Review.objects.create(user=self.user, movie=self.movie, content='Great', rating=5)
+
+		with CaptureQueriesContext(connection) as ctx:
+			review.rating = 3
+			review.save()
+		# The leaderboard refresh reads the movie back; the aggregates are one UPDATE
+		movie_writes = [
+			q['sql'] for q in ctx.captured_queries
+			if '"movies_movie"' in q['sql'] and not q['sql'].startswith('SELECT')
+		]
+		self.assertEqual(len(movie_writes), 1)
+		self.assertTrue(movie_writes[0].startswith('UPDATE'))
+		self.assertFalse(any('AVG(' in q['sql'] for q in ctx.captured_queries))
+		self.movie.refresh_from_db()
+		self.assertEqual(self.movie.updated_at, updated_at)
+
+	def test_stale_movie_save_keeps_aggregates(self):
+		stale = Movie.objects.get(pk=self.movie.pk)
+		Review.objects.create(user=self.user, movie=self.movie, content='Great', rating=5)
+
+		stale.title = 'Renamed'
+		stale.save()
+		self.movie.refresh_from_db()
+		self.assertEqual(self.movie.title, 'Renamed')
+		self.assertEqual(self.movie.review_count, 1)
+
+	def test_reconcile_command_repairs_drift(self):
+		from io import StringIO
+		from django.core.management import call_command
+
+		Review.objects.create(user=self.user, movie=self.movie, content='Great', rating=5)
+		Review.objects.create(user=self.other_user, movie=self.movie, content='Ok', rating=3)
+		Movie.objects.filter(pk=self.movie.pk).update(review_count=7, rating_3_count=0, avg_rating=1)
+
+		out = StringIO()
+		call_command('reconcile_movie_ratings', stdout=out)
+		self.movie.refresh_from_db()
+		self.assertIn('1 movie(s)', out.getvalue())
+		self.assertEqual(self.movie.review_count, 2)
+		self.assertEqual(self.movie.rating_3_count, 1)
+		self.assertEqual(self.movie.avg_rating, 4)
+
+		out = StringIO()
+		call_command('reconcile_movie_ratings', '--dry-run', stdout=out)
+		self.assertIn('0 movie(s)', out.getvalue())
+
 
 class ReviewAPITests(APITestCase):
 	def setUp(self):
@@ -98,6 +167,18 @@ class ReviewAPITests(APITestCase):
 		self.assertEqual(search_res.status_code, status.HTTP_200_OK)
 		self.assertEqual(search_res.data['data']['count'], 2)
 
+	def test_review_search_matches_content_words(self):
+		Review.objects.create(user=self.user, movie=self.movie, content='The inverted car chase was thrilling', rating=5)
+		Review.objects.create(user=self.other_user, movie=self.movie, content='Too loud', rating=2)
+
+		res = self.client.get(f"{self.search_url}?q=chasing thrill")
+		self.assertEqual(res.status_code, status.HTTP_200_OK)
+		self.assertEqual(res.data['data']['count'], 1)
+		self.assertEqual(res.data['data']['results'][0]['rating'], 5)
+
+		res = self.client.get(f"{self.list_url}?search=loud")
+		self.assertEqual(res.data['data']['count'], 1)
+
 	def test_only_owner_can_modify_review(self):
 		review = Review.objects.create(user=self.user, movie=self.movie, content='Solid', rating=4)
 		review_url = reverse(self.detail_name, args=[review.pk])
@@ -135,3 +216,193 @@ class ReviewAPITests(APITestCase):
 		self.assertEqual(res.status_code, status.HTTP_200_OK)
 		self.assertEqual(res.data['data']['count'], 2)
 		self.assertEqual(len(res.data['data']['results']), 2)
+
+	def test_like_and_comment_counters(self):
+		review = Review.objects.create(user=self.user, movie=self.movie, content='Loved it', rating=5)
+		like_url = reverse('review-like-toggle', args=[review.pk])
+		comments_url = reverse('review-comments', kwargs={'review_id': review.pk})
+
+		self.authenticate(self.other_user)
+		res = self.client.post(like_url)
+		self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+		self.assertEqual(res.data['data']['likes_count'], 1)
+		res = self.client.post(like_url)
+		self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+		res = self.client.post(comments_url, {'content': 'Agreed'}, format='json')
+		self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+		review.refresh_from_db()
+		self.assertEqual((review.likes_count, review.comments_count), (1, 1))
+
+		res = self.client.get(reverse('most-liked-reviews'))
+		self.assertEqual(res.data['data']['results'][0]['likes_count'], 1)
+		self.assertTrue(res.data['data']['results'][0]['user_has_liked'])
+
+		comment_id = review.comments.get().pk
+		self.client.delete(reverse('review-comment-detail', args=[comment_id]))
+		res = self.client.delete(like_url)
+		self.assertEqual(res.data['data']['likes_count'], 0)
+		review.refresh_from_db()
+		self.assertEqual((review.likes_count, review.comments_count), (0, 0))
+
+	def test_counters_follow_cascade_deletes(self):
+		from io import StringIO
+		from django.core.management import call_command
+		from .models import ReviewComment, ReviewLike
+
+		review = Review.objects.create(user=self.user, movie=self.movie, content='Loved it', rating=5)
+		ReviewLike.objects.create(user=self.other_user, review=review)
+		ReviewComment.objects.create(user=self.other_user, review=review, content='Agreed')
+		ReviewComment.objects.create(user=self.user, review=review, content='Thanks')
+		review.refresh_from_db()
+		self.assertEqual((review.likes_count, review.comments_count), (1, 2))
+
+		# Deleting the account cascades to its likes and comments
+		self.other_user.delete()
+		review.refresh_from_db()
+		self.assertEqual((review.likes_count, review.comments_count), (0, 1))
+
+		Review.objects.filter(pk=review.pk).update(likes_count=4, comments_count=0)
+		out = StringIO()
+		call_command('reconcile_review_counters', stdout=out)
+		self.assertIn('1 review(s)', out.getvalue())
+		review.refresh_from_db()
+		self.assertEqual((review.likes_count, review.comments_count), (0, 1))
+
+	def test_review_page_resolves_likes_without_per_row_queries(self):
+		for i in range(5):
+			author = User.objects.create_user(email=f'author{i}@example.com', username=f'author{i}', password='Pass123!x')
+			review = Review.objects.create(user=author, movie=self.movie, content='Fine', rating=4)
+			review.likes.create(user=self.user)
+		self.authenticate(self.user)
+
+		with CaptureQueriesContext(connection) as ctx:
+			res = self.client.get(self.list_url)
+
+		self.assertEqual(len(res.data['data']['results']), 5)
+		self.assertTrue(all(item['user_has_liked'] for item in res.data['data']['results']))
+		counter_queries = [
+			q['sql'] for q in ctx.captured_queries
+			if '"reviews_reviewlike"' in q['sql'] or '"reviews_reviewcomment"' in q['sql']
+		]
+		# One bulk liked-by-me lookup; counts come from the review row itself
+		self.assertEqual(len(counter_queries), 1)
+
+	def test_review_list_query_count_is_independent_of_page_size(self):
+		genre = Genre.objects.create(name='Sci-Fi')
+		for i in range(6):
+			movie = Movie.objects.create(
+				title=f'Movie {i}', genre='Sci-Fi', description='Filler', release_date=date(2001, 1, 1)
+			)
+			movie.genres.add(genre)
+			Review.objects.create(user=self.user, movie=movie, content='Fine', rating=4)
+		self.authenticate(self.other_user)
+		self.client.get(self.list_url)  # warm the cached genre counts
+
+		with CaptureQueriesContext(connection) as small_page:
+			self.client.get(f"{self.list_url}?page_size=2")
+		with CaptureQueriesContext(connection) as large_page:
+			self.client.get(f"{self.list_url}?page_size=6")
+
+		self.assertEqual(len(small_page.captured_queries), len(large_page.captured_queries))
+
+
+class ReviewCursorPaginationTests(APITestCase):
+	def setUp(self):
+		self.list_url = reverse('review-list')
+		self.movies = [
+			Movie.objects.create(title=f'Movie {n}', genre='Drama', description='d', release_date=date(2020, 1, 1))
+			for n in range(5)
+		]
+		self.user = User.objects.create_user(email='cursor@example.com', username='cursor', password='UserPass123!')
+		self.reviews = [
+			Review.objects.create(user=self.user, movie=movie, content='Fine', rating=3)
+			for movie in self.movies
+		]
+		# Identical timestamps force the id tiebreaker to decide the order
+		Review.objects.update(created_at=self.reviews[0].created_at)
+
+	def walk(self, url):
+		ids, pages = [], []
+		while url:
+			res = self.client.get(url)
+			self.assertEqual(res.status_code, status.HTTP_200_OK)
+			pages.append(res.data['data'])
+			ids.extend(review['id'] for review in res.data['data']['results'])
+			url = res.data['data']['next']
+		return ids, pages
+
+	def test_cursor_walks_every_review_once_in_order(self):
+		ids, pages = self.walk(f'{self.list_url}?cursor=&page_size=2')
+
+		self.assertEqual(ids, sorted((review.id for review in self.reviews), reverse=True))
+		self.assertEqual(len(pages), 3)
+		self.assertNotIn('count', pages[0])
+		self.assertIsNone(pages[0]['previous'])
+
+	def test_cursor_previous_link_returns_prior_page(self):
+		first = self.client.get(f'{self.list_url}?cursor=&page_size=2').data['data']
+		second = self.client.get(first['next']).data['data']
+
+		back = self.client.get(second['previous']).data['data']
+
+		self.assertEqual(back['results'], first['results'])
+
+	def test_cursor_pages_run_no_count(self):
+		first = self.client.get(f'{self.list_url}?cursor=&page_size=2').data['data']
+
+		with CaptureQueriesContext(connection) as ctx:
+			self.client.get(first['next'])
+
+		self.assertFalse(any('COUNT(' in query['sql'] for query in ctx.captured_queries))
+
+	def test_cursor_follows_requested_ordering(self):
+		Review.objects.filter(pk=self.reviews[2].pk).update(rating=5)
+
+		ids, _ = self.walk(f'{self.list_url}?cursor=&page_size=2&ordering=-rating')
+
+		self.assertEqual(ids[0], self.reviews[2].id)
+		self.assertEqual(sorted(ids), sorted(review.id for review in self.reviews))
+
+	def test_invalid_cursor_is_not_found(self):
+		res = self.client.get(f'{self.list_url}?cursor=not-a-cursor')
+
+		self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+	def test_tampered_cursor_values_are_not_found(self):
+		import base64
+		import json
+
+		for position in (['notadate', 1], [{'a': 1}, 1], [None, 1], ['2024-01-01T00:00:00', 'x']):
+			cursor = base64.urlsafe_b64encode(json.dumps({'p': position}).encode()).decode()
+			res = self.client.get(f'{self.list_url}?cursor={cursor}')
+			self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, position)
+
+		# Search results order on the rank annotation
+		ids, _ = self.walk(f'{self.list_url}?search=fine&cursor=&page_size=2')
+		self.assertEqual(len(ids), 5)
+		cursor = base64.urlsafe_b64encode(json.dumps({'p': ['high', 1]}).encode()).decode()
+		res = self.client.get(f'{self.list_url}?search=fine&cursor={cursor}')
+		self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+	def test_count_free_page_numbers(self):
+		with CaptureQueriesContext(connection) as ctx:
+			res = self.client.get(f'{self.list_url}?count=false&page_size=2&page=2')
+
+		data = res.data['data']
+		self.assertIsNone(data['count'])
+		self.assertEqual(len(data['results']), 2)
+		self.assertIsNotNone(data['next'])
+		self.assertIsNotNone(data['previous'])
+		self.assertFalse(any('COUNT(' in query['sql'] for query in ctx.captured_queries))
+
+	def test_comment_list_supports_cursor(self):
+		review = self.reviews[0]
+		for n in range(3):
+			self.client.force_authenticate(user=self.user)
+			self.client.post(reverse('review-comments', args=[review.pk]), {'content': f'Comment {n}'}, format='json')
+
+		ids, pages = self.walk(f"{reverse('review-comments', args=[review.pk])}?cursor=&page_size=2")
+
+		self.assertEqual(len(ids), 3)
+		self.assertEqual(len(pages), 2)
@@ -1,17 +1,21 @@
 from urllib.parse import unquote_plus
 
-from django.db.models import Q, Count
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status, serializers
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, inline_serializer
 
 from .models import Review, ReviewLike, ReviewComment
 from .serializers import ReviewSerializer, ReviewLikeSerializer, ReviewCommentSerializer
-from common.mixins import ApiResponseMixin
+from common.mixins import ApiResponseMixin, ConditionalGetMixin
+from common.pagination import CursorOptInPagination
+from common.search import FullTextSearchFilter
 from common.permissions import IsOwnerOrReadOnly
+from movies.cache import get_genre_version, get_movie_reviews_version, get_movie_version
+from movies.models import Movie
 
 
 class ReviewFilterMixin:
@@ -42,12 +46,13 @@ class ReviewFilterMixin:
 
 
 class ReviewListView(ApiResponseMixin, ReviewFilterMixin, generics.ListCreateAPIView):
-	queryset = Review.objects.all().select_related('user', 'movie')
+	queryset = Review.objects.all().select_related('user', 'movie').prefetch_related('movie__genres')
 	serializer_class = ReviewSerializer
+	pagination_class = CursorOptInPagination
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-	filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+	filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
 	filterset_fields = ['rating', 'movie__title', 'movie__genre', 'user__username']
-	search_fields = ['content', 'movie__title', 'movie__description']
+	search_related = ['movie']
 	ordering_fields = ['rating', 'created_at', 'movie__avg_rating']
 	ordering = ['-created_at']
 	success_messages = {
@@ -64,7 +69,7 @@ class ReviewListView(ApiResponseMixin, ReviewFilterMixin, generics.ListCreateAPI
 
 
 class ReviewDetailView(ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):
-	queryset = Review.objects.all().select_related('user', 'movie')
+	queryset = Review.objects.all().select_related('user', 'movie').prefetch_related('movie__genres')
 	serializer_class = ReviewSerializer
 	permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 	success_messages = {
@@ -83,7 +88,7 @@ class ReviewDetailView(ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):
 		return Response({'detail': 'Review deleted'}, status=status.HTTP_200_OK)
 
 
-class ReviewByMovieView(ApiResponseMixin, ReviewFilterMixin, generics.ListAPIView):
+class ReviewByMovieView(ConditionalGetMixin, ApiResponseMixin, ReviewFilterMixin, generics.ListAPIView):
 	serializer_class = ReviewSerializer
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 	filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -91,20 +96,32 @@ class ReviewByMovieView(ApiResponseMixin, ReviewFilterMixin, generics.ListAPIVie
 	ordering_fields = ['rating', 'created_at']
 	ordering = ['-created_at']
 	queryset = Review.objects.none()  # Default empty queryset for schema generation
+	conditional_vary_on_user = True  # user_has_liked
 	success_messages = {
 		'GET': 'Reviews retrieved successfully',
 	}
 
+	def get_validators(self, request, *args, **kwargs):
+		# Review, like and comment writes move the movie's reviews version
+		movie_ids = Movie.objects.filter(title__iexact=unquote_plus(self.kwargs['title'])).values_list('id', flat=True)
+		versions = [
+			(movie_id, get_movie_version(movie_id), get_movie_reviews_version(movie_id))
+			for movie_id in movie_ids
+		]
+		return (versions, get_genre_version()), None
+
 	def get_queryset(self):
 		title_param = unquote_plus(self.kwargs['title'])
-		queryset = Review.objects.filter(movie__title__iexact=title_param).select_related('user', 'movie')
+		queryset = Review.objects.filter(movie__title__iexact=title_param).select_related('user', 'movie').prefetch_related('movie__genres')
 		return self.apply_common_filters(queryset)
 
 
 class ReviewSearchView(ApiResponseMixin, ReviewFilterMixin, generics.ListAPIView):
 	serializer_class = ReviewSerializer
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-	filter_backends = [OrderingFilter]
+	filter_backends = [OrderingFilter, FullTextSearchFilter]
+	search_params = ['q', 'query']
+	search_related = ['movie']
 	ordering_fields = ['rating', 'created_at', 'movie__avg_rating']
 	ordering = ['-created_at']
 	success_messages = {
@@ -112,19 +129,13 @@ class ReviewSearchView(ApiResponseMixin, ReviewFilterMixin, generics.ListAPIView
 	}
 
 	def get_queryset(self):
-		queryset = Review.objects.all().select_related('user', 'movie')
+		queryset = Review.objects.all().select_related('user', 'movie').prefetch_related('movie__genres')
 		queryset = self.apply_common_filters(queryset)
 
 		params = self.request.query_params
-		search_term = params.get('q') or params.get('query')
 		title = params.get('title')
 		rating = params.get('rating')
 
-		if search_term:
-			queryset = queryset.filter(
-				Q(content__icontains=search_term) |
-				Q(movie__title__icontains=search_term)
-			)
 		if title:
 			queryset = queryset.filter(movie__title__icontains=title)
 		if rating is not None:
@@ -174,15 +185,15 @@ class ReviewLikeToggleView(ApiResponseMixin, APIView):
 			return response
 
 		like, created = ReviewLike.objects.get_or_create(user=request.user, review=review)
-		
 		if not created:
 			response = Response({'detail': 'You have already liked this review'}, status=status.HTTP_400_BAD_REQUEST)
 			response._skip_api_wrapper = True
 			return response
 
+		review.refresh_from_db(fields=['likes_count'])
 		return Response({
 			'detail': 'Review liked successfully',
-			'likes_count': review.likes.count()
+			'likes_count': review.likes_count
 		}, status=status.HTTP_201_CREATED)
 
 	def delete(self, request, pk):
@@ -194,18 +205,18 @@ class ReviewLikeToggleView(ApiResponseMixin, APIView):
 			response._skip_api_wrapper = True
 			return response
 
-		try:
-			like = ReviewLike.objects.get(user=request.user, review=review)
-			like.delete()
-			return Response({
-				'detail': 'Review unliked successfully',
-				'likes_count': review.likes.count()
-			}, status=status.HTTP_200_OK)
-		except ReviewLike.DoesNotExist:
+		deleted, _ = ReviewLike.objects.filter(user=request.user, review=review).delete()
+		if not deleted:
 			response = Response({'detail': 'You have not liked this review'}, status=status.HTTP_400_BAD_REQUEST)
 			response._skip_api_wrapper = True
 			return response
 
+		review.refresh_from_db(fields=['likes_count'])
+		return Response({
+			'detail': 'Review unliked successfully',
+			'likes_count': review.likes_count
+		}, status=status.HTTP_200_OK)
+
 
 class MostLikedReviewsView(ApiResponseMixin, generics.ListAPIView):
 	"""Get most liked reviews, optionally filtered by movie"""
@@ -214,21 +225,20 @@ class MostLikedReviewsView(ApiResponseMixin, generics.ListAPIView):
 	success_messages = {'GET': 'Most liked reviews retrieved successfully'}
 
 	def get_queryset(self):
-		queryset = Review.objects.annotate(
-			like_count=Count('likes')
-		).filter(like_count__gt=0).order_by('-like_count', '-created_at')
+		queryset = Review.objects.filter(likes_count__gt=0).order_by('-likes_count', '-created_at')
 
 		# Optional filter by movie
 		movie_id = self.request.query_params.get('movie_id')
 		if movie_id:
 			queryset = queryset.filter(movie_id=movie_id)
 
-		return queryset.select_related('user', 'movie')
+		return queryset.select_related('user', 'movie').prefetch_related('movie__genres')
 
 
 class ReviewCommentListCreateView(ApiResponseMixin, generics.ListCreateAPIView):
 	"""List and create comments for a specific review"""
 	serializer_class = ReviewCommentSerializer
+	pagination_class = CursorOptInPagination
 	permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 	filter_backends = [OrderingFilter]
 	ordering_fields = ['created_at']
@@ -248,8 +258,10 @@ class ReviewCommentListCreateView(ApiResponseMixin, generics.ListCreateAPIView):
 			review = Review.objects.get(pk=review_id)
 		except Review.DoesNotExist:
 			raise serializers.ValidationError({'detail': 'Review not found'})
-		
-		serializer.save(user=self.request.user, review=review)
+
+		# The comment and its counter (see reviews.signals) commit together
+		with transaction.atomic():
+			serializer.save(user=self.request.user, review=review)
 
 
 class ReviewCommentDetailView(ApiResponseMixin, generics.RetrieveUpdateDestroyAPIView):